@@ -0,0 +1,57 @@
+"""add keyset pagination indexes
+
+Revision ID: 3b7e2f91c4d5
+Revises: 44c8319eb693
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e2f91c4d5"
+down_revision: Union[str, Sequence[str], None] = "44c8319eb693"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["tasks", "users", "companies"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # Rows without created_at would never be reached by a (created_at, id) seek,
+        # nor could they be encoded in a cursor: backfill, then keep them out
+        op.execute(
+            f"UPDATE {table} SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"
+        )
+        op.alter_column(
+            table, "created_at", existing_type=sa.DateTime(), nullable=False
+        )
+
+    # CONCURRENTLY does not lock writes but can not run inside a transaction.
+    # A failed build leaves an INVALID index behind: drop it before retrying.
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f"ix_{table}_created_at_id",
+                table,
+                ["created_at", "id"],
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(
+                f"ix_{table}_created_at_id",
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+
+    for table in TABLES:
+        op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=True)
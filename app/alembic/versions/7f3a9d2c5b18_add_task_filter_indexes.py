@@ -0,0 +1,66 @@
+"""add task filter indexes
+
+Revision ID: 7f3a9d2c5b18
+Revises: e2a4c6b8d0f1
+Create Date: 2026-10-18 17:58:26.419307
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7f3a9d2c5b18"
+down_revision: Union[str, Sequence[str], None] = "e2a4c6b8d0f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# - GET /tasks?status=... per owner
+# - GET /tasks?updated_after=... or sort=updated_at per owner
+# - open tasks by priority per owner, partial: done tasks are never indexed
+OPEN_TASK = sa.text("status <> 'DONE'")
+INDEXES = [
+    (
+        "ix_tasks_owner_id_status_created_at_id",
+        ["owner_id", "status", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_tasks_owner_id_updated_at_created_at_id",
+        ["owner_id", "updated_at", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_tasks_open_owner_id_priority_created_at_id",
+        ["owner_id", "priority", "created_at", "id"],
+        OPEN_TASK,
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY does not lock writes but can not run inside a transaction.
+    # A failed build leaves an INVALID index behind: drop it before retrying.
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                "tasks",
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                sqlite_where=where,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name="tasks",
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,44 @@
+"""add hot path indexes
+
+Revision ID: 8c41d0a7e6f2
+Revises: 3b7e2f91c4d5
+Create Date: 2026-10-18 10:47:03.518260
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41d0a7e6f2"
+down_revision: Union[str, Sequence[str], None] = "3b7e2f91c4d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# - tasks listed per owner, ordered and sought on (created_at, id)
+# - Company.employees joins on users.company_id
+# Lookups on (id, owner_id) are served by the tasks primary key
+INDEXES = [
+    ("ix_tasks_owner_id_created_at_id", "tasks", ["owner_id", "created_at", "id"]),
+    ("ix_users_company_id", "users", ["company_id"]),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY does not lock writes but can not run inside a transaction.
+    # A failed build leaves an INVALID index behind: drop it before retrying.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
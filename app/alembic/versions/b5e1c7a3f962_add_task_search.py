@@ -0,0 +1,77 @@
+"""add task search
+
+Revision ID: b5e1c7a3f962
+Revises: 7f3a9d2c5b18
+Create Date: 2026-10-18 18:34:51.086147
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e1c7a3f962"
+down_revision: Union[str, Sequence[str], None] = "7f3a9d2c5b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        upgrade_sqlite()
+        return
+
+    # A stored generated column rewrites the table under an exclusive lock,
+    # schedule this revision off-peak on large tables
+    op.execute(
+        """ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(summary, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED"""
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_tasks_search_vector "
+            "ON tasks USING GIN (search_vector)"
+        )
+
+
+def upgrade_sqlite() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE tasks_fts USING fts5(id UNINDEXED, summary, description)"
+    )
+    op.execute(
+        "INSERT INTO tasks_fts (id, summary, description) "
+        "SELECT id, summary, description FROM tasks"
+    )
+    op.execute(
+        """CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (id, summary, description)
+            VALUES (new.id, new.summary, new.description);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER tasks_fts_update AFTER UPDATE OF summary, description
+        ON tasks BEGIN
+            UPDATE tasks_fts SET summary = new.summary, description = new.description
+            WHERE id = new.id;
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            DELETE FROM tasks_fts WHERE id = old.id;
+        END"""
+    )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        for trigger in ["tasks_fts_insert", "tasks_fts_update", "tasks_fts_delete"]:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_search_vector")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
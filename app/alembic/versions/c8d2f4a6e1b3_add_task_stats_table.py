@@ -0,0 +1,50 @@
+"""add task stats table
+
+Revision ID: c8d2f4a6e1b3
+Revises: b5e1c7a3f962
+Create Date: 2026-10-18 20:12:07.418230
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from common.enums import TaskPriority, TaskStatus
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c8d2f4a6e1b3"
+down_revision: Union[str, Sequence[str], None] = "b5e1c7a3f962"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The enum types come with the tasks table
+    op.create_table(
+        "task_stats",
+        sa.Column("owner_id", sa.UUID, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column(
+            "status",
+            postgresql.ENUM(TaskStatus, name="taskstatus", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column(
+            "priority",
+            postgresql.ENUM(TaskPriority, name="taskpriority", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column("count", sa.Integer, nullable=False, server_default="0"),
+    )
+    # Task writes keep it from here on, tasks written while this runs are
+    # picked up by `python -m commands.task_stats rebuild`
+    op.execute(
+        "INSERT INTO task_stats (owner_id, status, priority, count) "
+        "SELECT owner_id, status, priority, count(*) FROM tasks "
+        "WHERE owner_id IS NOT NULL GROUP BY owner_id, status, priority"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("task_stats")
@@ -0,0 +1,39 @@
+"""add task throughput table
+
+Revision ID: d4f6a8c0e2b5
+Revises: c8d2f4a6e1b3
+Create Date: 2026-10-18 21:03:44.905117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from common.enums import ThroughputGrain
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f6a8c0e2b5"
+down_revision: Union[str, Sequence[str], None] = "c8d2f4a6e1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Past buckets are filled by `python -m commands.task_throughput backfill`
+    op.create_table(
+        "task_throughput",
+        sa.Column(
+            "company_id", sa.UUID, sa.ForeignKey("companies.id"), primary_key=True
+        ),
+        sa.Column("grain", sa.Enum(ThroughputGrain), primary_key=True),
+        sa.Column("bucket", sa.DateTime, primary_key=True),
+        sa.Column("created", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("completed", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("task_throughput")
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("DROP TYPE throughputgrain")
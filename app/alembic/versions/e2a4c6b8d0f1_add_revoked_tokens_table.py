@@ -0,0 +1,35 @@
+"""add revoked tokens table
+
+Revision ID: e2a4c6b8d0f1
+Revises: 5d0e6b8a9c13
+Create Date: 2026-10-18 16:41:12.730954
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a4c6b8d0f1"
+down_revision: Union[str, Sequence[str], None] = "5d0e6b8a9c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("id", sa.UUID, primary_key=True, nullable=False),
+        sa.Column("user_id", sa.UUID, nullable=True),
+        sa.Column("expires_at", sa.DateTime, nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    op.create_index("ix_revoked_tokens_created_at", "revoked_tokens", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revoked_tokens_created_at", table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
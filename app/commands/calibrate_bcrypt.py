@@ -0,0 +1,57 @@
+"""Measure bcrypt on this host and recommend BCRYPT_ROUNDS for a login budget
+
+Every extra round doubles the hashing time, the recommended cost is the
+highest one whose median hash time stays within `--target-ms`.
+
+Usage (from app/):
+    python -m commands.calibrate_bcrypt --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+
+from common.bcrypt_worker import make_bcrypt_context
+from settings import BCRYPT_ROUNDS
+
+
+def measure(rounds: int, samples: int) -> float:
+    context = make_bcrypt_context(rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-Password1")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def calibrate(target_ms: float, samples: int, min_rounds: int, max_rounds: int):
+    results, recommended = [], min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = measure(rounds, samples)
+        results.append((rounds, elapsed))
+        if elapsed > target_ms:
+            break
+        recommended = rounds
+    return results, recommended
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--min-rounds", type=int, default=4)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    args = parser.parse_args()
+
+    results, recommended = calibrate(
+        args.target_ms, args.samples, args.min_rounds, args.max_rounds
+    )
+    for rounds, elapsed in results:
+        marker = " <- current" if rounds == BCRYPT_ROUNDS else ""
+        print(f"rounds {rounds:2d}: {elapsed:9.1f} ms{marker}")
+    print(f"Recommended BCRYPT_ROUNDS={recommended} for {args.target_ms:g} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Check the task_stats counters against the tasks table, or rebuild them
+
+`check` prints the groups whose counter drifted from the tasks and exits
+with 1 when there is any, for a scheduled job to alert on. `rebuild`
+recomputes every counter from the tasks; on Postgres the task writes wait
+for it to commit.
+
+Usage (from app/):
+    python -m commands.task_stats check
+    python -m commands.task_stats rebuild
+"""
+
+import argparse
+import sys
+
+import database
+from services.task_stats import check_task_stats, rebuild_task_stats
+from sqlalchemy.orm import Session
+
+
+def run(command: str, db: Session) -> int:
+    """Exit code of `command`"""
+    if command == "rebuild":
+        groups = rebuild_task_stats(db)
+        print(f"Rebuilt {groups} task stats groups")
+        return 0
+
+    mismatches = check_task_stats(db)
+    for mismatch in mismatches:
+        print(
+            f"owner {mismatch['owner_id']} "
+            f"{mismatch['status'].value}/{mismatch['priority'].value}: "
+            f"counted {mismatch['expected']}, stored {mismatch['actual']}"
+        )
+    print(f"{len(mismatches)} task stats groups out of date")
+    return 1 if mismatches else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args()
+
+    database.init_engine()
+    with database.SessionLocal() as db:
+        sys.exit(run(args.command, db))
+
+
+if __name__ == "__main__":
+    main()
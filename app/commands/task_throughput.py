@@ -0,0 +1,34 @@
+"""Backfill the task_throughput rollup from the tasks table
+
+Recomputes every hour and day bucket before `--until` (a day, default
+today); buckets from that day on are left to the task services. Done tasks
+count as completed at their last update. Run it once the rollup is
+deployed, with the deployment day or later; on Postgres the task writes
+wait for it to commit.
+
+Usage (from app/):
+    python -m commands.task_throughput backfill --until 2026-10-18
+"""
+
+import argparse
+from datetime import date, datetime
+
+import database
+from services.task_throughput import backfill_task_throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--until", type=date.fromisoformat, default=date.today())
+    args = parser.parse_args()
+
+    database.init_engine()
+    with database.SessionLocal() as db:
+        until = datetime.combine(args.until, datetime.min.time())
+        buckets = backfill_task_throughput(db, until)
+    print(f"Backfilled {buckets} task throughput buckets before {args.until}")
+
+
+if __name__ == "__main__":
+    main()
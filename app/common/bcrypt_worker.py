@@ -0,0 +1,44 @@
+"""bcrypt jobs of PasswordHasher, run in its worker processes
+
+Imports passlib only: a spawned worker unpickles the job by importing this
+module, never settings, fastapi or the rest of the app. The cost is set by
+`configure`, from the pool initializer in a worker and from common.hashing
+in the app process.
+"""
+
+from typing import Optional
+
+from passlib.context import CryptContext
+
+
+def make_bcrypt_context(rounds: int) -> CryptContext:
+    # min = max = default: any other cost is reported by needs_update
+    return CryptContext(
+        schemes=["bcrypt"],
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+bcrypt_context: Optional[CryptContext] = None
+
+
+def configure(rounds: int):
+    global bcrypt_context
+    bcrypt_context = make_bcrypt_context(rounds)
+
+
+def hash_password(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt_context.verify(plain_password, hashed_password)
+
+
+def check_password_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Verify, and hash again at the configured cost when it changed"""
+    return bcrypt_context.verify_and_update(plain_password, hashed_password)
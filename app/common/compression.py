@@ -0,0 +1,133 @@
+import zlib
+from typing import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# zlib wbits of the gzip container
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def media_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """`gzip` or `*` listed in Accept-Encoding without `q=0`"""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().removeprefix("q=").strip() or "1"
+        try:
+            return float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def weaken_etag(headers: MutableHeaders):
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """gzip responses of an allowed content type to clients accepting it
+
+    Bodies sent at once are compressed from `minimum_size` bytes on. Streamed
+    bodies (`more_body`) are always compressed and every chunk is flushed with
+    Z_SYNC_FLUSH, the client decodes the rows of an export as they arrive
+    instead of when zlib's window fills up. Responses already carrying a
+    Content-Encoding are left alone. The ETag of a compressed response is made
+    weak: the bytes differ from the identity one, If-None-Match still matches.
+    A client accepting gzip gets the weak ETag on every response that could be
+    compressed, small bodies and 304s included, so it never holds two
+    validators for one representation.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        level: int = 6,
+        content_types: Iterable[str] = ("application/json",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.content_types = frozenset(media_type(value) for value in content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not accepts_gzip(
+            Headers(scope=scope).get("accept-encoding", "")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, GzipSender(self, send))
+
+
+class GzipSender:
+    """`send` of one response, decides on its first body message"""
+
+    def __init__(self, middleware: CompressionMiddleware, send: Send):
+        self.middleware = middleware
+        self.send = send
+        self.start: Message | None = None
+        self.compressor = None
+
+    async def __call__(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body tells whether to compress
+            self.start = message
+            return
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if message["type"] == "http.response.body":
+                self.begin(start, message)
+            await self.send(start)
+
+        if self.compressor is not None and message["type"] == "http.response.body":
+            message = {**message, "body": self.compress(message)}
+        await self.send(message)
+
+    def begin(self, start: Message, message: Message):
+        headers = MutableHeaders(scope=start)
+        if "content-encoding" in headers:
+            return
+        if start["status"] == 304:
+            # No content type to go by, the 200 it stands for had a weak ETag
+            weaken_etag(headers)
+            return
+        if media_type(headers.get("content-type", "")) not in (
+            self.middleware.content_types
+        ):
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        weaken_etag(headers)
+        streaming = message.get("more_body", False)
+        if (
+            not streaming
+            and len(message.get("body", b"")) < self.middleware.minimum_size
+        ):
+            return
+
+        self.compressor = zlib.compressobj(
+            self.middleware.level, zlib.DEFLATED, GZIP_WBITS
+        )
+        headers["Content-Encoding"] = "gzip"
+        if streaming:
+            del headers["Content-Length"]
+        else:
+            # Whole body known: compress it now for its Content-Length
+            message["body"] = self.compress(message)
+            headers["Content-Length"] = str(len(message["body"]))
+            self.compressor = None
+
+    def compress(self, message: Message) -> bytes:
+        mode = zlib.Z_SYNC_FLUSH if message.get("more_body", False) else zlib.Z_FINISH
+        body = self.compressor.compress(message.get("body", b""))
+        return body + self.compressor.flush(mode)
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+from common.executor import run_service
+
+logger = logging.getLogger(__name__)
+
+# Expired entries are dropped at most this often
+PURGE_INTERVAL = 60
+
+
+class BloomFilter:
+    """Fixed-size bloom filter sized for `capacity` keys at `error_rate`"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k positions out of a single 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class Denylist:
+    """Revoked token ids checked on every request without a database round trip
+
+    The bloom filter answers the common "not revoked" case, the exact set
+    confirms its positives. Entries are dropped once their token expired,
+    the bloom filter is rebuilt at the same time since it can not forget.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._entries: dict[str, float] = {}
+        # Position of the incremental refresh from the database
+        self.since = None
+        self.refreshed_at: Optional[float] = None
+        self.purged_at = clock()
+
+    def add(self, jti: str, expires_at: float):
+        if expires_at <= self._clock():
+            return
+        with self._lock:
+            self._entries[jti] = expires_at
+            self._bloom.add(jti)
+
+    def __contains__(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > self._clock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def purge(self, force: bool = True):
+        now = self._clock()
+        if not force and now - self.purged_at < PURGE_INTERVAL:
+            return
+
+        with self._lock:
+            self.purged_at = now
+            self._entries = {
+                jti: expires_at
+                for jti, expires_at in self._entries.items()
+                if expires_at > now
+            }
+            bloom = BloomFilter(max(self.capacity, len(self._entries)), self.error_rate)
+            for jti in self._entries:
+                bloom.add(jti)
+            self._bloom = bloom
+
+    def snapshot(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "since": self.since,
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+async def refresh_periodically(refresh: Callable, interval: float):
+    """Run `refresh` (sync or async) every `interval` seconds until cancelled"""
+    while True:
+        try:
+            await run_service(refresh)
+        except Exception:
+            logger.exception("Denylist refresh failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,235 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Optional, TypeVar
+from uuid import UUID
+
+from common.cache import TTLCache
+from common.executor import run_blocking
+from pydantic import BaseModel
+from settings import (
+    ENTITY_CACHE_NEGATIVE_TTL,
+    ENTITY_CACHE_SIZE,
+    ENTITY_CACHE_TTL,
+    ENTITY_CACHE_URL,
+)
+
+Dto = TypeVar("Dto", bound=BaseModel)
+
+# Cached in place of an entity that does not exist, a lookup returning it is
+# answered with a 404 without a query
+NOT_FOUND = "__not_found__"
+
+
+class MemoryBackend:
+    """Per-worker LRU + TTL store, values are kept as python objects"""
+
+    shared = False
+
+    def __init__(
+        self, maxsize: int, ttl: float, clock: Callable[[], float] = time.time
+    ):
+        self._clock = clock
+        self._cache = TTLCache(maxsize, ttl, clock=clock)
+
+    def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._cache.set(key, value, expires_at=self._clock() + ttl)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._cache.delete(key)
+
+    def clear(self):
+        self._cache.clear()
+
+    def snapshot(self) -> dict:
+        snapshot = self._cache.snapshot()
+        return {
+            "backend": "memory",
+            "size": snapshot["size"],
+            "maxsize": snapshot["maxsize"],
+            "evictions": snapshot["evictions"],
+            "expirations": snapshot["expirations"],
+        }
+
+
+class RedisBackend:
+    """Store shared by every worker, values are kept as JSON
+
+    Calls are blocking: the async services go through AsyncEntityCache, which
+    runs them on the threadpool. Eviction is left to the server
+    (`maxmemory-policy allkeys-lru`).
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "entity:"):
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        try:
+            import redis
+        except ImportError as error:
+            raise RuntimeError(
+                "ENTITY_CACHE_URL requires the redis package (pip install redis)"
+            ) from error
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key: str) -> Any:
+        return self._client.get(self._prefix + key)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._client.set(self._prefix + key, value, px=max(int(ttl * 1000), 1))
+
+    def delete(self, *keys: str):
+        if keys:
+            self._client.delete(*(self._prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self._prefix + "*"))
+        if keys:
+            self._client.delete(*keys)
+
+    def snapshot(self) -> dict:
+        return {"backend": "redis"}
+
+
+def entity_key(kind: str, entity_id: Any) -> str:
+    """`kind:<uuid>` with the id in canonical form
+
+    Path parameters may spell an uuid in upper case or without hyphens, they
+    must land on the key that writes invalidate.
+    """
+    try:
+        entity_id = UUID(str(entity_id))
+    except ValueError:
+        pass
+    return f"{kind}:{entity_id}"
+
+
+class EntityCache:
+    """Read-through cache of single entities (user, task, company DTOs)
+
+    Services look the entity up with `get()`, on a miss they query the
+    database and store the DTO with `set()` or `set_not_found()` for a 404,
+    unless the row came from a replica (`common.routing.read_from_replica`).
+    Every write path calls `invalidate()` after its commit, the next read on
+    this worker then sees the new row. Other workers see it once their entry
+    expires, unless the backend is shared.
+    """
+
+    def __init__(self, backend, ttl: float, negative_ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._stats: defaultdict[str, Counter] = defaultdict(Counter)
+
+    def _count(self, kind: str, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[kind][stat] += amount
+
+    def get(self, kind: str, entity_id: Any, dto: type[Dto]) -> Optional[Dto | str]:
+        """The cached DTO, NOT_FOUND for a cached 404 or None on a miss"""
+        value = self.backend.get(entity_key(kind, entity_id))
+        if value is None:
+            self._count(kind, "misses")
+            return None
+
+        if value == NOT_FOUND or value == NOT_FOUND.encode():
+            self._count(kind, "negative_hits")
+            return NOT_FOUND
+
+        self._count(kind, "hits")
+        if self.backend.shared:
+            return dto.model_validate_json(value)
+        return value
+
+    def set(self, kind: str, entity_id: Any, value: BaseModel):
+        if self.backend.shared:
+            value = value.model_dump_json()
+        self.backend.set(entity_key(kind, entity_id), value, self.ttl)
+
+    def set_not_found(self, kind: str, entity_id: Any):
+        if self.negative_ttl > 0:
+            self.backend.set(entity_key(kind, entity_id), NOT_FOUND, self.negative_ttl)
+
+    def invalidate(self, kind: str, *entity_ids: Any):
+        keys = [entity_key(kind, entity_id) for entity_id in entity_ids if entity_id]
+        if keys:
+            self.backend.delete(*keys)
+            self._count(kind, "invalidations", len(keys))
+
+    def clear(self):
+        self.backend.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            kinds = {}
+            for kind, stats in self._stats.items():
+                hits = stats["hits"] + stats["negative_hits"]
+                lookups = hits + stats["misses"]
+                kinds[kind] = {
+                    "hits": stats["hits"],
+                    "negative_hits": stats["negative_hits"],
+                    "misses": stats["misses"],
+                    "hit_ratio": (hits / lookups) if lookups else 0.0,
+                    "invalidations": stats["invalidations"],
+                }
+
+        return {
+            **self.backend.snapshot(),
+            "ttl": self.ttl,
+            "negative_ttl": self.negative_ttl,
+            "kinds": kinds,
+        }
+
+
+class AsyncEntityCache:
+    """EntityCache for the async services (DB_ASYNC_MODE)
+
+    A shared backend costs a network round trip per call, it runs on the
+    threadpool and the event loop keeps serving other requests meanwhile.
+    The memory backend is called inline, a thread hop would cost more.
+    """
+
+    def __init__(self, cache: EntityCache):
+        self.cache = cache
+
+    async def _call(self, method, *args):
+        if self.cache.backend.shared:
+            return await run_blocking(method, *args)
+        return method(*args)
+
+    async def get(self, kind: str, entity_id: Any, dto: type[Dto]):
+        return await self._call(self.cache.get, kind, entity_id, dto)
+
+    async def set(self, kind: str, entity_id: Any, value: BaseModel):
+        await self._call(self.cache.set, kind, entity_id, value)
+
+    async def set_not_found(self, kind: str, entity_id: Any):
+        await self._call(self.cache.set_not_found, kind, entity_id)
+
+    async def invalidate(self, kind: str, *entity_ids: Any):
+        await self._call(self.cache.invalidate, kind, *entity_ids)
+
+
+def make_backend(url: Optional[str], maxsize: int, ttl: float):
+    if url:
+        return RedisBackend.from_url(url)
+    return MemoryBackend(maxsize, ttl)
+
+
+entity_cache = EntityCache(
+    make_backend(ENTITY_CACHE_URL, ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL),
+    ttl=ENTITY_CACHE_TTL,
+    negative_ttl=ENTITY_CACHE_NEGATIVE_TTL,
+)
+# Same entries, awaited by the async services
+async_entity_cache = AsyncEntityCache(entity_cache)
@@ -23,3 +23,8 @@ class TaskPriority(NativeEnum):
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
+
+
+class ThroughputGrain(NativeEnum):
+    HOUR = "hour"
+    DAY = "day"
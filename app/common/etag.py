@@ -0,0 +1,42 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+from starlette import status
+
+
+def field(entity: Any, name: str) -> Any:
+    """Attribute of a DTO, ORM object or row, or key of its dict"""
+    if isinstance(entity, dict):
+        return entity.get(name)
+    return getattr(entity, name, None)
+
+
+def version(entity: Any) -> str:
+    """`id@updated_at`, created_at stands in for rows never updated"""
+    changed_at = field(entity, "updated_at") or field(entity, "created_at")
+    return f"{field(entity, 'id')}@{changed_at}"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong validator over the parts the representation is derived from"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, a W/ prefix is ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,37 @@
+import inspect
+from functools import partial
+
+from anyio import CapacityLimiter, to_thread
+from anyio.lowlevel import RunVar
+from settings import SERVICE_THREADPOOL_SIZE
+
+# One limiter per event loop, separate from the default threadpool used by
+# FastAPI for sync dependencies so service calls can not starve them
+_service_limiter: RunVar[CapacityLimiter] = RunVar("service_limiter")
+
+
+def _get_limiter() -> CapacityLimiter:
+    try:
+        return _service_limiter.get()
+    except LookupError:
+        limiter = CapacityLimiter(SERVICE_THREADPOOL_SIZE)
+        _service_limiter.set(limiter)
+        return limiter
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call (sync DB query, bcrypt...) in the bounded threadpool"""
+    return await to_thread.run_sync(
+        partial(func, *args, **kwargs), limiter=_get_limiter()
+    )
+
+
+async def run_service(func, *args, **kwargs):
+    """Run a service function from an async route
+
+    Async services (DB_ASYNC_MODE) are awaited on the event loop, blocking
+    ones are pushed to the threadpool so they never stall other requests.
+    """
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await run_blocking(func, *args, **kwargs)
@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterable, Literal
+from uuid import UUID
+
+from sqlalchemy import TypeDecorator
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+_CONVERTERS = {UUID: str, datetime: datetime.isoformat}
+
+
+def _converter(column):
+    type = column.type
+    if isinstance(type, TypeDecorator):
+        type = type.impl_instance
+
+    python_type = type.python_type
+    if issubclass(python_type, Enum):
+        return lambda value: value.value
+    return _CONVERTERS.get(python_type)
+
+
+class RowSerializer:
+    """Render chunks of column rows as NDJSON or CSV
+
+    Converters are picked once per column from its type instead of
+    inspecting every value.
+    """
+
+    def __init__(self, columns: list, format: ExportFormat):
+        self.keys = [column.key for column in columns]
+        self.converters = [_converter(column) for column in columns]
+        self.format = format
+        self.header = format == "csv"
+
+    def _plain(self, row) -> list:
+        return [
+            value if value is None or convert is None else convert(value)
+            for value, convert in zip(row, self.converters)
+        ]
+
+    def __call__(self, rows: Iterable) -> bytes:
+        if self.format == "ndjson":
+            keys = self.keys
+            return "".join(
+                json.dumps(dict(zip(keys, self._plain(row))), ensure_ascii=False) + "\n"
+                for row in rows
+            ).encode()
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if self.header:
+            writer.writerow(self.keys)
+            self.header = False
+        writer.writerows(self._plain(row) for row in rows)
+        return buffer.getvalue().encode()
@@ -0,0 +1,76 @@
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, create_model
+from sqlalchemy import inspect
+
+FIELDS_DESCRIPTION = (
+    "Sparse fieldset: comma separated DTO fields to return, e.g. "
+    "`fields=id,summary,status`. Only those columns are read from the database. "
+    "Every field is returned without it, leave out large text columns such as "
+    "`description` to skip reading them."
+)
+
+# Read on every list path whatever the fieldset: keyset cursors seek on
+# (created_at, id) and ETags hash id@updated_at. Not serialized unless asked for
+HIDDEN_FIELDS = ("id", "created_at", "updated_at")
+
+
+def list_fields(model: type[BaseModel]) -> tuple:
+    """Default fieldset of a list endpoint: the full DTO, trimming is opt-in"""
+    return tuple(model.model_fields)
+
+
+def parse_fields(value: Optional[str], model: type[BaseModel], default: tuple):
+    """`fields=a,b` as a tuple in the DTO's field order, 400 on unknown names"""
+    if value is None:
+        return default
+
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - model.model_fields.keys()
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid fields: {', '.join(sorted(unknown))}"
+        )
+
+    return tuple(name for name in model.model_fields if name in names)
+
+
+def projection(entity, fields: tuple) -> list:
+    """Mapped columns to read for `fields`, relationships are loaded apart"""
+    columns = inspect(entity).columns.keys()
+    return [
+        getattr(entity, name)
+        for name in columns
+        if name in fields or name in HIDDEN_FIELDS
+    ]
+
+
+@lru_cache(maxsize=256)
+def sparse_model(
+    model: type[BaseModel], fields: tuple, nested: tuple = ()
+) -> type[BaseModel]:
+    """`model` restricted to `fields`, validated and serialized like it
+
+    `nested` replaces the annotation of embedded collections, e.g.
+    `(("tasks", list[SparseTaskDto]),)`, so they follow their own fieldset.
+    """
+    annotations = dict(nested)
+    definitions = {}
+    for name, info in model.model_fields.items():
+        if name in fields:
+            definitions[name] = (annotations.get(name, info.annotation), info)
+        elif name in HIDDEN_FIELDS:
+            definitions[name] = (info.annotation, Field(default=None, exclude=True))
+
+    return create_model(
+        model.__name__,
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=256)
+def sparse_list(model: type[BaseModel], fields: tuple, nested: tuple = ()):
+    return TypeAdapter(list[sparse_model(model, fields, nested)])
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Optional
+
+from common import bcrypt_worker
+from common.executor import run_blocking
+from fastapi import HTTPException
+from settings import BCRYPT_ROUNDS
+
+# Inline runs (workers=0) use the same functions as the worker processes
+bcrypt_worker.configure(BCRYPT_ROUNDS)
+
+
+class PasswordHasher:
+    """Send bcrypt work to a process pool with a bounded number of pending jobs
+
+    Once `max_pending` jobs are queued or running, new ones are refused with
+    a 503 and a Retry-After header instead of queueing behind the others.
+    With `workers=0` bcrypt runs inline in the calling thread.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Jobs are common.bcrypt_worker functions: a spawned worker
+                # imports that module, passlib and nothing of the app
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=bcrypt_worker.configure,
+                    initargs=(BCRYPT_ROUNDS,),
+                )
+            return self._executor
+
+    def _release(self, _=None):
+        with self._lock:
+            self.pending -= 1
+
+    def _admit(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many password operations in flight",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self.pending += 1
+
+    def submit(self, func, *args) -> Future:
+        executor = self._get_executor()
+        self._admit()
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, func, *args):
+        """Blocking call, for the sync services running in the threadpool"""
+        if self.workers <= 0:
+            self._admit()
+            try:
+                return func(*args)
+            finally:
+                self._release()
+        return self.submit(func, *args).result()
+
+    async def run_async(self, func, *args):
+        """Awaitable call, the event loop stays free while bcrypt runs"""
+        if self.workers <= 0:
+            self._admit()
+            try:
+                return await run_blocking(func, *args)
+            finally:
+                self._release()
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at: datetime, id) -> str:
+    payload = json.dumps([created_at.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(query, model, cursor: Optional[str], limit: int):
+    """Seek past `cursor` on (created_at, id), works on Query and Select
+
+    One extra row is fetched to know whether a next page exists.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) > (created_at, id))
+
+    return query.order_by(model.created_at, model.id).limit(limit + 1)
+
+
+def split_page(rows, limit: int) -> tuple[list, Optional[str]]:
+    """Drop the look-ahead row and build the cursor of the next page"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.created_at, last.id)
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+CURSOR_DESCRIPTION = (
+    "Opt-in keyset pagination: send an empty cursor for the first page, then the "
+    f"value of the {NEXT_CURSOR_HEADER} response header (absent on the last page). "
+    "`page` is ignored in this mode."
+)
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+TOTAL_DESCRIPTION = (
+    f"Opt-in total of the list in the {TOTAL_COUNT_HEADER} response header. Owner "
+    "scoped lists and small totals are counted exactly, large ones are the "
+    "planner's estimate or a lower bound (the exact limit + 1): "
+    f"{TOTAL_ESTIMATED_HEADER} is then `true`."
+)
+
+
+def total_headers(total: int, estimated: bool) -> dict[str, str]:
+    return {
+        TOTAL_COUNT_HEADER: str(total),
+        TOTAL_ESTIMATED_HEADER: "true" if estimated else "false",
+    }
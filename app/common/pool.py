@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+_metrics_hooks: list[Callable[[dict], None]] = []
+
+
+def register_pool_metrics_hook(hook: Callable[[dict], None]):
+    """Register a callback receiving the pool status after every checkout
+
+    The payload is `get_pool_status()` plus the `wait` (seconds) of that
+    checkout, ready to be pushed to statsd, Prometheus, logs...
+    """
+    _metrics_hooks.append(hook)
+
+
+def unregister_pool_metrics_hook(hook: Callable[[dict], None]):
+    if hook in _metrics_hooks:
+        _metrics_hooks.remove(hook)
+
+
+class PoolMetrics:
+    """Checkout wait-time counters of a single pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (self.total_wait / waits * 1000) if waits else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class _MonitoredPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+
+        wait = time.perf_counter() - started
+        self.metrics.record(wait)
+        if _metrics_hooks:
+            status = {**get_pool_status(self), "wait": wait}
+            for hook in _metrics_hooks:
+                hook(status)
+        return connection
+
+
+class MonitoredQueuePool(_MonitoredPoolMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(_MonitoredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_status(pool: Pool) -> dict:
+    """Connections checked out, idle and in overflow, plus wait-time metrics"""
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # overflow() starts at -size until the pool is filled
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        )
+    if isinstance(pool, _MonitoredPoolMixin):
+        status.update(pool.metrics.snapshot())
+    return status
@@ -0,0 +1,17 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON encoded by pydantic-core in a single pass
+
+    The default response class of the app. Returned directly by a route with
+    DTOs its service already validated, it also skips FastAPI's response_model
+    pass (validate again, dump to dicts, then encode), so only DTOs belong in
+    it: nothing filters the fields of what is passed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -0,0 +1,169 @@
+import math
+import random
+import time
+
+from settings import DB_READ_YOUR_WRITES_SECONDS
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# user id -> monotonic time of the last committed write, kept per worker
+_last_writes: dict[str, float] = {}
+_MAX_TRACKED_WRITERS = 10_000
+
+# Unix time of the client's last write, sent back by ReadYourWritesMiddleware
+# so that any worker can keep its reads on the primary
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def mark_write(user_id: str):
+    now = time.monotonic()
+    _last_writes[str(user_id)] = now
+    if len(_last_writes) > _MAX_TRACKED_WRITERS:
+        for key, written_at in list(_last_writes.items()):
+            if now - written_at > DB_READ_YOUR_WRITES_SECONDS:
+                _last_writes.pop(key, None)
+
+
+def wrote_recently(user_id) -> bool:
+    if not user_id or DB_READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    written_at = _last_writes.get(str(user_id))
+    return (
+        written_at is not None
+        and time.monotonic() - written_at < DB_READ_YOUR_WRITES_SECONDS
+    )
+
+
+def client_wrote_recently(request) -> bool:
+    """The request echoes a last write (header or cookie) still in the window"""
+    if request is None or DB_READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    headers, cookies = getattr(request, "headers", {}), getattr(request, "cookies", {})
+    try:
+        written_at = float(
+            headers.get(LAST_WRITE_HEADER) or cookies.get(LAST_WRITE_COOKIE) or ""
+        )
+    except ValueError:
+        return False
+    # A forged value can only send its own reads to the primary
+    return time.time() - written_at < DB_READ_YOUR_WRITES_SECONDS
+
+
+def _request_user_id(session: Session):
+    request = session.info.get("request")
+    return getattr(request.state, "user_id", None) if request else None
+
+
+def _reads_own_writes(session: Session) -> bool:
+    return wrote_recently(_request_user_id(session)) or client_wrote_recently(
+        session.info.get("request")
+    )
+
+
+class RoutingSession(Session):
+    """Session sending the SELECTs of read-only sessions to a replica
+
+    Sessions opened with info={"read_only": True} read from a random replica,
+    unless the requesting user committed a write less than
+    DB_READ_YOUR_WRITES_SECONDS ago: on this worker, or on any worker when the
+    client sends back the last write of ReadYourWritesMiddleware. Everything
+    else goes to the primary bind.
+    """
+
+    def __init__(self, *args, replicas=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = list(replicas)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.replicas
+            and self.info.get("read_only")
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and not _reads_own_writes(self)
+        ):
+            self.info["replica_read"] = True
+            return random.choice(self.replicas)
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def read_from_replica(session) -> bool:
+    """Whether a SELECT of the session was answered by a replica
+
+    Replicas may lag behind the primary: what they return is good for the
+    current response, it must not be cached for the following ones.
+    """
+    session = getattr(session, "sync_session", session)
+    return session.info.get("replica_read", False)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flag_flush(session, _):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _flag_dml(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _track_write(session):
+    if not session.info.pop("wrote", False):
+        return
+    user_id = _request_user_id(session)
+    if user_id:
+        mark_write(user_id)
+    request = session.info.get("request")
+    if request is not None:
+        request.state.last_write = time.time()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+class ReadYourWritesMiddleware:
+    """Hand the time of a committed write back to the client
+
+    `_last_writes` only covers the worker that served the write. The response
+    of a request that wrote carries the time in a cookie and in the
+    X-Last-Write header: a browser sends the cookie back, API clients echo the
+    header, and whichever worker gets the next read keeps it on the primary.
+    Worker clocks are compared, they must be kept in sync (NTP).
+    """
+
+    def __init__(self, app: ASGIApp, window: float):
+        self.app = app
+        self.max_age = math.ceil(window)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Shared with request.state, where _track_write records the write
+        state = HTTPConnection(scope).state
+
+        async def send_last_write(message: Message):
+            written_at = getattr(state, "last_write", None)
+            if message["type"] == "http.response.start" and written_at:
+                headers = MutableHeaders(scope=message)
+                headers[LAST_WRITE_HEADER] = repr(written_at)
+                cookie = f"{LAST_WRITE_COOKIE}={written_at!r}; Max-Age={self.max_age}"
+                headers.append(
+                    "Set-Cookie", f"{cookie}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_last_write)
@@ -1,5 +1,23 @@
-from settings import SQLALCHEMY_DATABASE_URL
-from sqlalchemy import create_engine
+from functools import partial
+
+from common.pool import MonitoredAsyncQueuePool, MonitoredQueuePool, get_pool_status
+from common.routing import RoutingSession
+from fastapi import Request
+from settings import (
+    DB_ASYNC_MODE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_USE_LIFO,
+    DB_REPLICA_ASYNC_URLS,
+    DB_REPLICA_URLS,
+    SQLALCHEMY_DATABASE_URL,
+    SQLALCHEMY_DATABASE_URL_ASYNC,
+)
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -7,21 +25,148 @@ Base = declarative_base()
 metadata = Base.metadata
 
 engine = None
+replica_engines = []
 SessionLocal = None
 
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+
+
+def get_pool_options(url: str, async_mode: bool = False) -> dict:
+    """Pool settings from the environment, SQLite keeps its default pools"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+
+    return {
+        "poolclass": MonitoredAsyncQueuePool if async_mode else MonitoredQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": DB_POOL_USE_LIFO,
+    }
+
 
-def init_engine():
-    global engine, SessionLocal
+def init_engine(
+    url: str = SQLALCHEMY_DATABASE_URL, replica_urls: list[str] = DB_REPLICA_URLS
+):
+    global engine, replica_engines, SessionLocal
     if engine is None:
-        engine = create_engine(SQLALCHEMY_DATABASE_URL)
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        engine = create_engine(url, **get_pool_options(url))
+        replica_engines = [
+            create_engine(replica_url, **get_pool_options(replica_url))
+            for replica_url in replica_urls
+        ]
+        SessionLocal = sessionmaker(
+            class_=RoutingSession,
+            autocommit=False,
+            autoflush=False,
+            bind=engine,
+            replicas=replica_engines,
+        )
+
+
+def init_async_engine(
+    url: str = SQLALCHEMY_DATABASE_URL_ASYNC,
+    replica_urls: list[str] = DB_REPLICA_ASYNC_URLS,
+):
+    global async_engine, async_replica_engines, AsyncSessionLocal
+    if async_engine is None:
+        async_engine = create_async_engine(
+            url, **get_pool_options(url, async_mode=True)
+        )
+        async_replica_engines = [
+            create_async_engine(
+                replica_url, **get_pool_options(replica_url, async_mode=True)
+            )
+            for replica_url in replica_urls
+        ]
+        # Objects must stay readable after commit: there is no implicit IO in async mode
+        AsyncSessionLocal = async_sessionmaker(
+            bind=async_engine,
+            sync_session_class=RoutingSession,
+            autoflush=False,
+            expire_on_commit=False,
+            replicas=[replica.sync_engine for replica in async_replica_engines],
+        )
+
+
+def get_db_context(request: Request):
+    if SessionLocal is None:
+        init_engine()
+    session = SessionLocal(info={"request": request})
+    try:
+        yield session
+    finally:
+        session.close()
 
 
-def get_db_context():
+def get_read_db_context(request: Request):
+    """Session for read-only service calls, served by a replica when configured"""
     if SessionLocal is None:
         init_engine()
-    session = SessionLocal()
+    session = SessionLocal(info={"request": request, "read_only": True})
     try:
         yield session
     finally:
         session.close()
+
+
+def get_read_db_factory(request: Request):
+    """Opens read-only sessions for work outliving the request dependencies,
+    such as a streamed response: the caller closes them"""
+    if SessionLocal is None:
+        init_engine()
+    return partial(SessionLocal, info={"request": request, "read_only": True})
+
+
+def get_pools_status() -> dict:
+    return {
+        "sync": get_pool_status(engine.pool) if engine else None,
+        "async": (
+            get_pool_status(async_engine.sync_engine.pool) if async_engine else None
+        ),
+        "replicas": [get_pool_status(replica.pool) for replica in replica_engines],
+        "async_replicas": [
+            get_pool_status(replica.sync_engine.pool)
+            for replica in async_replica_engines
+        ],
+    }
+
+
+async def get_async_db_context(request: Request):
+    if AsyncSessionLocal is None:
+        init_async_engine()
+    session = AsyncSessionLocal(info={"request": request})
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_async_read_db_context(request: Request):
+    if AsyncSessionLocal is None:
+        init_async_engine()
+    session = AsyncSessionLocal(info={"request": request, "read_only": True})
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def get_async_read_db_factory(request: Request):
+    if AsyncSessionLocal is None:
+        init_async_engine()
+    return partial(AsyncSessionLocal, info={"request": request, "read_only": True})
+
+
+# Session dependencies used by the routers, selected by DB_ASYNC_MODE
+get_session_context = get_async_db_context if DB_ASYNC_MODE else get_db_context
+get_read_session_context = (
+    get_async_read_db_context if DB_ASYNC_MODE else get_read_db_context
+)
+get_read_session_factory = (
+    get_async_read_db_factory if DB_ASYNC_MODE else get_read_db_factory
+)
@@ -1,14 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import services.aio.auth as async_auth_service
+import services.auth as sync_auth_service
+from common.compression import CompressionMiddleware
+from common.denylist import refresh_periodically
+from common.responses import FastJSONResponse
+from common.routing import ReadYourWritesMiddleware
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from routers import auth, company, task, user
+from routers import admin, auth, company, task, user
+from settings import (
+    COMPRESSION_CONTENT_TYPES,
+    COMPRESSION_LEVEL,
+    COMPRESSION_MINIMUM_SIZE,
+    DB_ASYNC_MODE,
+    DB_READ_YOUR_WRITES_SECONDS,
+    REVOCATION_REFRESH_SECONDS,
+)
 from starlette import status
 
-app = FastAPI()
+auth_service = async_auth_service if DB_ASYNC_MODE else sync_auth_service
+
+
+@asynccontextmanager
+async def lifespan(_):
+    refresher = None
+    if REVOCATION_REFRESH_SECONDS > 0:
+        refresher = asyncio.create_task(
+            refresh_periodically(
+                auth_service.refresh_denylist, REVOCATION_REFRESH_SECONDS
+            )
+        )
+    yield
+    if refresher is not None:
+        refresher.cancel()
+
 
-for module in [auth, user, company, task]:
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+for module in [auth, user, company, task, admin]:
     app.include_router(module.router)
 
+if DB_READ_YOUR_WRITES_SECONDS > 0:
+    app.add_middleware(ReadYourWritesMiddleware, window=DB_READ_YOUR_WRITES_SECONDS)
+
+if COMPRESSION_LEVEL > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        level=COMPRESSION_LEVEL,
+        content_types=COMPRESSION_CONTENT_TYPES,
+    )
+
 
 @app.get("/", status_code=status.HTTP_200_OK)
 def health_check():
@@ -28,6 +73,7 @@ async def http_exception_handler(_, exception):
     return JSONResponse(
         status_code=exception.status_code,
         content={"detail": "HTTP Request Error", "message": str(exception)},
+        headers=exception.headers,
     )
 
 
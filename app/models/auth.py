@@ -0,0 +1,25 @@
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RefreshTokenDto(BaseModel):
+    refresh_token: str = Field(min_length=1)
+
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={"example": {"refresh_token": "eyJhbGciOiJIUzI1NiJ9..."}},
+    )
+
+
+class TokenDto(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class LogoutDto(BaseModel):
+    refresh_token: Optional[str] = Field(default=None, min_length=1)
+
+    model_config = ConfigDict(extra="forbid")
@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
 from uuid import UUID as NativeUUID
 
-from common.enums import TaskPriority, TaskStatus
-from pydantic import BaseModel, ConfigDict, Field
+from common.enums import TaskPriority, TaskStatus, ThroughputGrain
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 
 
 class CreateTaskDto(BaseModel):
@@ -44,6 +44,82 @@ class UpdateTaskDto(BaseModel):
     )
 
 
+class TaskFilterDto(BaseModel):
+    ids: Optional[list[NativeUUID]] = Field(default=None, min_length=1)
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    created_before: Optional[datetime] = None
+
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={
+            "example": {
+                "status": "todo",
+                "priority": "low",
+                "created_before": "2025-01-01T00:00:00",
+            }
+        },
+    )
+
+
+# Columns GET /tasks can be sorted on, a `-` prefix sorts descending
+TASK_SORT_FIELDS = ("created_at", "updated_at", "priority", "status")
+
+
+class TaskQueryDto(BaseModel):
+    """Filters and sort of GET /tasks, sent as query parameters"""
+
+    status: Optional[list[TaskStatus]] = None
+    priority: Optional[list[TaskPriority]] = None
+    open: Optional[bool] = Field(
+        default=None, description="`true` for tasks not done, `false` for done ones"
+    )
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    owner_id: Optional[NativeUUID] = Field(default=None, description="Admin only")
+    sort: Optional[str] = Field(
+        default=None,
+        description=f"Comma separated, among {', '.join(TASK_SORT_FIELDS)}. "
+        "Priority and status sort by rank, e.g. `sort=-priority,created_at`",
+    )
+
+    @field_validator("sort")
+    def validate_sort(cls, value):
+        if value is None:
+            return value
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = {name.removeprefix("-") for name in names} - set(TASK_SORT_FIELDS)
+        if not names or unknown:
+            raise ValueError(f"Sort fields must be among {', '.join(TASK_SORT_FIELDS)}")
+        return ",".join(names)
+
+    def sort_keys(self) -> list[tuple[str, bool]]:
+        """(field, descending) pairs, created_at when no sort is asked for"""
+        names = self.sort.split(",") if self.sort else ["created_at"]
+        return [(name.removeprefix("-"), name.startswith("-")) for name in names]
+
+
+class TaskChangeSetDto(BaseModel):
+    summary: Optional[str] = Field(default=None, min_length=1, max_length=500)
+    description: Optional[str] = Field(default=None, min_length=1, max_length=500)
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={"example": {"status": "done"}},
+    )
+
+
+class BulkUpdateTaskDto(BaseModel):
+    filter: TaskFilterDto
+    changes: TaskChangeSetDto
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class TaskDto(BaseModel):
     id: NativeUUID
     summary: Optional[str]
@@ -56,3 +132,50 @@ class TaskDto(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# One validation pass for a whole page of rows
+TaskDtoList = TypeAdapter(list[TaskDto])
+
+
+class BulkTaskResultDto(BaseModel):
+    index: int
+    status: Literal["created", "invalid"]
+    id: Optional[NativeUUID] = None
+    errors: Optional[list[Any]] = None
+
+
+class BulkCreateTaskResultDto(BaseModel):
+    created: int
+    invalid: int
+    results: list[BulkTaskResultDto]
+
+
+class BulkChangeTaskResultDto(BaseModel):
+    affected: int
+    ids: list[NativeUUID]
+
+
+class TaskStatsGroupDto(BaseModel):
+    status: TaskStatus
+    priority: TaskPriority
+    count: int
+
+
+class TaskStatsDto(BaseModel):
+    total: int
+    status: dict[TaskStatus, int]
+    priority: dict[TaskPriority, int]
+    groups: list[TaskStatsGroupDto]
+
+
+class TaskThroughputPointDto(BaseModel):
+    bucket: datetime
+    created: int
+    completed: int
+
+
+class TaskThroughputDto(BaseModel):
+    company_id: NativeUUID
+    grain: ThroughputGrain
+    points: list[TaskThroughputPointDto]
@@ -5,7 +5,7 @@ from typing import Optional
 from uuid import UUID as NativeUUID
 
 from models.task import TaskDto
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 
 
 class CreateUserDto(BaseModel):
@@ -71,3 +71,6 @@ class UserDto(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+UserDtoList = TypeAdapter(list[UserDto])
@@ -0,0 +1,43 @@
+import database
+from common.entity_cache import entity_cache
+from fastapi import APIRouter, Depends
+from services.auth import token_cache, token_interceptor, verify_admin
+from starlette import status
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get(
+    "/db-pool",
+    status_code=status.HTTP_200_OK,
+    description="""##
+    - Admin can see connection pool usage (checked out, idle, overflow, wait times)
+    - Normal user can not see pool statistics""",
+)
+async def get_db_pool_status(user=Depends(token_interceptor)):
+    verify_admin(user)
+    return database.get_pools_status()
+
+
+@router.get(
+    "/auth-cache",
+    status_code=status.HTTP_200_OK,
+    description="""##
+    - Admin can see the verified token cache of this worker (hits, misses, size)
+    - Normal user can not see cache statistics""",
+)
+async def get_auth_cache_status(user=Depends(token_interceptor)):
+    verify_admin(user)
+    return token_cache.snapshot()
+
+
+@router.get(
+    "/entity-cache",
+    status_code=status.HTTP_200_OK,
+    description="""##
+    - Admin can see the user/task/company cache of this worker (hit ratio, evictions)
+    - Normal user can not see cache statistics""",
+)
+async def get_entity_cache_status(user=Depends(token_interceptor)):
+    verify_admin(user)
+    return entity_cache.snapshot()
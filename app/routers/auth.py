@@ -1,25 +1,62 @@
-from datetime import timedelta
-
-from database import get_db_context
+import services.aio.auth as async_auth_service
+import services.auth as sync_auth_service
+from common.executor import run_service
+from database import get_session_context
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from services.auth import authenticate_user, create_access_token, create_hashed_password
-from sqlalchemy.orm import Session
+from models.auth import LogoutDto, RefreshTokenDto, TokenDto
+from services.auth import create_token_response, token_claims
+from settings import DB_ASYNC_MODE
+
+auth_service = async_auth_service if DB_ASYNC_MODE else sync_auth_service
+authenticate_user = auth_service.authenticate_user
+create_refresh_token = auth_service.create_refresh_token
+refresh_access_token = auth_service.refresh_access_token
+logout_user = auth_service.logout
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/login", status_code=status.HTTP_201_CREATED)
+@router.post("/login", status_code=status.HTTP_201_CREATED, response_model=TokenDto)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_session_context),
 ):
-    user = authenticate_user(
-        username=form_data.username, password=form_data.password, db=db
+    user = await run_service(
+        authenticate_user,
+        username=form_data.username,
+        password=form_data.password,
+        db=db,
     )
-    token = create_access_token(user=user, expires=timedelta(minutes=120))
+    refresh_token = await run_service(create_refresh_token, user=user, db=db)
+
+    return create_token_response(user, refresh_token)
+
 
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-    }
+@router.post(
+    "/refresh",
+    status_code=status.HTTP_201_CREATED,
+    response_model=TokenDto,
+    description="""##
+    - Exchange a refresh token for a new access token and refresh token
+    - The presented refresh token is rotated and can not be used again,
+      reusing it revokes every token issued from the same login""",
+)
+async def refresh(request: RefreshTokenDto, db=Depends(get_session_context)):
+    return await run_service(refresh_access_token, request.refresh_token, db=db)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_200_OK,
+    description="""##
+    - Revoke the access token of the request, on every worker within
+      `REVOCATION_REFRESH_SECONDS`
+    - Also revoke the given refresh token and the ones rotated from it""",
+)
+async def logout(
+    request: LogoutDto = LogoutDto(),
+    claims=Depends(token_claims),
+    db=Depends(get_session_context),
+):
+    return await run_service(logout_user, claims, request.refresh_token, db=db)
@@ -1,11 +1,21 @@
-import services.company as company_service
-from database import get_db_context
+from typing import Optional
+
+import services.aio.company as async_company_service
+import services.company as sync_company_service
+from common.executor import run_service
+from common.fields import FIELDS_DESCRIPTION
+from common.pagination import CURSOR_DESCRIPTION, NEXT_CURSOR_HEADER
+from common.responses import FastJSONResponse
+from database import get_read_session_context, get_session_context
 from fastapi import APIRouter, Depends, HTTPException, Query
 from models.company import CompanyDto, CreateCompanyDto, UpdateCompanyDto
 from services.auth import token_interceptor, verify_admin
-from sqlalchemy.orm import Session
+from services.company import company_fields
+from settings import DB_ASYNC_MODE
 from starlette import status
 
+company_service = async_company_service if DB_ASYNC_MODE else sync_company_service
+
 router = APIRouter(prefix="/companies", tags=["Company"])
 
 
@@ -17,13 +27,13 @@ router = APIRouter(prefix="/companies", tags=["Company"])
     - Admin can create company
     - Normal user can not create company""",
 )
-def create_company(
+async def create_company(
     request: CreateCompanyDto,
     user=Depends(token_interceptor),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_session_context),
 ):
     verify_admin(user)
-    return company_service.create_company(request, db)
+    return await run_service(company_service.create_company, request, db)
 
 
 @router.get(
@@ -32,16 +42,32 @@ def create_company(
     response_model=list[CompanyDto],
     description="""##
     - Admin can get all companies
-    - Normal user can not get all companies""",
+    - Normal user can not get all companies
+    - `fields` trims the companies, e.g. without `description`; all by default""",
 )
-def get_companies(
+async def get_companies(
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=10, ge=1),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
     user=Depends(token_interceptor),
-    db=Depends(get_db_context),
+    db=Depends(get_read_session_context),
 ):
     verify_admin(user)
-    return company_service.get_companies(page, limit, db)
+    fields = company_fields(fields)
+    headers = {}
+    if cursor is not None:
+        companies, next_cursor = await run_service(
+            company_service.get_companies_by_cursor, cursor, limit, db, fields=fields
+        )
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+    else:
+        companies = await run_service(
+            company_service.get_companies, page, limit, db, fields=fields
+        )
+
+    return FastJSONResponse(companies, headers=headers)
 
 
 @router.get(
@@ -50,14 +76,27 @@ def get_companies(
     response_model=CompanyDto,
     description="""##
     - Admin can get any company
-    - Normal user can get their company they are assigned to""",
+    - Normal user can get their company they are assigned to
+    - Employees are only embedded with `include_employees=true`, one page at a
+      time and without their tasks""",
 )
-def get_company_by_id(
+async def get_company_by_id(
     company_id: str,
+    include_employees: bool = Query(default=False),
+    employees_page: int = Query(default=1, ge=1),
+    employees_limit: int = Query(default=10, ge=1, le=100),
     user=Depends(token_interceptor),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_read_session_context),
 ):
-    return company_service.get_company_by_id(company_id, user, db)
+    return await run_service(
+        company_service.get_company_by_id,
+        company_id,
+        user,
+        db,
+        include_employees=include_employees,
+        employees_page=employees_page,
+        employees_limit=employees_limit,
+    )
 
 
 @router.put(
@@ -68,14 +107,14 @@ def get_company_by_id(
     - Admin can update any company
     - Normal user can not update company""",
 )
-def update_company(
+async def update_company(
     company_id: str,
     request: UpdateCompanyDto,
     user=Depends(token_interceptor),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_session_context),
 ):
     verify_admin(user)
-    return company_service.update_company(company_id, request, db)
+    return await run_service(company_service.update_company, company_id, request, db)
 
 
 @router.delete(
@@ -85,10 +124,10 @@ def update_company(
     - Admin can delete any company
     - Normal user can not delete company""",
 )
-def delete_company(
+async def delete_company(
     company_id: str,
     user=Depends(token_interceptor),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_session_context),
 ):
     verify_admin(user)
-    return company_service.delete_company(company_id, db)
+    return await run_service(company_service.delete_company, company_id, db)
@@ -1,10 +1,58 @@
-import services.task as task_service
-from database import get_db_context
-from fastapi import APIRouter, Depends, HTTPException, Query
-from models.task import CreateTaskDto, TaskDto, UpdateTaskDto
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+import services.aio.task as async_task_service
+import services.aio.task_stats as async_task_stats_service
+import services.aio.task_throughput as async_task_throughput_service
+import services.task as sync_task_service
+import services.task_stats as sync_task_stats_service
+import services.task_throughput as sync_task_throughput_service
+from common.enums import TaskPriority, TaskStatus, ThroughputGrain
+from common.etag import etag_matches, make_etag, not_modified
+from common.executor import run_service
+from common.export import EXPORT_MEDIA_TYPES, ExportFormat
+from common.fields import FIELDS_DESCRIPTION
+from common.pagination import (
+    CURSOR_DESCRIPTION,
+    NEXT_CURSOR_HEADER,
+    TOTAL_DESCRIPTION,
+    total_headers,
+)
+from common.responses import FastJSONResponse
+from database import (
+    get_read_session_context,
+    get_read_session_factory,
+    get_session_context,
+)
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.exceptions import RequestValidationError
+from models.task import (
+    BulkChangeTaskResultDto,
+    BulkCreateTaskResultDto,
+    BulkUpdateTaskDto,
+    CreateTaskDto,
+    TaskDto,
+    TaskFilterDto,
+    TaskQueryDto,
+    TaskStatsDto,
+    TaskThroughputDto,
+    UpdateTaskDto,
+)
+from pydantic import ValidationError
 from services.auth import token_interceptor
-from sqlalchemy.orm import Session
+from services.task import task_etag, task_fields, tasks_etag
+from settings import DB_ASYNC_MODE
 from starlette import status
+from starlette.responses import StreamingResponse
+
+task_service = async_task_service if DB_ASYNC_MODE else sync_task_service
+task_stats_service = (
+    async_task_stats_service if DB_ASYNC_MODE else sync_task_stats_service
+)
+task_throughput_service = (
+    async_task_throughput_service if DB_ASYNC_MODE else sync_task_throughput_service
+)
 
 router = APIRouter(prefix="/tasks", tags=["Task"])
 
@@ -17,12 +65,70 @@ router = APIRouter(prefix="/tasks", tags=["Task"])
     - Admin can not create task for others
     - User create task for themselves""",
 )
-def create_task(
+async def create_task(
     request: CreateTaskDto,
     user=Depends(token_interceptor),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_session_context),
+):
+    return await run_service(task_service.create_task, request, user, db)
+
+
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_201_CREATED,
+    response_model=BulkCreateTaskResultDto,
+    description="""##
+    - User create many tasks for themselves in a single transaction
+    - Every item is validated like `POST /tasks`, invalid items are reported
+      per index and skipped, the valid ones are inserted""",
+)
+async def create_tasks_bulk(
+    request: list[dict[str, Any]] = Body(
+        examples=[[CreateTaskDto.model_config["json_schema_extra"]["example"]]]
+    ),
+    user=Depends(token_interceptor),
+    db=Depends(get_session_context),
 ):
-    return task_service.create_task(request, user, db)
+    return await run_service(task_service.create_tasks_bulk, request, user, db)
+
+
+def task_query(
+    status: Optional[list[TaskStatus]] = Query(default=None),
+    priority: Optional[list[TaskPriority]] = Query(default=None),
+    open: Optional[bool] = Query(
+        default=None, description=TaskQueryDto.model_fields["open"].description
+    ),
+    created_after: Optional[datetime] = Query(default=None),
+    created_before: Optional[datetime] = Query(default=None),
+    updated_after: Optional[datetime] = Query(default=None),
+    updated_before: Optional[datetime] = Query(default=None),
+    owner_id: Optional[UUID] = Query(
+        default=None, description=TaskQueryDto.model_fields["owner_id"].description
+    ),
+    sort: Optional[str] = Query(
+        default=None, description=TaskQueryDto.model_fields["sort"].description
+    ),
+) -> TaskQueryDto:
+    # A query model is only flattened when it is the sole query parameter
+    try:
+        return TaskQueryDto(
+            status=status,
+            priority=priority,
+            open=open,
+            created_after=created_after,
+            created_before=created_before,
+            updated_after=updated_after,
+            updated_before=updated_before,
+            owner_id=owner_id,
+            sort=sort,
+        )
+    except ValidationError as error:
+        raise RequestValidationError(
+            [
+                {**detail, "loc": ("query", *detail["loc"])}
+                for detail in error.errors(include_url=False, include_context=False)
+            ]
+        )
 
 
 @router.get(
@@ -30,16 +136,239 @@ def create_task(
     status_code=status.HTTP_200_OK,
     response_model=list[TaskDto],
     description="""##
-    - Admin can get all tasks
-    - Normal user can get their tasks""",
+    - Admin can get all tasks, or the tasks of `owner_id`
+    - Normal user can get their tasks
+    - Filter on status, priority, `open` and created/updated ranges, repeat
+      `status`/`priority` to match several values
+    - `sort` is only available with `page`, cursors always walk created_at
+    - Send the `ETag` of a page back in `If-None-Match`, an unchanged page
+      answers 304 after reading the ids and timestamps of its rows only
+    - `fields` trims the tasks, e.g. without `description`; all by default
+    - `total=true` adds the number of matching tasks in `X-Total-Count`""",
 )
-def get_tasks(
+async def get_tasks(
+    params: TaskQueryDto = Depends(task_query),
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=10, ge=1),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    total: bool = Query(default=False, description=TOTAL_DESCRIPTION),
+    if_none_match: Optional[str] = Header(default=None),
+    user=Depends(token_interceptor),
+    db=Depends(get_read_session_context),
+):
+    if cursor is not None and params.sort is not None:
+        raise HTTPException(
+            status_code=400, detail="sort can not be combined with cursor"
+        )
+
+    fields = task_fields(fields)
+    counted = ()
+    if total:
+        counted = await run_service(
+            task_service.get_tasks_total, user, db, params=params
+        )
+
+    if if_none_match:
+        if cursor is not None:
+            etag = await run_service(
+                task_service.get_tasks_by_cursor_etag,
+                cursor,
+                limit,
+                user,
+                db,
+                fields=fields,
+                params=params,
+            )
+        else:
+            etag = await run_service(
+                task_service.get_tasks_etag,
+                page,
+                limit,
+                user,
+                db,
+                fields=fields,
+                params=params,
+            )
+        if counted:
+            # A new total is a change even when the page itself is not
+            etag = make_etag(etag, *counted)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    next_cursor = None
+    if cursor is not None:
+        tasks, next_cursor = await run_service(
+            task_service.get_tasks_by_cursor,
+            cursor,
+            limit,
+            user,
+            db,
+            fields=fields,
+            params=params,
+        )
+    else:
+        tasks = await run_service(
+            task_service.get_tasks, page, limit, user, db, fields=fields, params=params
+        )
+
+    headers = {"ETag": tasks_etag(tasks, fields)}
+    if counted:
+        headers["ETag"] = make_etag(headers["ETag"], *counted)
+        headers.update(total_headers(*counted))
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    # Validated once by the service, encoded without the response_model pass
+    return FastJSONResponse(tasks, headers=headers)
+
+
+@router.patch(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkChangeTaskResultDto,
+    description="""##
+    - User update every task of theirs matching `filter` in one statement
+    - Admin can not update others task
+    - Returns the number and ids of the updated tasks""",
+)
+async def update_tasks(
+    request: BulkUpdateTaskDto,
+    user=Depends(token_interceptor),
+    db=Depends(get_session_context),
+):
+    return await run_service(task_service.update_tasks, request, user, db)
+
+
+@router.delete(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkChangeTaskResultDto,
+    description="""##
+    - User delete every task of theirs matching the filter in one statement
+    - Admin can not delete others task
+    - Returns the number and ids of the deleted tasks""",
+)
+async def delete_tasks(
+    request: TaskFilterDto,
     user=Depends(token_interceptor),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_session_context),
 ):
-    return task_service.get_tasks(page, limit, user, db)
+    return await run_service(task_service.delete_tasks, request, user, db)
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    description="""##
+    - Admin can export all tasks
+    - Normal user can export their tasks
+    - Rows are streamed from a server-side cursor as NDJSON or CSV""",
+)
+async def export_tasks(
+    format: ExportFormat = Query(default="ndjson"),
+    user=Depends(token_interceptor),
+    sessions=Depends(get_read_session_factory),
+):
+    # Streamed after the dependencies exit: the export opens its own session
+    return StreamingResponse(
+        task_service.export_tasks(format, user, sessions),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+@router.get(
+    "/stats",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskStatsDto,
+    description="""##
+    - Normal user gets the counts of their tasks
+    - Admin gets the counts of everyone, of `owner_id` or of `company_id`
+    - Counts per status, per priority and per (status, priority), read from
+      counters kept up to date by the task writes""",
+)
+async def get_task_stats(
+    owner_id: Optional[UUID] = Query(default=None),
+    company_id: Optional[UUID] = Query(default=None),
+    user=Depends(token_interceptor),
+    db=Depends(get_read_session_context),
+):
+    return await run_service(
+        task_stats_service.get_task_stats,
+        user,
+        db,
+        owner_id=owner_id,
+        company_id=company_id,
+    )
+
+
+@router.get(
+    "/throughput",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskThroughputDto,
+    description="""##
+    - Admin can read any company
+    - Normal user can read their company
+    - Tasks created and moved to done per hour or day of [start, end), every
+      bucket listed, the ones without events at 0""",
+)
+async def get_task_throughput(
+    company_id: UUID,
+    start: datetime,
+    end: Optional[datetime] = Query(default=None),
+    grain: ThroughputGrain = Query(default=ThroughputGrain.DAY),
+    user=Depends(token_interceptor),
+    db=Depends(get_read_session_context),
+):
+    return await run_service(
+        task_throughput_service.get_task_throughput,
+        company_id,
+        grain,
+        start,
+        end or datetime.now(),
+        user,
+        db,
+    )
+
+
+@router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=list[TaskDto],
+    description="""##
+    - Admin can search all tasks
+    - Normal user can search their tasks
+    - Matches `q` against summary and description, best matches first.
+      Words are all required, "quoted phrases" and -excluded words work on
+      Postgres
+    - Takes the filters of `GET /tasks`, not its `sort`""",
+)
+async def search_tasks(
+    q: str = Query(min_length=1, max_length=200),
+    params: TaskQueryDto = Depends(task_query),
+    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=10, ge=1),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    user=Depends(token_interceptor),
+    db=Depends(get_read_session_context),
+):
+    if params.sort is not None:
+        raise HTTPException(
+            status_code=400, detail="Search results are sorted by relevance"
+        )
+
+    tasks = await run_service(
+        task_service.search_tasks,
+        q,
+        page,
+        limit,
+        user,
+        db,
+        fields=task_fields(fields),
+        params=params,
+    )
+    return FastJSONResponse(tasks)
 
 
 @router.get(
@@ -48,12 +377,22 @@ def get_tasks(
     response_model=TaskDto,
     description="""##
     - Admin can get any task
-    - Normal user can get their task""",
+    - Normal user can get their task
+    - A matching `If-None-Match` answers 304 from the task's version""",
 )
-def get_task_by_id(
-    task_id: str, user=Depends(token_interceptor), db: Session = Depends(get_db_context)
+async def get_task_by_id(
+    task_id: str,
+    if_none_match: Optional[str] = Header(default=None),
+    user=Depends(token_interceptor),
+    db=Depends(get_read_session_context),
 ):
-    return task_service.get_task_by_id(task_id, user, db)
+    if if_none_match:
+        etag = await run_service(task_service.get_task_etag, task_id, user, db)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    task = await run_service(task_service.get_task_by_id, task_id, user, db)
+    return FastJSONResponse(task, headers={"ETag": task_etag(task)})
 
 
 @router.put(
@@ -64,13 +403,13 @@ def get_task_by_id(
     - Admin can not update others task
     - User can update their task""",
 )
-def update_task(
+async def update_task(
     task_id: str,
     request: UpdateTaskDto,
     user=Depends(token_interceptor),
-    db: Session = Depends(get_db_context),
+    db=Depends(get_session_context),
 ):
-    return task_service.update_task(task_id, request, user, db)
+    return await run_service(task_service.update_task, task_id, request, user, db)
 
 
 @router.delete(
@@ -80,7 +419,7 @@ def update_task(
     - Admin can not delete others task
     - User can delete their task""",
 )
-def delete_task(
-    task_id: str, user=Depends(token_interceptor), db: Session = Depends(get_db_context)
+async def delete_task(
+    task_id: str, user=Depends(token_interceptor), db=Depends(get_session_context)
 ):
-    return task_service.delete_task(task_id, user, db)
+    return await run_service(task_service.delete_task, task_id, user, db)
@@ -1,11 +1,27 @@
-import services.user as user_service
-from database import get_db_context
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+
+import services.aio.user as async_user_service
+import services.user as sync_user_service
+from common.etag import etag_matches, not_modified
+from common.executor import run_service
+from common.fields import FIELDS_DESCRIPTION
+from common.pagination import (
+    CURSOR_DESCRIPTION,
+    NEXT_CURSOR_HEADER,
+    TOTAL_DESCRIPTION,
+    total_headers,
+)
+from common.responses import FastJSONResponse
+from database import get_read_session_context, get_session_context
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from models.user import CreateUserDto, UpdateUserDto, UserDto
 from services.auth import token_interceptor, verify_admin, verify_owner
-from sqlalchemy.orm import Session
+from services.user import user_etag, user_fields
+from settings import DB_ASYNC_MODE
 from starlette import status
 
+user_service = async_user_service if DB_ASYNC_MODE else sync_user_service
+
 router = APIRouter(prefix="/users", tags=["User"])
 
 
@@ -18,10 +34,12 @@ router = APIRouter(prefix="/users", tags=["User"])
     - Normal user can not create user""",
 )
 async def create_user(
-    request: CreateUserDto, user=Depends(token_interceptor), db=Depends(get_db_context)
+    request: CreateUserDto,
+    user=Depends(token_interceptor),
+    db=Depends(get_session_context),
 ):
     verify_admin(user)
-    return user_service.create_user(request, db)
+    return await run_service(user_service.create_user, request, db)
 
 
 @router.get(
@@ -30,16 +48,37 @@ async def create_user(
     response_model=list[UserDto],
     description="""##
     - Admin can get all users
-    - Normal user can not get all users""",
+    - Normal user can not get all users
+    - `fields` trims the users, all by default; embedded tasks are complete
+    - `total=true` adds the number of users in `X-Total-Count`""",
 )
 async def get_users(
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=10, ge=1),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    total: bool = Query(default=False, description=TOTAL_DESCRIPTION),
     user=Depends(token_interceptor),
-    db=Depends(get_db_context),
+    db=Depends(get_read_session_context),
 ):
     verify_admin(user)
-    return user_service.get_users(page, limit, db)
+    fields = user_fields(fields)
+    headers = {}
+    if total:
+        counted = await run_service(user_service.get_users_total, db)
+        headers.update(total_headers(*counted))
+    if cursor is not None:
+        users, next_cursor = await run_service(
+            user_service.get_users_by_cursor, cursor, limit, db, fields=fields
+        )
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+    else:
+        users = await run_service(
+            user_service.get_users, page, limit, db, fields=fields
+        )
+
+    return FastJSONResponse(users, headers=headers)
 
 
 @router.get(
@@ -48,15 +87,24 @@ async def get_users(
     response_model=UserDto,
     description="""##
     - Admin can get any user
-    - Normal user can get their user""",
+    - Normal user can get their user
+    - A matching `If-None-Match` answers 304 from the versions of the user
+      and their tasks""",
 )
 async def get_user_by_id(
     user_id: str,
+    if_none_match: Optional[str] = Header(default=None),
     user=Depends(token_interceptor),
-    db=Depends(get_db_context),
+    db=Depends(get_read_session_context),
 ):
     verify_owner(user_id, user)
-    return user_service.get_user_by_id(user_id, db)
+    if if_none_match:
+        etag = await run_service(user_service.get_user_etag, user_id, db)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    result = await run_service(user_service.get_user_by_id, user_id, db)
+    return FastJSONResponse(result, headers={"ETag": user_etag(result)})
 
 
 @router.put(
@@ -71,10 +119,10 @@ async def update_user(
     user_id: str,
     request: UpdateUserDto,
     user=Depends(token_interceptor),
-    db=Depends(get_db_context),
+    db=Depends(get_session_context),
 ):
     verify_owner(user_id, user)
-    return user_service.update_user(user_id, request, db)
+    return await run_service(user_service.update_user, user_id, request, db)
 
 
 @router.delete(
@@ -84,7 +132,7 @@ async def update_user(
     - Normal user can not delete user""",
 )
 async def delete_user(
-    user_id: str, user=Depends(token_interceptor), db: Session = Depends(get_db_context)
+    user_id: str, user=Depends(token_interceptor), db=Depends(get_session_context)
 ):
     verify_admin(user)
-    return user_service.delete_user(user_id, db)
+    return await run_service(user_service.delete_user, user_id, db)
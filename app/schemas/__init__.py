@@ -1 +1,9 @@
-from schemas import company, task, user
+from schemas import (
+    company,
+    refresh_token,
+    revoked_token,
+    task,
+    task_stats,
+    task_throughput,
+    user,
+)
@@ -1,10 +1,22 @@
-from uuid import uuid4
+from uuid import UUID, uuid4
 
-from sqlalchemy import Column, Time
+from sqlalchemy import Column, DateTime, TypeDecorator
 from sqlalchemy import Uuid as SQLAlchemyUuid
 
 
+class UUIDType(TypeDecorator):
+    """Uuid column that also accepts ids given as strings (token claims, path params)"""
+
+    impl = SQLAlchemyUuid
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return UUID(value)
+        return value
+
+
 class BaseEntity:
-    id = Column(SQLAlchemyUuid, primary_key=True, default=uuid4)
-    created_at = Column(Time, nullable=True)
-    updated_at = Column(Time, nullable=True)
+    id = Column(UUIDType, primary_key=True, default=uuid4)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
@@ -1,13 +1,18 @@
+from datetime import datetime
+
 from common.enums import CompanyMode
 from database import Base
 from schemas.base_entity import BaseEntity
-from sqlalchemy import Column, Enum, Numeric, String
+from sqlalchemy import Column, DateTime, Enum, Index, Numeric, String
 from sqlalchemy.orm import relationship
 
 
 class Company(BaseEntity, Base):
     __tablename__ = "companies"
+    __table_args__ = (Index("ix_companies_created_at_id", "created_at", "id"),)
 
+    # Keyset pagination seeks on (created_at, id) and encodes both in its cursor
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
     name = Column(String, unique=True, index=True)
     description = Column(String, nullable=True)
     mode = Column(Enum(CompanyMode), nullable=False, default=CompanyMode.OUTSOURCE)
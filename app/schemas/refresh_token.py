@@ -0,0 +1,23 @@
+from database import Base
+from schemas.base_entity import BaseEntity, UUIDType
+from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+
+
+class RefreshToken(BaseEntity, Base):
+    """One issued refresh token, `id` is the `jti` claim of the token
+
+    Tokens rotated from the same login share a `family_id`, presenting an
+    already rotated token revokes the whole family.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    user_id = Column(
+        UUIDType, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    family_id = Column(UUIDType, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+    user = relationship("User")
@@ -0,0 +1,17 @@
+from database import Base
+from schemas.base_entity import BaseEntity, UUIDType
+from sqlalchemy import Column, DateTime, Index
+
+
+class RevokedToken(BaseEntity, Base):
+    """Denylisted access token, `id` is the `jti` claim of the token
+
+    Workers poll this table on `created_at` to refresh their in-memory
+    denylist, rows are useless once `expires_at` has passed.
+    """
+
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (Index("ix_revoked_tokens_created_at", "created_at"),)
+
+    user_id = Column(UUIDType, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
@@ -1,19 +1,105 @@
+from datetime import datetime
+
 from common.enums import TaskPriority, TaskStatus
 from database import Base
-from schemas.base_entity import BaseEntity
-from sqlalchemy import Column, Enum, ForeignKey, String
-from sqlalchemy import Uuid as SqlAlchemyUUID
+from schemas.base_entity import BaseEntity, UUIDType
+from sqlalchemy import (
+    DDL,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    String,
+    event,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 
 class Task(BaseEntity, Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # GET /tasks filters and sorts, listed per owner with (created_at, id)
+        # as the tie-breakers of every sort
+        Index(
+            "ix_tasks_owner_id_status_created_at_id",
+            "owner_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_tasks_owner_id_updated_at_created_at_id",
+            "owner_id",
+            "updated_at",
+            "created_at",
+            "id",
+        ),
+        # Open tasks by priority, done tasks are most of the table and skipped
+        Index(
+            "ix_tasks_open_owner_id_priority_created_at_id",
+            "owner_id",
+            "priority",
+            "created_at",
+            "id",
+            postgresql_where=text("status <> 'DONE'"),
+            sqlite_where=text("status <> 'DONE'"),
+        ),
+    )
 
+    # Keyset pagination seeks on (created_at, id) and encodes both in its cursor
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
     summary = Column(String, nullable=True)
     description = Column(String, nullable=True)
     status = Column(Enum(TaskStatus), nullable=False, default=TaskStatus.BACKLOG)
     priority = Column(Enum(TaskPriority), nullable=False, default=TaskPriority.LOW)
 
-    owner_id = Column(SqlAlchemyUUID, ForeignKey("users.id"), nullable=True)
+    owner_id = Column(UUIDType, ForeignKey("users.id"), nullable=True)
 
     owner = relationship("User", back_populates="tasks")
+
+
+# Full-text search, kept by the database on every write path (bulk included).
+# Postgres: a generated tsvector column with a GIN index, the summary weighs
+# more than the description. The column is not mapped, no ORM query reads it.
+SEARCH_CONFIG = "english"
+SEARCH_DDL = {
+    "postgresql": [
+        f"""ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(summary, '')), 'A')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+        ) STORED""",
+        "CREATE INDEX ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+    ],
+    # SQLite (local runs and tests): an FTS5 table mirrored by triggers. Keyed
+    # on the task id, the implicit rowid of tasks may change on VACUUM
+    "sqlite": [
+        "CREATE VIRTUAL TABLE tasks_fts USING fts5(id UNINDEXED, summary, description)",
+        """CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (id, summary, description)
+            VALUES (new.id, new.summary, new.description);
+        END""",
+        """CREATE TRIGGER tasks_fts_update AFTER UPDATE OF summary, description
+        ON tasks BEGIN
+            UPDATE tasks_fts SET summary = new.summary, description = new.description
+            WHERE id = new.id;
+        END""",
+        """CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            DELETE FROM tasks_fts WHERE id = old.id;
+        END""",
+    ],
+}
+
+for dialect, statements in SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(
+            Task.__table__, "after_create", DDL(statement).execute_if(dialect=dialect)
+        )
+event.listen(
+    Task.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
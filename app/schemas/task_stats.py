@@ -0,0 +1,21 @@
+from common.enums import TaskPriority, TaskStatus
+from database import Base
+from schemas.base_entity import UUIDType
+from sqlalchemy import Column, Enum, ForeignKey, Integer
+
+
+class TaskStats(Base):
+    """Number of tasks per (owner, status, priority)
+
+    Kept by the task services in the transaction of every task write, GET
+    /tasks/stats sums at most 12 rows per owner instead of counting tasks.
+    Tasks without owner are not counted. `python -m commands.task_stats`
+    checks it against the tasks table and rebuilds it.
+    """
+
+    __tablename__ = "task_stats"
+
+    owner_id = Column(UUIDType, ForeignKey("users.id"), primary_key=True)
+    status = Column(Enum(TaskStatus), primary_key=True)
+    priority = Column(Enum(TaskPriority), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
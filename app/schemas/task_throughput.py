@@ -0,0 +1,23 @@
+from common.enums import ThroughputGrain
+from database import Base
+from schemas.base_entity import UUIDType
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer
+
+
+class TaskThroughput(Base):
+    """Tasks created and moved to done per company, hour and day
+
+    The task services add their events in the transaction of the write, at
+    both grains. The primary key serves a company's series of one grain as a
+    single range scan. Tasks of owners without a company are not counted.
+    `python -m commands.task_throughput backfill` fills in the past buckets.
+    """
+
+    __tablename__ = "task_throughput"
+
+    company_id = Column(UUIDType, ForeignKey("companies.id"), primary_key=True)
+    grain = Column(Enum(ThroughputGrain), primary_key=True)
+    # Start of the hour or day, naive local time like the task timestamps
+    bucket = Column(DateTime, primary_key=True)
+    created = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
@@ -1,13 +1,17 @@
+from datetime import datetime
+
 from database import Base
-from schemas.base_entity import BaseEntity
-from sqlalchemy import Boolean, Column, ForeignKey, String
-from sqlalchemy import Uuid as SqlAlchemyUUID
+from schemas.base_entity import BaseEntity, UUIDType
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 
 class User(BaseEntity, Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
+    # Keyset pagination seeks on (created_at, id) and encodes both in its cursor
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
     email = Column(String, unique=True, index=True)
     username = Column(String, unique=True, index=True)
     first_name = Column(String, nullable=False)
@@ -16,7 +20,7 @@ class User(BaseEntity, Base):
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
 
-    company_id = Column(SqlAlchemyUUID, ForeignKey("companies.id"), nullable=True)
+    company_id = Column(UUIDType, ForeignKey("companies.id"), nullable=True, index=True)
 
     company = relationship("Company", back_populates="employees")
     tasks = relationship("Task", back_populates="owner")
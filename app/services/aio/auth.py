@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+import database
+from common.bcrypt_worker import (
+    check_password,
+    check_password_and_update,
+    hash_password,
+)
+from fastapi import HTTPException
+from schemas.user import User
+from services.auth import (
+    apply_revocations,
+    create_token_response,
+    decode_refresh_token,
+    denylist,
+    new_refresh_token,
+    password_hasher,
+    revocations_statement,
+    revoke_family_statement,
+    revoke_token_statement,
+    rotate_statement,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def create_hashed_password(password):
+    return await password_hasher.run_async(hash_password, password)
+
+
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.run_async(
+        check_password, plain_password, hashed_password
+    )
+
+
+async def authenticate_user(username: str, password: str, db: AsyncSession):
+    try:
+        result = await db.execute(select(User).filter(User.username == username))
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        valid, new_hash = await password_hasher.run_async(
+            check_password_and_update, password, user.password
+        )
+        if not valid:
+            raise HTTPException(status_code=401, detail="Invalid credential")
+
+        if new_hash:
+            user.password = new_hash
+            await db.commit()
+        return user
+    except Exception as e:
+        raise e
+
+
+async def create_refresh_token(user: User, db: AsyncSession) -> str:
+    try:
+        row, refresh_token = new_refresh_token(user.id)
+        db.add(row)
+        await db.commit()
+
+        return refresh_token
+    except Exception as _:
+        await db.rollback()
+        raise
+
+
+async def refresh_access_token(refresh_token: str, db: AsyncSession):
+    claims = decode_refresh_token(refresh_token)
+    now = datetime.now()
+
+    try:
+        if (await db.execute(rotate_statement(claims, now))).rowcount != 1:
+            await db.execute(revoke_family_statement(claims, now))
+            await db.commit()
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+        user = await db.get(User, UUID(claims["id"]))
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+        row, new_token = new_refresh_token(user.id, family_id=claims["family"])
+        db.add(row)
+        await db.commit()
+
+        return create_token_response(user, new_token)
+    except Exception as _:
+        await db.rollback()
+        raise
+
+
+async def refresh_denylist():
+    if database.AsyncSessionLocal is None:
+        database.init_async_engine()
+
+    async with database.AsyncSessionLocal() as db:
+        result = await db.execute(revocations_statement(denylist.since))
+        apply_revocations(result.all())
+
+
+async def logout(
+    claims: dict[str, Any], refresh_token: Optional[str], db: AsyncSession
+):
+    now = datetime.now()
+
+    try:
+        if claims.get("jti") is not None:
+            await db.execute(
+                revoke_token_statement(db.get_bind().dialect.name, claims, now)
+            )
+
+        if refresh_token:
+            refresh_claims = decode_refresh_token(refresh_token)
+            if refresh_claims["id"] != claims["id"]:
+                raise HTTPException(status_code=401, detail="Invalid refresh token")
+            await db.execute(revoke_family_statement(refresh_claims, now))
+
+        await db.commit()
+
+        if claims.get("jti") is not None:
+            denylist.add(claims["jti"], claims["exp"])
+        return "Ok"
+    except Exception as _:
+        await db.rollback()
+        raise
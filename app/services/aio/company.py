@@ -0,0 +1,191 @@
+from datetime import datetime
+from typing import Optional
+
+from common.entity_cache import NOT_FOUND, async_entity_cache
+from common.pagination import keyset_page, split_page
+from common.routing import read_from_replica
+from fastapi import HTTPException
+from models.company import CompanyDto, CreateCompanyDto, UpdateCompanyDto
+from schemas.company import Company
+from schemas.user import User
+from services.company import (
+    COMPANY_LIST_FIELDS,
+    company_dtos,
+    company_load_options,
+    employees_statement,
+    membership_statement,
+)
+from services.task_throughput import delete_company_throughput_statement
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+async def create_company(request: CreateCompanyDto, db: AsyncSession):
+    required_fields = [request.name, request.mode]
+    if not all(required_fields):
+        raise HTTPException(status_code=400, detail="Missing fields")
+
+    try:
+        result = await db.execute(select(Company).filter(Company.name == request.name))
+        if result.scalars().first():
+            raise HTTPException(status_code=400, detail="Company already exists")
+
+        new_company = {**request.__dict__, "created_at": datetime.now()}
+        new_company = Company(**new_company)
+
+        db.add(new_company)
+        await db.commit()
+        await db.refresh(new_company)
+        # Just created, it has no employees to lazy load
+        set_committed_value(new_company, "employees", [])
+
+        return CompanyDto.model_validate(new_company)
+    except Exception as _:
+        raise
+
+
+# CompanyDto embeds employees and their tasks; lazy loads are not allowed in
+# async mode, the requested relationships are loaded upfront with the page
+async def get_companies(
+    page: int, limit: int, db: AsyncSession, fields: tuple = COMPANY_LIST_FIELDS
+):
+    try:
+        offset = (page - 1) * limit
+        result = await db.execute(
+            select(Company)
+            .options(*company_load_options(fields))
+            .order_by(Company.created_at)
+            .offset(offset)
+            .limit(limit)
+        )
+        return company_dtos(result.scalars().all(), fields)
+    except Exception as _:
+        raise
+
+
+async def get_companies_by_cursor(
+    cursor: Optional[str],
+    limit: int,
+    db: AsyncSession,
+    fields: tuple = COMPANY_LIST_FIELDS,
+):
+    try:
+        query = select(Company).options(*company_load_options(fields))
+        result = await db.execute(keyset_page(query, Company, cursor, limit))
+        rows, next_cursor = split_page(result.scalars().all(), limit)
+        return company_dtos(rows, fields), next_cursor
+    except Exception as _:
+        raise
+
+
+async def get_company_by_id(
+    company_id: str,
+    user: User,
+    db: AsyncSession,
+    include_employees: bool = False,
+    employees_page: int = 1,
+    employees_limit: int = 10,
+):
+    try:
+        company = await async_entity_cache.get("company", company_id, CompanyDto)
+        if company is None:
+            result = await db.execute(
+                select(Company)
+                .options(noload(Company.employees))
+                .filter(Company.id == company_id)
+            )
+            company = result.scalars().first()
+            if company:
+                company = CompanyDto.model_validate(company)
+                if not read_from_replica(db):
+                    await async_entity_cache.set("company", company_id, company)
+            elif not read_from_replica(db):
+                await async_entity_cache.set_not_found("company", company_id)
+
+        if not company or company is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Company not found")
+
+        if user.is_admin is False:
+            result = await db.execute(membership_statement(company_id, user.id))
+            if not result.scalar():
+                raise HTTPException(
+                    status_code=403, detail="User is not in this company"
+                )
+
+        employees = []
+        if include_employees:
+            result = await db.execute(
+                employees_statement(company_id, employees_page, employees_limit)
+            )
+            employees = result.scalars().all()
+
+        # The cached entry holds the company only, employees are paginated
+        return CompanyDto(
+            **{**company.model_dump(exclude={"employees"}), "employees": employees}
+        )
+
+    except Exception as _:
+        raise
+
+
+def employee_ids_statement(company_id: str):
+    """Users whose company_id the ORM clears when their company is deleted"""
+    return select(User.id).filter(User.company_id == company_id)
+
+
+async def update_company(
+    company_id: str,
+    request: UpdateCompanyDto,
+    db: AsyncSession,
+):
+    required_fields = [request.description, request.mode]
+    if not all(required_fields):
+        raise HTTPException(status_code=400, detail="Missing fields")
+
+    try:
+        result = await db.execute(
+            select(Company)
+            .options(noload(Company.employees))
+            .filter(Company.id == company_id)
+        )
+        company = result.scalars().first()
+        if not company:
+            raise HTTPException(status_code=404, detail="Company not found")
+
+        for key, value in request.__dict__.items():
+            if value:
+                setattr(company, key, value)
+        company.updated_at = datetime.now()
+
+        db.add(company)
+        await db.commit()
+        await db.refresh(company)
+        await async_entity_cache.invalidate("company", company_id)
+
+        return CompanyDto.model_validate(company)
+    except Exception as _:
+        raise
+
+
+async def delete_company(company_id: str, db: AsyncSession):
+    try:
+        result = await db.execute(select(Company).filter(Company.id == company_id))
+        company = result.scalars().first()
+        if not company:
+            raise HTTPException(status_code=404, detail="Company not found")
+
+        user_ids = (
+            (await db.execute(employee_ids_statement(company_id))).scalars().all()
+        )
+
+        await db.execute(delete_company_throughput_statement(company.id))
+        await db.delete(company)
+        await db.commit()
+        await async_entity_cache.invalidate("company", company_id)
+        await async_entity_cache.invalidate("user", *user_ids)
+
+        return "Ok"
+    except Exception as _:
+        raise
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from services.counting import count_statement, planner_estimate, reltuples_statement
+from settings import TOTAL_COUNT_EXACT_LIMIT
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def total_count(
+    db: AsyncSession, query, scoped: bool = False, table: Optional[str] = None
+):
+    if scoped:
+        return (await db.execute(count_statement(query))).scalar_one(), False
+
+    statement = count_statement(query, TOTAL_COUNT_EXACT_LIMIT + 1)
+    total = (await db.execute(statement)).scalar()
+    if total <= TOTAL_COUNT_EXACT_LIMIT:
+        return total, False
+
+    if table is not None and db.get_bind().dialect.name == "postgresql":
+        reltuples = (await db.execute(reltuples_statement(table))).scalar()
+        estimated = planner_estimate(total, reltuples)
+        if estimated is not None:
+            return estimated
+
+    return total, True
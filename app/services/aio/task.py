@@ -0,0 +1,386 @@
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from common.entity_cache import NOT_FOUND, async_entity_cache
+from common.export import ExportFormat, RowSerializer
+from common.fields import projection
+from common.pagination import keyset_page, split_page
+from common.routing import read_from_replica
+from fastapi import HTTPException
+from models.task import (
+    BulkChangeTaskResultDto,
+    BulkUpdateTaskDto,
+    CreateTaskDto,
+    TaskDto,
+    TaskFilterDto,
+    TaskQueryDto,
+    UpdateTaskDto,
+)
+from schemas.task import Task
+from schemas.user import User
+from services.aio.counting import total_count
+from services.aio.task_stats import apply_task_stats
+from services.aio.task_throughput import apply_task_throughput
+from services.task import (
+    TASK_COLUMNS,
+    TASK_LIST_FIELDS,
+    bulk_delete_statement,
+    bulk_insert_statement,
+    bulk_result,
+    bulk_transition_statement,
+    bulk_update_statement,
+    export_statement,
+    prepare_bulk_tasks,
+    returned_groups,
+    search_statement,
+    task_dtos,
+    task_etag,
+    task_order_by,
+    task_version_statement,
+    tasks_etag,
+    tasks_statement,
+    tasks_total_query,
+    tasks_versions_statement,
+    transition_groups_statement,
+    transition_totals,
+    verify_task_reader,
+)
+from services.task_stats import stats_deltas
+from services.task_throughput import completions
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def create_task(request: CreateTaskDto, user: User, db: AsyncSession):
+    required_fields = [
+        request.summary,
+        request.description,
+        request.status,
+        request.priority,
+    ]
+    if not all(required_fields):
+        raise HTTPException(status_code=400, detail="Missing fields")
+
+    try:
+        new_task = {
+            **request.__dict__,
+            "owner_id": user.id,
+            "created_at": datetime.now(),
+        }
+        new_task = Task(**new_task)
+
+        db.add(new_task)
+        await apply_task_stats(
+            db, stats_deltas(added=[(user.id, new_task.status, new_task.priority)])
+        )
+        await apply_task_throughput(
+            db,
+            user.id,
+            new_task.created_at,
+            created=1,
+            completed=completions(None, new_task.status),
+        )
+        await db.commit()
+        await db.refresh(new_task)
+        # The owner's cached UserDto lists its tasks
+        await async_entity_cache.invalidate("user", user.id)
+
+        return TaskDto.model_validate(new_task)
+
+    except Exception as _:
+        raise
+
+
+async def create_tasks_bulk(items: list[dict[str, Any]], user: User, db: AsyncSession):
+    results, rows = prepare_bulk_tasks(items, user)
+
+    try:
+        ids = []
+        if rows:
+            ids = (await db.execute(bulk_insert_statement(), rows)).scalars().all()
+            added = [(user.id, row["status"], row["priority"]) for row in rows]
+            await apply_task_stats(db, stats_deltas(added=added))
+            completed = sum(completions(None, row["status"]) for row in rows)
+            await apply_task_throughput(
+                db, user.id, rows[0]["created_at"], len(rows), completed
+            )
+            await db.commit()
+            await async_entity_cache.invalidate("user", user.id)
+
+        return bulk_result(results, ids)
+    except Exception as _:
+        await db.rollback()
+        raise
+
+
+async def get_tasks(
+    page: int,
+    limit: int,
+    user: User,
+    db: AsyncSession,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        offset = (page - 1) * limit
+        statement = (
+            tasks_statement(user, projection(Task, fields), params)
+            .order_by(*task_order_by(params))
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await db.execute(statement)
+        return task_dtos(result.keys(), result.all(), fields)
+    except Exception as _:
+        raise
+
+
+async def get_tasks_by_cursor(
+    cursor: Optional[str],
+    limit: int,
+    user: User,
+    db: AsyncSession,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        statement = tasks_statement(user, projection(Task, fields), params)
+        result = await db.execute(keyset_page(statement, Task, cursor, limit))
+        rows, next_cursor = split_page(result.all(), limit)
+        return task_dtos(result.keys(), rows, fields), next_cursor
+    except Exception as _:
+        raise
+
+
+async def get_tasks_total(
+    user: User, db: AsyncSession, params: Optional[TaskQueryDto] = None
+) -> tuple[int, bool]:
+    try:
+        return await total_count(db, *tasks_total_query(user, params))
+    except Exception as _:
+        raise
+
+
+async def search_tasks(
+    q: str,
+    page: int,
+    limit: int,
+    user: User,
+    db: AsyncSession,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        dialect = db.get_bind().dialect.name
+        statement = (
+            search_statement(q, dialect, user, projection(Task, fields), params)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
+        result = await db.execute(statement)
+        return task_dtos(result.keys(), result.all(), fields)
+    except Exception as _:
+        raise
+
+
+async def export_tasks(
+    format: ExportFormat, user: User, sessions: Callable[[], AsyncSession]
+):
+    serialize = RowSerializer(TASK_COLUMNS, format)
+    async with sessions() as db:
+        result = await db.stream(export_statement(user))
+        async for rows in result.partitions():
+            yield serialize(rows)
+
+        # CSV header of an empty export
+        if serialize.header:
+            yield serialize([])
+
+
+async def get_tasks_etag(
+    page: int,
+    limit: int,
+    user: User,
+    db: AsyncSession,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        statement = (
+            tasks_versions_statement(user, params)
+            .order_by(*task_order_by(params))
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
+        return tasks_etag((await db.execute(statement)).all(), fields)
+    except Exception as _:
+        raise
+
+
+async def get_tasks_by_cursor_etag(
+    cursor: Optional[str],
+    limit: int,
+    user: User,
+    db: AsyncSession,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        statement = keyset_page(
+            tasks_versions_statement(user, params), Task, cursor, limit
+        )
+        rows, _ = split_page((await db.execute(statement)).all(), limit)
+        return tasks_etag(rows, fields)
+    except Exception as _:
+        raise
+
+
+async def get_task_etag(task_id: str, user: User, db: AsyncSession):
+    try:
+        task = await async_entity_cache.get("task", task_id, TaskDto)
+        if task is None:
+            task = (await db.execute(task_version_statement(task_id))).first()
+            if not task and not read_from_replica(db):
+                await async_entity_cache.set_not_found("task", task_id)
+
+        if not task or task is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        verify_task_reader(task, user)
+        return task_etag(task)
+    except Exception as _:
+        raise
+
+
+async def get_task_by_id(task_id: str, user: User, db: AsyncSession):
+    try:
+        task = await async_entity_cache.get("task", task_id, TaskDto)
+        if task is None:
+            result = await db.execute(select(Task).filter(Task.id == task_id))
+            task = result.scalars().first()
+            if task:
+                task = TaskDto.model_validate(task)
+                if not read_from_replica(db):
+                    await async_entity_cache.set("task", task_id, task)
+            elif not read_from_replica(db):
+                await async_entity_cache.set_not_found("task", task_id)
+
+        if not task or task is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        # Checked on every read, the cached entry is shared by all users
+        verify_task_reader(task, user)
+        return task
+    except Exception as _:
+        raise
+
+
+async def update_task(
+    task_id: str,
+    request: UpdateTaskDto,
+    user: User,
+    db: AsyncSession,
+):
+    try:
+        # Locked: a concurrent update must see this one's status for the stats
+        result = await db.execute(
+            select(Task)
+            .filter(Task.id == task_id, Task.owner_id == user.id)
+            .with_for_update()
+        )
+        task = result.scalars().first()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        before = (task.owner_id, task.status, task.priority)
+        for key, value in request.__dict__.items():
+            if value:
+                setattr(task, key, value)
+        task.updated_at = datetime.now()
+
+        db.add(task)
+        after = (task.owner_id, task.status, task.priority)
+        await apply_task_stats(db, stats_deltas(added=[after], removed=[before]))
+        await apply_task_throughput(
+            db,
+            task.owner_id,
+            task.updated_at,
+            completed=completions(before[1], task.status),
+        )
+        await db.commit()
+        await db.refresh(task)
+        await async_entity_cache.invalidate("task", task_id)
+        await async_entity_cache.invalidate("user", user.id)
+
+        return TaskDto.model_validate(task)
+    except Exception as _:
+        raise
+
+
+async def delete_task(task_id: str, user: User, db: AsyncSession):
+    try:
+        result = await db.execute(
+            select(Task)
+            .filter(Task.id == task_id, Task.owner_id == user.id)
+            .with_for_update()
+        )
+        task = result.scalars().first()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        await db.delete(task)
+        removed = [(task.owner_id, task.status, task.priority)]
+        await apply_task_stats(db, stats_deltas(removed=removed))
+        await db.commit()
+        await async_entity_cache.invalidate("task", task_id)
+        await async_entity_cache.invalidate("user", user.id)
+
+        return "Ok"
+    except Exception as _:
+        raise
+
+
+async def update_tasks(request: BulkUpdateTaskDto, user: User, db: AsyncSession):
+    statement = bulk_update_statement(request, user)
+
+    try:
+        groups = []
+        if not (request.changes.status or request.changes.priority):
+            ids = (await db.execute(statement)).scalars().all()
+        elif db.get_bind().dialect.name == "postgresql":
+            rows = (await db.execute(bulk_transition_statement(request, user))).all()
+            ids, groups = [row.id for row in rows], returned_groups(rows)
+        else:
+            counted = transition_groups_statement(request.filter, user)
+            groups = (await db.execute(counted)).all()
+            ids = (await db.execute(statement)).scalars().all()
+
+        deltas, completed = transition_totals(groups, request.changes, user)
+        await apply_task_stats(db, deltas)
+        await apply_task_throughput(db, user.id, datetime.now(), completed=completed)
+        await db.commit()
+        await async_entity_cache.invalidate("task", *ids)
+        await async_entity_cache.invalidate("user", user.id)
+
+        return BulkChangeTaskResultDto(affected=len(ids), ids=ids)
+    except Exception as _:
+        await db.rollback()
+        raise
+
+
+async def delete_tasks(filter: TaskFilterDto, user: User, db: AsyncSession):
+    statement = bulk_delete_statement(filter, user)
+
+    try:
+        rows = (await db.execute(statement)).all()
+        ids = [row.id for row in rows]
+        removed = [(user.id, row.status, row.priority) for row in rows]
+        await apply_task_stats(db, stats_deltas(removed=removed))
+        await db.commit()
+        await async_entity_cache.invalidate("task", *ids)
+        await async_entity_cache.invalidate("user", user.id)
+
+        return BulkChangeTaskResultDto(affected=len(ids), ids=ids)
+    except Exception as _:
+        await db.rollback()
+        raise
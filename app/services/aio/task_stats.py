@@ -0,0 +1,30 @@
+from collections import Counter
+from typing import Optional
+from uuid import UUID
+
+from schemas.user import User
+from services.task_stats import (
+    stats_upsert_statement,
+    task_stats_dto,
+    task_stats_statement,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def apply_task_stats(db: AsyncSession, deltas: Counter):
+    if not any(deltas.values()):
+        return
+    await db.execute(stats_upsert_statement(db.get_bind().dialect.name, deltas))
+
+
+async def get_task_stats(
+    user: User,
+    db: AsyncSession,
+    owner_id: Optional[UUID] = None,
+    company_id: Optional[UUID] = None,
+):
+    try:
+        statement = task_stats_statement(user, owner_id, company_id)
+        return task_stats_dto((await db.execute(statement)).all())
+    except Exception as _:
+        raise
@@ -0,0 +1,52 @@
+from datetime import datetime
+from uuid import UUID
+
+from common.enums import ThroughputGrain
+from fastapi import HTTPException
+from schemas.user import User
+from services.task_throughput import (
+    company_member_statement,
+    throughput_dto,
+    throughput_range,
+    throughput_statement,
+    throughput_upsert_statement,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def apply_task_throughput(
+    db: AsyncSession, owner_id, moment: datetime, created: int = 0, completed: int = 0
+):
+    statement = throughput_upsert_statement(
+        db.get_bind().dialect.name, owner_id, moment, created, completed
+    )
+    if statement is not None:
+        await db.execute(statement)
+
+
+async def get_task_throughput(
+    company_id: UUID,
+    grain: ThroughputGrain,
+    start: datetime,
+    end: datetime,
+    user: User,
+    db: AsyncSession,
+):
+    first, end = throughput_range(grain, start, end)
+
+    try:
+        if (
+            user.is_admin is False
+            and not (
+                await db.execute(company_member_statement(company_id, user))
+            ).scalar()
+        ):
+            raise HTTPException(
+                status_code=403, detail="User can only read their company's throughput"
+            )
+
+        statement = throughput_statement(company_id, grain, first, end)
+        rows = (await db.execute(statement)).all()
+        return throughput_dto(rows, company_id, grain, first, end)
+    except Exception as _:
+        raise
@@ -0,0 +1,198 @@
+from datetime import datetime
+from typing import Optional
+
+from common.entity_cache import NOT_FOUND, async_entity_cache
+from common.pagination import keyset_page, split_page
+from common.routing import read_from_replica
+from fastapi import HTTPException
+from models.user import CreateUserDto, UpdateUserDto, UserDto
+from schemas.task import Task
+from schemas.user import User
+from services.aio.auth import create_hashed_password
+from services.aio.counting import total_count
+from services.task_stats import delete_owner_stats_statement
+from services.user import (
+    USER_LIST_FIELDS,
+    user_dtos,
+    user_etag,
+    user_load_options,
+    user_tasks_versions_statement,
+    user_version_statement,
+)
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+async def create_user(request: CreateUserDto, db: AsyncSession):
+    required_fields = [
+        request.username,
+        request.email,
+        request.first_name,
+        request.last_name,
+        request.password,
+    ]
+    if not all(required_fields):
+        raise HTTPException(status_code=400, detail="Missing fields")
+
+    try:
+        result = await db.execute(
+            select(User).filter(
+                or_(User.username == request.username, User.email == request.email)
+            )
+        )
+        if result.scalars().first():
+            raise HTTPException(status_code=400, detail="User already exists")
+
+        new_user = {
+            **request.__dict__,
+            "password": await create_hashed_password(request.password),
+            "created_at": datetime.now(),
+            **({"company_id": request.company_id} if request.company_id else {}),
+        }
+
+        new_user = User(**new_user)
+        db.add(new_user)
+        await db.commit()
+        await db.refresh(new_user)
+        # Just created, it has no tasks to lazy load
+        set_committed_value(new_user, "tasks", [])
+
+        return UserDto.model_validate(new_user)
+    except Exception as _:
+        raise
+
+
+async def get_users(
+    page: int, limit: int, db: AsyncSession, fields: tuple = USER_LIST_FIELDS
+):
+    try:
+        offset = (page - 1) * limit
+        result = await db.execute(
+            select(User)
+            .options(*user_load_options(fields))
+            .order_by(User.created_at)
+            .offset(offset)
+            .limit(limit)
+        )
+        return user_dtos(result.scalars().all(), fields)
+    except Exception as _:
+        raise
+
+
+async def get_users_total(db: AsyncSession) -> tuple[int, bool]:
+    try:
+        return await total_count(db, select(User.id), table="users")
+    except Exception as _:
+        raise
+
+
+async def get_users_by_cursor(
+    cursor: Optional[str],
+    limit: int,
+    db: AsyncSession,
+    fields: tuple = USER_LIST_FIELDS,
+):
+    try:
+        query = select(User).options(*user_load_options(fields))
+        result = await db.execute(keyset_page(query, User, cursor, limit))
+        rows, next_cursor = split_page(result.scalars().all(), limit)
+        return user_dtos(rows, fields), next_cursor
+    except Exception as _:
+        raise
+
+
+async def get_user_by_id(user_id: str, db: AsyncSession):
+    try:
+        user = await async_entity_cache.get("user", user_id, UserDto)
+        if user is None:
+            result = await db.execute(
+                select(User)
+                .options(selectinload(User.tasks))
+                .filter(User.id == user_id)
+            )
+            user = result.scalars().first()
+            if user:
+                # tasks are loaded with the user, nothing is lazy loaded here
+                user = UserDto.model_validate(user)
+                if not read_from_replica(db):
+                    await async_entity_cache.set("user", user_id, user)
+            elif not read_from_replica(db):
+                await async_entity_cache.set_not_found("user", user_id)
+
+        if not user or user is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        return user
+    except Exception as _:
+        raise
+
+
+async def get_user_etag(user_id: str, db: AsyncSession):
+    try:
+        user = await async_entity_cache.get("user", user_id, UserDto)
+        if user is None:
+            user = (await db.execute(user_version_statement(user_id))).first()
+            if not user and not read_from_replica(db):
+                await async_entity_cache.set_not_found("user", user_id)
+
+        if not user or user is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        if isinstance(user, UserDto):
+            return user_etag(user)
+        result = await db.execute(user_tasks_versions_statement(user_id))
+        return user_etag(user, result.all())
+    except Exception as _:
+        raise
+
+
+def owned_task_ids_statement(user_id: str):
+    """Tasks whose owner_id the ORM clears when their owner is deleted"""
+    return select(Task.id).filter(Task.owner_id == user_id)
+
+
+async def update_user(user_id: str, request: UpdateUserDto, db: AsyncSession):
+    try:
+        result = await db.execute(
+            select(User).options(noload(User.tasks)).filter(User.id == user_id)
+        )
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        for key, value in request.__dict__.items():
+            if value:
+                setattr(user, key, value)
+        user.updated_at = datetime.now()
+
+        await db.commit()
+        await db.refresh(user)
+        await async_entity_cache.invalidate("user", user_id)
+
+        return UserDto.model_validate(user)
+
+    except Exception as _:
+        raise
+
+
+async def delete_user(user_id: str, db: AsyncSession):
+    try:
+        result = await db.execute(select(User).filter(User.id == user_id))
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        task_ids = (await db.execute(owned_task_ids_statement(user_id))).scalars().all()
+
+        # Their tasks are orphaned, no longer counted for anyone
+        await db.execute(delete_owner_stats_statement(user.id))
+        await db.delete(user)
+        await db.commit()
+        await async_entity_cache.invalidate("user", user_id)
+        await async_entity_cache.invalidate("task", *task_ids)
+
+        return "Ok"
+    except Exception as _:
+        raise
@@ -1,27 +1,72 @@
-from datetime import datetime, timedelta
+import calendar
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
 from tkinter import E
 from typing import Any, Optional
+from uuid import UUID, uuid4
 
+import database
+from common.bcrypt_worker import (
+    check_password,
+    check_password_and_update,
+    hash_password,
+)
+from common.cache import TTLCache
+from common.denylist import Denylist
+from common.hashing import PasswordHasher
 from database import get_db_context
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
-from passlib.context import CryptContext
+from jose import JWTError, jwt
+from schemas.refresh_token import RefreshToken
+from schemas.revoked_token import RevokedToken
 from schemas.user import User
-from settings import JWT_ALGORITHM, JWT_SECRET
+from settings import (
+    JWT_ACCESS_TOKEN_MINUTES,
+    JWT_ALGORITHM,
+    JWT_CACHE_SIZE,
+    JWT_CACHE_TTL,
+    JWT_REFRESH_TOKEN_DAYS,
+    JWT_SECRET,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_RETRY_AFTER,
+    PASSWORD_HASH_WORKERS,
+    REVOCATION_BLOOM_CAPACITY,
+    REVOCATION_BLOOM_ERROR_RATE,
+    REVOCATION_REFRESH_OVERLAP_SECONDS,
+)
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-bcrypt_context = CryptContext(schemes=["bcrypt"])
-
 oa2_bearer = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Claims of already verified tokens, keyed by the token digest
+token_cache = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=JWT_CACHE_TTL)
+
+# Revoked access token ids (jti), refreshed from revoked_tokens in the background
+denylist = Denylist(
+    capacity=REVOCATION_BLOOM_CAPACITY, error_rate=REVOCATION_BLOOM_ERROR_RATE
+)
+
+USER_CLAIMS = ["username", "id", "first_name", "last_name", "is_admin"]
+
+
+# bcrypt runs on its own processes, shared by the sync and async services
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    retry_after=PASSWORD_HASH_RETRY_AFTER,
+)
+
 
 def create_hashed_password(password):
-    return bcrypt_context.hash(password)
+    return password_hasher.run(hash_password, password)
 
 
 def verify_password(plain_password, hashed_password):
-    return bcrypt_context.verify(plain_password, hashed_password)
+    return password_hasher.run(check_password, plain_password, hashed_password)
 
 
 def authenticate_user(username: str, password: str, db: Session):
@@ -29,8 +74,17 @@ def authenticate_user(username: str, password: str, db: Session):
         user = db.query(User).filter(User.username == username).first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        if not verify_password(password, user.password):
+
+        valid, new_hash = password_hasher.run(
+            check_password_and_update, password, user.password
+        )
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid credential")
+
+        # Hashed with an outdated BCRYPT_ROUNDS, move it to the current cost
+        if new_hash:
+            user.password = new_hash
+            db.commit()
         return user
     except Exception as e:
         raise e
@@ -38,6 +92,7 @@ def authenticate_user(username: str, password: str, db: Session):
 
 def create_access_token(user: User, expires: Optional[timedelta] = None):
     claims = {
+        "jti": str(uuid4()),
         "sub": user.username,
         "id": str(user.id),
         "first_name": user.first_name,
@@ -52,24 +107,255 @@ def create_access_token(user: User, expires: Optional[timedelta] = None):
     return jwt.encode(claims, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
-def token_interceptor(token: str = Depends(oa2_bearer)) -> User:
+def create_token_response(user: User, refresh_token: str) -> dict:
+    return {
+        "access_token": create_access_token(
+            user=user, expires=timedelta(minutes=JWT_ACCESS_TOKEN_MINUTES)
+        ),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": JWT_ACCESS_TOKEN_MINUTES * 60,
+    }
+
+
+def new_refresh_token(user_id, family_id: Optional[UUID] = None):
+    """Row and signed token of a refresh token, left to the caller to commit"""
+    now = datetime.now()
+    id = uuid4()
+    row = RefreshToken(
+        id=id,
+        user_id=user_id,
+        family_id=family_id or id,
+        created_at=now,
+        expires_at=now + timedelta(days=JWT_REFRESH_TOKEN_DAYS),
+    )
+    claims = {
+        "type": "refresh",
+        "jti": str(row.id),
+        "id": str(user_id),
+        "family": str(row.family_id),
+        "exp": row.expires_at,
+    }
+    return row, jwt.encode(claims, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def decode_refresh_token(refresh_token: str) -> dict[str, Any]:
     try:
-        payload: dict[str, Any] = jwt.decode(
-            token, JWT_SECRET, algorithms=[JWT_ALGORITHM]
+        claims = jwt.decode(refresh_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if claims.get("type") != "refresh":
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return claims
+
+
+def rotate_statement(claims: dict[str, Any], now: datetime):
+    # Only one of two concurrent refreshes with the same token can win
+    return (
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == claims["jti"],
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
         )
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def revoke_family_statement(claims: dict[str, Any], now: datetime):
+    return (
+        update(RefreshToken)
+        .where(
+            RefreshToken.family_id == claims["family"],
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def create_refresh_token(user: User, db: Session) -> str:
+    try:
+        row, refresh_token = new_refresh_token(user.id)
+        db.add(row)
+        db.commit()
+
+        return refresh_token
+    except Exception as _:
+        db.rollback()
+        raise
+
+
+def refresh_access_token(refresh_token: str, db: Session):
+    """Rotate a refresh token: no password check, lookups by primary key only
 
-        user = {
-            "username": payload["sub"],
-            "id": payload["id"],
-            "first_name": payload["first_name"],
-            "last_name": payload["last_name"],
-            "is_admin": payload["is_admin"],
-        }
+    A token that was already rotated (or is unknown) is treated as stolen and
+    revokes every token of its family.
+    """
+    claims = decode_refresh_token(refresh_token)
+    now = datetime.now()
 
-        if (user["id"] is None) or (user["username"] is None):
-            raise HTTPException(status_code=401, detail="ABC")
+    try:
+        if db.execute(rotate_statement(claims, now)).rowcount != 1:
+            db.execute(revoke_family_statement(claims, now))
+            db.commit()
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+        user = db.get(User, UUID(claims["id"]))
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+        row, new_token = new_refresh_token(user.id, family_id=claims["family"])
+        db.add(row)
+        db.commit()
+
+        return create_token_response(user, new_token)
+    except Exception as _:
+        db.rollback()
+        raise
+
+
+def verify_token(token: str) -> dict[str, Any]:
+    """Decode and verify the token, served from token_cache when already seen
+
+    A cached entry never outlives the `exp` claim of its token.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    user = token_cache.get(key)
+    if user is not None:
+        return user
+
+    payload: dict[str, Any] = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    # Refresh tokens are only accepted by POST /auth/refresh
+    if payload.get("type", "access") != "access":
+        raise HTTPException(status_code=401, detail="Invalid token type")
+
+    user = {
+        "username": payload["sub"],
+        "id": payload["id"],
+        "first_name": payload["first_name"],
+        "last_name": payload["last_name"],
+        "is_admin": payload["is_admin"],
+        "jti": payload.get("jti"),
+        "exp": payload.get("exp"),
+    }
+
+    if (user["id"] is None) or (user["username"] is None):
+        raise HTTPException(status_code=401, detail="ABC")
+
+    token_cache.set(key, user, expires_at=payload.get("exp"))
+    return user
+
+
+def token_interceptor(request: Request, token: str = Depends(oa2_bearer)) -> User:
+    try:
+        claims = verify_token(token)
+
+        # In-memory lookup, cached tokens included
+        if claims["jti"] is not None and claims["jti"] in denylist:
+            raise HTTPException(status_code=401, detail="Token revoked")
+
+        # Lets the routing session keep the reads of recent writers on the primary
+        request.state.user_id = claims["id"]
+        request.state.token_claims = claims
+        return User(**{key: claims[key] for key in USER_CLAIMS})
+    except Exception as e:
+        raise e
+
+
+def revoked_token_row(claims: dict[str, Any], now: datetime) -> RevokedToken:
+    # exp is the naive datetime.now() of create_access_token read as UTC
+    expires_at = datetime.fromtimestamp(claims["exp"], timezone.utc)
+    return RevokedToken(
+        id=claims["jti"],
+        user_id=claims["id"],
+        expires_at=expires_at.replace(tzinfo=None),
+        created_at=now,
+    )
+
+
+def revoke_token_statement(dialect: str, claims: dict[str, Any], now: datetime):
+    """Insert the revoked token row, a second logout with the token is a no-op"""
+    row = revoked_token_row(claims, now)
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(RevokedToken).values(
+        id=row.id,
+        user_id=row.user_id,
+        expires_at=row.expires_at,
+        created_at=row.created_at,
+    )
+    return statement.on_conflict_do_nothing(index_elements=[RevokedToken.id])
+
+
+def revocations_statement(since: Optional[datetime]):
+    query = select(
+        RevokedToken.id, RevokedToken.expires_at, RevokedToken.created_at
+    ).where(RevokedToken.expires_at > datetime.now())
+
+    if since is not None:
+        overlap = timedelta(seconds=REVOCATION_REFRESH_OVERLAP_SECONDS)
+        query = query.where(RevokedToken.created_at >= since - overlap)
+
+    return query
+
+
+def apply_revocations(rows):
+    for id, expires_at, created_at in rows:
+        denylist.add(str(id), calendar.timegm(expires_at.timetuple()))
+        if created_at and (denylist.since is None or created_at > denylist.since):
+            denylist.since = created_at
+
+    denylist.refreshed_at = time.time()
+    denylist.purge(force=False)
+
+
+def refresh_denylist():
+    """Load the revocations committed since the last refresh"""
+    if database.SessionLocal is None:
+        database.init_engine()
+
+    with database.SessionLocal() as db:
+        apply_revocations(db.execute(revocations_statement(denylist.since)).all())
+
+
+def logout(claims: dict[str, Any], refresh_token: Optional[str], db: Session):
+    """Revoke the access token in use and the refresh token family if given"""
+    now = datetime.now()
+
+    try:
+        if claims.get("jti") is not None:
+            db.execute(revoke_token_statement(db.get_bind().dialect.name, claims, now))
+
+        if refresh_token:
+            refresh_claims = decode_refresh_token(refresh_token)
+            if refresh_claims["id"] != claims["id"]:
+                raise HTTPException(status_code=401, detail="Invalid refresh token")
+            db.execute(revoke_family_statement(refresh_claims, now))
+
+        db.commit()
+
+        # Effective at once on this worker, on the others after their refresh
+        if claims.get("jti") is not None:
+            denylist.add(claims["jti"], claims["exp"])
+        return "Ok"
+    except Exception as _:
+        db.rollback()
+        raise
+
+
+def token_claims(request: Request, token: str = Depends(oa2_bearer)) -> dict[str, Any]:
+    """Verified claims of the request token (jti, exp...), for logout
+
+    Skips the denylist: a retried logout with a revoked token is still "Ok"
+    """
+    try:
+        claims = verify_token(token)
 
-        return User(**user)
+        request.state.user_id = claims["id"]
+        request.state.token_claims = claims
+        return claims
     except Exception as e:
         raise e
 
@@ -1,12 +1,27 @@
 from datetime import datetime
 from math import e
-
+from typing import Optional
+
+from common.entity_cache import NOT_FOUND, entity_cache
+from common.fields import (
+    list_fields,
+    parse_fields,
+    projection,
+    sparse_list,
+    sparse_model,
+)
+from common.pagination import keyset_page, split_page
+from common.routing import read_from_replica
 from fastapi import HTTPException
 from models.company import CompanyDto, CreateCompanyDto, UpdateCompanyDto
 from models.user import UserDto
 from schemas.company import Company
 from schemas.user import User
-from sqlalchemy.orm import Session, joinedload
+from services.task_throughput import delete_company_throughput_statement
+from services.user import USER_LIST_FIELDS, USER_NESTED_FIELDS, user_load_options
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, load_only, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 
 def create_company(request: CreateCompanyDto, db: Session):
@@ -25,43 +40,144 @@ def create_company(request: CreateCompanyDto, db: Session):
         db.add(new_company)
         db.commit()
         db.refresh(new_company)
+        # Just created, it has no employees to lazy load
+        set_committed_value(new_company, "employees", [])
 
-        return CompanyDto(**new_company.__dict__)
+        return CompanyDto.model_validate(new_company)
     except Exception as _:
         raise
 
 
-def get_companies(page: int, limit: int, db: Session):
+# Fields of GET /companies without `fields=`, the same as before fieldsets existed
+COMPANY_LIST_FIELDS = list_fields(CompanyDto)
+# Embedded employees (and their tasks) follow the default fieldset of GET /users
+COMPANY_NESTED_FIELDS = (
+    (
+        "employees",
+        list[sparse_model(UserDto, USER_LIST_FIELDS, USER_NESTED_FIELDS)],
+    ),
+)
+
+
+def company_fields(value: Optional[str]) -> tuple:
+    return parse_fields(value, CompanyDto, COMPANY_LIST_FIELDS)
+
+
+def company_load_options(fields: tuple) -> list:
+    options = [load_only(*projection(Company, fields))]
+    if "employees" in fields:
+        options.append(
+            selectinload(Company.employees).options(
+                *user_load_options(USER_LIST_FIELDS)
+            )
+        )
+    return options
+
+
+def company_dtos(rows, fields: tuple) -> list[CompanyDto]:
+    adapter = sparse_list(CompanyDto, fields, COMPANY_NESTED_FIELDS)
+    return adapter.validate_python(rows, from_attributes=True)
+
+
+def get_companies(
+    page: int, limit: int, db: Session, fields: tuple = COMPANY_LIST_FIELDS
+):
     try:
         offset = (page - 1) * limit
-        return (
+        rows = (
             db.query(Company)
+            .options(*company_load_options(fields))
             .order_by(Company.created_at)
             .offset(offset)
             .limit(limit)
             .all()
         )
+        return company_dtos(rows, fields)
     except Exception as _:
         raise
 
 
-def get_company_by_id(company_id: str, user: User, db: Session):
+def get_companies_by_cursor(
+    cursor: Optional[str],
+    limit: int,
+    db: Session,
+    fields: tuple = COMPANY_LIST_FIELDS,
+):
     try:
-        company = (
-            db.query(Company)
-            .options(joinedload(Company.employees))
-            .filter(Company.id == company_id)
-            .first()
+        query = db.query(Company).options(*company_load_options(fields))
+        rows, next_cursor = split_page(
+            keyset_page(query, Company, cursor, limit).all(), limit
         )
-        if not company:
-            raise HTTPException(status_code=404, detail="Company not found")
+        return company_dtos(rows, fields), next_cursor
+    except Exception as _:
+        raise
+
+
+def membership_statement(company_id: str, user_id: str):
+    """EXISTS on the users primary key, no employee row is loaded"""
+    return select(exists().where(User.id == user_id, User.company_id == company_id))
+
+
+def employees_statement(company_id: str, page: int, limit: int):
+    """One page of employees without their tasks, GET /users/{id} has them"""
+    return (
+        select(User)
+        .options(noload(User.tasks))
+        .filter(User.company_id == company_id)
+        .order_by(User.created_at, User.id)
+        .offset((page - 1) * limit)
+        .limit(limit)
+    )
 
-        if (user.is_admin is True) or any(
-            str(user.id) == str(employee.id) for employee in company.employees
-        ):
-            return CompanyDto(**company.__dict__)
 
-        raise HTTPException(status_code=403, detail="User is not in this company")
+def get_company_by_id(
+    company_id: str,
+    user: User,
+    db: Session,
+    include_employees: bool = False,
+    employees_page: int = 1,
+    employees_limit: int = 10,
+):
+    try:
+        company = entity_cache.get("company", company_id, CompanyDto)
+        if company is None:
+            # The cached entry holds the company only, employees are paginated
+            company = (
+                db.query(Company)
+                .options(noload(Company.employees))
+                .filter(Company.id == company_id)
+                .first()
+            )
+            if company:
+                company = CompanyDto.model_validate(company)
+                if not read_from_replica(db):
+                    entity_cache.set("company", company_id, company)
+            elif not read_from_replica(db):
+                entity_cache.set_not_found("company", company_id)
+
+        if not company or company is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Company not found")
+
+        # Membership is not cached, it changes with the user's company_id
+        if (user.is_admin is False) and not db.execute(
+            membership_statement(company_id, user.id)
+        ).scalar():
+            raise HTTPException(status_code=403, detail="User is not in this company")
+
+        employees = []
+        if include_employees:
+            employees = (
+                db.execute(
+                    employees_statement(company_id, employees_page, employees_limit)
+                )
+                .scalars()
+                .all()
+            )
+
+        # The cached entry holds the company only, employees are paginated
+        return CompanyDto(
+            **{**company.model_dump(exclude={"employees"}), "employees": employees}
+        )
 
     except Exception as _:
         raise
@@ -77,19 +193,26 @@ def update_company(
         raise HTTPException(status_code=400, detail="Missing fields")
 
     try:
-        company = db.query(Company).filter(Company.id == company_id).first()
+        company = (
+            db.query(Company)
+            .options(noload(Company.employees))
+            .filter(Company.id == company_id)
+            .first()
+        )
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
 
         for key, value in request.__dict__.items():
             if value:
                 setattr(company, key, value)
+        company.updated_at = datetime.now()
 
         db.add(company)
         db.commit()
         db.refresh(company)
+        entity_cache.invalidate("company", company_id)
 
-        return CompanyDto(**company.__dict__)
+        return CompanyDto.model_validate(company)
     except Exception as _:
         raise
 
@@ -100,8 +223,14 @@ def delete_company(company_id: str, db: Session):
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
 
+        # Loaded by the delete anyway, the ORM clears their company_id
+        user_ids = [employee.id for employee in company.employees]
+
+        db.execute(delete_company_throughput_statement(company.id))
         db.delete(company)
         db.commit()
+        entity_cache.invalidate("company", company_id)
+        entity_cache.invalidate("user", *user_ids)
 
         return "Ok"
     except Exception as _:
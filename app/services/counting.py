@@ -0,0 +1,52 @@
+from typing import Optional
+
+from settings import TOTAL_COUNT_EXACT_LIMIT
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+
+def count_statement(query, limit=None):
+    """COUNT(*) of the rows of `query`, of at most `limit` of them"""
+    query = query.order_by(None)
+    if limit is not None:
+        query = query.limit(limit)
+    return select(func.count()).select_from(query.subquery())
+
+
+def reltuples_statement(table: str):
+    """Row estimate of the planner, -1 until the table is first analyzed"""
+    return text(
+        "SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"
+    ).bindparams(table=table)
+
+
+def planner_estimate(total: int, reltuples) -> Optional[tuple[int, bool]]:
+    if reltuples is None or reltuples < 0:
+        return None
+    # Never below what was just counted
+    return max(int(reltuples), total), True
+
+
+def total_count(db: Session, query, scoped: bool = False, table: Optional[str] = None):
+    """(total, estimated) of the rows of `query`
+
+    Scoped queries are counted, the owner indexes bound the scan. Others are
+    counted up to TOTAL_COUNT_EXACT_LIMIT rows; past it an unfiltered query
+    over `table` takes the planner's estimate on Postgres, anything else the
+    capped count as a lower bound: never an unbounded COUNT(*).
+    """
+    if scoped:
+        return db.execute(count_statement(query)).scalar_one(), False
+
+    total = db.execute(count_statement(query, TOTAL_COUNT_EXACT_LIMIT + 1)).scalar()
+    if total <= TOTAL_COUNT_EXACT_LIMIT:
+        return total, False
+
+    if table is not None and db.get_bind().dialect.name == "postgresql":
+        estimated = planner_estimate(
+            total, db.execute(reltuples_statement(table)).scalar()
+        )
+        if estimated is not None:
+            return estimated
+
+    return total, True
@@ -1,9 +1,50 @@
+from collections import Counter
 from datetime import datetime
+from typing import Any, Callable, Optional
+from uuid import UUID, uuid4
 
+from common.entity_cache import NOT_FOUND, entity_cache
+from common.enums import TaskStatus
+from common.etag import field, make_etag, version
+from common.export import ExportFormat, RowSerializer
+from common.fields import list_fields, parse_fields, projection, sparse_list
+from common.pagination import keyset_page, split_page
+from common.routing import read_from_replica
 from fastapi import HTTPException
-from models.task import CreateTaskDto, TaskDto, UpdateTaskDto
-from schemas.task import Task
+from models.task import (
+    BulkChangeTaskResultDto,
+    BulkCreateTaskResultDto,
+    BulkUpdateTaskDto,
+    CreateTaskDto,
+    TaskChangeSetDto,
+    TaskDto,
+    TaskDtoList,
+    TaskFilterDto,
+    TaskQueryDto,
+    UpdateTaskDto,
+)
+from pydantic import ValidationError
+from schemas.task import SEARCH_CONFIG, Task
 from schemas.user import User
+from services.counting import total_count
+from services.task_stats import apply_task_stats, stats_deltas
+from services.task_throughput import apply_task_throughput, completions
+from settings import (
+    TASK_BULK_BATCH_SIZE,
+    TASK_BULK_MAX_ITEMS,
+    TASK_EXPORT_CHUNK_SIZE,
+)
+from sqlalchemy import (
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    update,
+)
 from sqlalchemy.orm import Session
 
 
@@ -26,41 +67,446 @@ def create_task(request: CreateTaskDto, user: User, db: Session):
         new_task = Task(**new_task)
 
         db.add(new_task)
+        apply_task_stats(
+            db, stats_deltas(added=[(user.id, new_task.status, new_task.priority)])
+        )
+        apply_task_throughput(
+            db,
+            user.id,
+            new_task.created_at,
+            created=1,
+            completed=completions(None, new_task.status),
+        )
         db.commit()
         db.refresh(new_task)
+        # The owner's cached UserDto lists its tasks
+        entity_cache.invalidate("user", user.id)
 
-        return TaskDto(**new_task.__dict__)
+        return TaskDto.model_validate(new_task)
 
     except Exception as _:
         raise
 
 
-def get_tasks(page: int, limit: int, user: User, db: Session):
+def prepare_bulk_tasks(items: list[dict[str, Any]], user: User):
+    """Validate every item like create_task does
+
+    Returns one result per item, in request order, and the rows to insert
+    for the valid ones. Ids of created items are filled in after the insert.
+    """
+    if len(items) > TASK_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {TASK_BULK_MAX_ITEMS} tasks per request"
+        )
+
+    now = datetime.now()
+    results, rows = [], []
+    for index, item in enumerate(items):
+        try:
+            request = CreateTaskDto.model_validate(item)
+        except ValidationError as error:
+            errors = error.errors(
+                include_url=False, include_context=False, include_input=False
+            )
+            results.append({"index": index, "status": "invalid", "errors": errors})
+            continue
+
+        if not all([request.summary, request.description]):
+            results.append(
+                {"index": index, "status": "invalid", "errors": ["Missing fields"]}
+            )
+            continue
+
+        row = {
+            **request.__dict__,
+            "id": uuid4(),
+            "owner_id": user.id,
+            "created_at": now,
+        }
+        results.append({"index": index, "status": "created"})
+        rows.append(row)
+
+    return results, rows
+
+
+def bulk_insert_statement():
+    # insertmanyvalues renders one multi-row INSERT ... RETURNING per batch
+    return (
+        insert(Task)
+        .returning(Task.id, sort_by_parameter_order=True)
+        .execution_options(insertmanyvalues_page_size=TASK_BULK_BATCH_SIZE)
+    )
+
+
+def bulk_result(results: list[dict], ids: list) -> BulkCreateTaskResultDto:
+    created = [result for result in results if result["status"] == "created"]
+    for result, id in zip(created, ids):
+        result["id"] = id
+
+    return BulkCreateTaskResultDto(
+        created=len(created), invalid=len(results) - len(created), results=results
+    )
+
+
+def create_tasks_bulk(items: list[dict[str, Any]], user: User, db: Session):
+    results, rows = prepare_bulk_tasks(items, user)
+
+    try:
+        ids = []
+        if rows:
+            ids = db.execute(bulk_insert_statement(), rows).scalars().all()
+            added = [(user.id, row["status"], row["priority"]) for row in rows]
+            apply_task_stats(db, stats_deltas(added=added))
+            completed = sum(completions(None, row["status"]) for row in rows)
+            apply_task_throughput(
+                db, user.id, rows[0]["created_at"], len(rows), completed
+            )
+            db.commit()
+            entity_cache.invalidate("user", user.id)
+
+        return bulk_result(results, ids)
+    except Exception as _:
+        db.rollback()
+        raise
+
+
+TASK_COLUMNS = [
+    Task.id,
+    Task.summary,
+    Task.description,
+    Task.status,
+    Task.priority,
+    Task.owner_id,
+    Task.created_at,
+    Task.updated_at,
+]
+
+
+# Fields of GET /tasks without `fields=`, the same as before fieldsets existed
+TASK_LIST_FIELDS = list_fields(TaskDto)
+
+
+def task_fields(value: Optional[str]) -> tuple:
+    return parse_fields(value, TaskDto, TASK_LIST_FIELDS)
+
+
+# Predicate of the partial index on open tasks. Rendered inline: a bound
+# parameter would keep the planner from matching it to the index predicate
+OPEN_TASK = Task.status != bindparam(
+    "done", TaskStatus.DONE, type_=Task.status.type, literal_execute=True
+)
+
+# Priority and status are native enums on Postgres, they sort in declaration
+# order: low < medium < high, backlog < todo < in_progress < done
+TASK_SORT_COLUMNS = {
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "priority": Task.priority,
+    "status": Task.status,
+}
+
+
+def task_query_clauses(params: Optional[TaskQueryDto], user: User) -> list:
+    """WHERE clauses of GET /tasks, normal users only ever see their tasks"""
+    clauses = []
+    if user.is_admin is False:
+        if params and params.owner_id and str(params.owner_id) != str(user.id):
+            raise HTTPException(
+                status_code=403, detail="User can only list their own tasks"
+            )
+        clauses.append(Task.owner_id == user.id)
+    if params is None:
+        return clauses
+
+    if params.owner_id is not None and user.is_admin:
+        clauses.append(Task.owner_id == params.owner_id)
+    # A single value is an equality, the (owner_id, status, ...) index serves it
+    for column, values in (
+        (Task.status, params.status),
+        (Task.priority, params.priority),
+    ):
+        if values and len(values) == 1:
+            clauses.append(column == values[0])
+        elif values:
+            clauses.append(column.in_(values))
+    if params.open is not None:
+        clauses.append(OPEN_TASK if params.open else Task.status == TaskStatus.DONE)
+    if params.created_after is not None:
+        clauses.append(Task.created_at >= params.created_after)
+    if params.created_before is not None:
+        clauses.append(Task.created_at < params.created_before)
+    if params.updated_after is not None:
+        clauses.append(Task.updated_at >= params.updated_after)
+    if params.updated_before is not None:
+        clauses.append(Task.updated_at < params.updated_before)
+    return clauses
+
+
+def task_order_by(params: Optional[TaskQueryDto]) -> list:
+    """ORDER BY of `sort`, ties broken on (created_at, id) like the indexes"""
+    keys = params.sort_keys() if params else [("created_at", False)]
+    descending = keys[-1][1]
+    names = [name for name, _ in keys]
+    keys += [(name, descending) for name in ("created_at", "id") if name not in names]
+
+    columns = {**TASK_SORT_COLUMNS, "id": Task.id}
+    return [columns[name].desc() if desc else columns[name] for name, desc in keys]
+
+
+def tasks_statement(
+    user: User,
+    columns: list = TASK_COLUMNS,
+    params: Optional[TaskQueryDto] = None,
+):
+    """Plain rows of the TaskDto columns, no ORM object is built for a page"""
+    return select(*columns).filter(*task_query_clauses(params, user))
+
+
+def task_dtos(keys, rows, fields: Optional[tuple] = None) -> list[TaskDto]:
+    """Validate a page once, from dicts: much cheaper than from_attributes"""
+    adapter = TaskDtoList if fields is None else sparse_list(TaskDto, fields)
+    return adapter.validate_python([dict(zip(keys, row)) for row in rows])
+
+
+def get_tasks(
+    page: int,
+    limit: int,
+    user: User,
+    db: Session,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
     try:
         offset = (page - 1) * limit
-        query = db.query(Task)
+        statement = (
+            tasks_statement(user, projection(Task, fields), params)
+            .order_by(*task_order_by(params))
+            .offset(offset)
+            .limit(limit)
+        )
+        result = db.execute(statement)
+        return task_dtos(result.keys(), result.all(), fields)
+    except Exception as _:
+        raise
 
-        if user.is_admin is False:
-            query = query.filter(Task.owner_id == user.id)
 
-        return query.order_by(Task.created_at).offset(offset).limit(limit).all()
+def get_tasks_by_cursor(
+    cursor: Optional[str],
+    limit: int,
+    user: User,
+    db: Session,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        statement = tasks_statement(user, projection(Task, fields), params)
+        result = db.execute(keyset_page(statement, Task, cursor, limit))
+        rows, next_cursor = split_page(result.all(), limit)
+        return task_dtos(result.keys(), rows, fields), next_cursor
     except Exception as _:
         raise
 
 
-def get_task_by_id(task_id: str, user: User, db: Session):
+def tasks_total_query(user: User, params: Optional[TaskQueryDto] = None):
+    """total_count() arguments of the tasks GET /tasks pages through"""
+    clauses = task_query_clauses(params, user)
+    scoped = user.is_admin is False or (params is not None and bool(params.owner_id))
+    # Only an unfiltered list is as large as the table
+    table = None if clauses else "tasks"
+    return select(Task.id).where(*clauses), scoped, table
+
+
+def get_tasks_total(
+    user: User, db: Session, params: Optional[TaskQueryDto] = None
+) -> tuple[int, bool]:
     try:
-        task = db.query(Task).filter(Task.id == task_id).first()
+        return total_count(db, *tasks_total_query(user, params))
+    except Exception as _:
+        raise
 
-        if not task:
+
+tasks_fts = table("tasks_fts", column("id"))
+
+
+def fts5_query(q: str) -> str:
+    """Every word of `q` as an FTS5 string, operators and syntax are not parsed"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in q.split())
+
+
+def search_statement(
+    q: str,
+    dialect: str,
+    user: User,
+    columns: list = TASK_COLUMNS,
+    params: Optional[TaskQueryDto] = None,
+):
+    """Tasks matching `q` best first, scoped and filtered like GET /tasks"""
+    query = tasks_statement(user, columns, params)
+    if dialect == "postgresql":
+        # websearch syntax: words are ANDed, "quoted phrase", or, -excluded
+        config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+        tsquery = func.websearch_to_tsquery(config, q)
+        vector = literal_column("tasks.search_vector")
+        return query.filter(vector.op("@@")(tsquery)).order_by(
+            func.ts_rank_cd(vector, tsquery).desc(), Task.created_at, Task.id
+        )
+
+    # bm25() is lower for better matches, summary weighs like the 'A' weight
+    rank = func.bm25(literal_column("tasks_fts"), 0.0, 1.0, 0.4)
+    return (
+        query.join(tasks_fts, tasks_fts.c.id == Task.id)
+        .filter(literal_column("tasks_fts").op("MATCH")(fts5_query(q)))
+        .order_by(rank, Task.created_at, Task.id)
+    )
+
+
+def search_tasks(
+    q: str,
+    page: int,
+    limit: int,
+    user: User,
+    db: Session,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        dialect = db.get_bind().dialect.name
+        statement = (
+            search_statement(q, dialect, user, projection(Task, fields), params)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
+        result = db.execute(statement)
+        return task_dtos(result.keys(), result.all(), fields)
+    except Exception as _:
+        raise
+
+
+def export_statement(user: User):
+    # Plain column rows, no ORM identity map growing with the result
+    return (
+        tasks_statement(user)
+        .order_by(Task.created_at, Task.id)
+        .execution_options(stream_results=True, yield_per=TASK_EXPORT_CHUNK_SIZE)
+    )
+
+
+def export_tasks(format: ExportFormat, user: User, sessions: Callable[[], Session]):
+    """Yield the tasks as NDJSON or CSV chunks read from a server-side cursor
+
+    The stream outlives the request dependencies: the session is opened from
+    `sessions` here and closed when the stream ends.
+    """
+    serialize = RowSerializer(TASK_COLUMNS, format)
+    with sessions() as db:
+        result = db.execute(export_statement(user))
+        for rows in result.partitions():
+            yield serialize(rows)
+
+        # CSV header of an empty export
+        if serialize.header:
+            yield serialize([])
+
+
+def task_etag(task) -> str:
+    return make_etag(version(task), field(task, "owner_id"))
+
+
+def tasks_etag(tasks, fields: tuple = TASK_LIST_FIELDS) -> str:
+    # Two fieldsets of the same page are two representations
+    return make_etag(",".join(fields), *(version(task) for task in tasks))
+
+
+def tasks_versions_statement(user: User, params: Optional[TaskQueryDto] = None):
+    """The columns of the list ETags, no summary/description is read"""
+    return tasks_statement(user, [Task.id, Task.created_at, Task.updated_at], params)
+
+
+def get_tasks_etag(
+    page: int,
+    limit: int,
+    user: User,
+    db: Session,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        statement = (
+            tasks_versions_statement(user, params)
+            .order_by(*task_order_by(params))
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
+        return tasks_etag(db.execute(statement).all(), fields)
+    except Exception as _:
+        raise
+
+
+def get_tasks_by_cursor_etag(
+    cursor: Optional[str],
+    limit: int,
+    user: User,
+    db: Session,
+    fields: tuple = TASK_LIST_FIELDS,
+    params: Optional[TaskQueryDto] = None,
+):
+    try:
+        statement = keyset_page(
+            tasks_versions_statement(user, params), Task, cursor, limit
+        )
+        rows, _ = split_page(db.execute(statement).all(), limit)
+        return tasks_etag(rows, fields)
+    except Exception as _:
+        raise
+
+
+def task_version_statement(task_id: str):
+    return select(Task.id, Task.owner_id, Task.created_at, Task.updated_at).filter(
+        Task.id == task_id
+    )
+
+
+def verify_task_reader(task, user: User):
+    if (user.is_admin is False) and (str(task.owner_id) != str(user.id)):
+        raise HTTPException(status_code=403, detail="User is not owner of this task")
+
+
+def get_task_etag(task_id: str, user: User, db: Session):
+    """ETag of GET /tasks/{task_id}, from the cache or the version columns"""
+    try:
+        task = entity_cache.get("task", task_id, TaskDto)
+        if task is None:
+            task = db.execute(task_version_statement(task_id)).first()
+            if not task and not read_from_replica(db):
+                entity_cache.set_not_found("task", task_id)
+
+        if not task or task is NOT_FOUND:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        if (user.is_admin is False) and (str(task.owner_id) != str(user.id)):
-            raise HTTPException(
-                status_code=403, detail="User is not owner of this task"
-            )
+        verify_task_reader(task, user)
+        return task_etag(task)
+    except Exception as _:
+        raise
+
+
+def get_task_by_id(task_id: str, user: User, db: Session):
+    try:
+        task = entity_cache.get("task", task_id, TaskDto)
+        if task is None:
+            task = db.query(Task).filter(Task.id == task_id).first()
+            if task:
+                task = TaskDto.model_validate(task)
+                if not read_from_replica(db):
+                    entity_cache.set("task", task_id, task)
+            elif not read_from_replica(db):
+                entity_cache.set_not_found("task", task_id)
+
+        if not task or task is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Task not found")
 
-        return TaskDto(**task.__dict__)
+        # Checked on every read, the cached entry is shared by all users
+        verify_task_reader(task, user)
+        return task
     except Exception as _:
         raise
 
@@ -72,21 +518,37 @@ def update_task(
     db: Session,
 ):
     try:
+        # Locked: a concurrent update must see this one's status for the stats
         task = (
-            db.query(Task).filter(Task.id == task_id, Task.owner_id == user.id).first()
+            db.query(Task)
+            .filter(Task.id == task_id, Task.owner_id == user.id)
+            .with_for_update()
+            .first()
         )
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
+        before = (task.owner_id, task.status, task.priority)
         for key, value in request.__dict__.items():
             if value:
                 setattr(task, key, value)
+        task.updated_at = datetime.now()
 
         db.add(task)
+        after = (task.owner_id, task.status, task.priority)
+        apply_task_stats(db, stats_deltas(added=[after], removed=[before]))
+        apply_task_throughput(
+            db,
+            task.owner_id,
+            task.updated_at,
+            completed=completions(before[1], task.status),
+        )
         db.commit()
         db.refresh(task)
+        entity_cache.invalidate("task", task_id)
+        entity_cache.invalidate("user", user.id)
 
-        return TaskDto(**task.__dict__)
+        return TaskDto.model_validate(task)
     except Exception as _:
         raise
 
@@ -94,14 +556,162 @@ def update_task(
 def delete_task(task_id: str, user: User, db: Session):
     try:
         task = (
-            db.query(Task).filter(Task.id == task_id, Task.owner_id == user.id).first()
+            db.query(Task)
+            .filter(Task.id == task_id, Task.owner_id == user.id)
+            .with_for_update()
+            .first()
         )
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
         db.delete(task)
+        removed = [(task.owner_id, task.status, task.priority)]
+        apply_task_stats(db, stats_deltas(removed=removed))
         db.commit()
+        entity_cache.invalidate("task", task_id)
+        entity_cache.invalidate("user", user.id)
 
         return "Ok"
     except Exception as _:
         raise
+
+
+def task_filter_clauses(filter: TaskFilterDto, user: User):
+    """WHERE clauses of the bulk endpoints, always scoped to the user's own tasks
+
+    Like update_task/delete_task, admins can not change others tasks either.
+    """
+    clauses = []
+    if filter.ids is not None:
+        clauses.append(Task.id.in_(filter.ids))
+    if filter.status is not None:
+        clauses.append(Task.status == filter.status)
+    if filter.priority is not None:
+        clauses.append(Task.priority == filter.priority)
+    if filter.created_before is not None:
+        clauses.append(Task.created_at < filter.created_before)
+
+    # An empty filter would touch every task the user owns
+    if not clauses:
+        raise HTTPException(status_code=400, detail="Missing filter")
+
+    return [Task.owner_id == user.id, *clauses]
+
+
+def bulk_update_statement(request: BulkUpdateTaskDto, user: User):
+    changes = request.changes.model_dump(exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="Missing fields")
+
+    return (
+        update(Task)
+        .where(*task_filter_clauses(request.filter, user))
+        .values(**changes, updated_at=datetime.now())
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bulk_transition_statement(request: BulkUpdateTaskDto, user: User):
+    """Bulk update returning the id, status and priority each task had before
+
+    The CTE locks the matching rows and hands their old values to RETURNING, a
+    task created meanwhile is neither updated nor counted. PostgreSQL only:
+    SQLite can not return columns of the FROM clause.
+    """
+    old = (
+        select(Task.id, Task.status, Task.priority)
+        .where(*task_filter_clauses(request.filter, user))
+        .with_for_update()
+        .cte("old_tasks")
+    )
+    return (
+        bulk_update_statement(request, user)
+        .where(Task.id == old.c.id)
+        .returning(old.c.status, old.c.priority)
+    )
+
+
+def transition_groups_statement(filter: TaskFilterDto, user: User):
+    """(status, priority, count) of the tasks a bulk update is about to change
+
+    SQLite runs it before the UPDATE with the same filter, writers to the
+    database file are serialized.
+    """
+    return (
+        select(Task.status, Task.priority, func.count())
+        .where(*task_filter_clauses(filter, user))
+        .group_by(Task.status, Task.priority)
+    )
+
+
+def returned_groups(rows) -> list[tuple]:
+    """(status, priority, count) of the old values of bulk_transition_statement"""
+    counts = Counter((row.status, row.priority) for row in rows)
+    return [(status, priority, count) for (status, priority), count in counts.items()]
+
+
+def transition_totals(groups, changes: TaskChangeSetDto, user: User):
+    """Stats deltas and completions of applying `changes` to the `groups`"""
+    deltas, completed = Counter(), 0
+    for status, priority, count in groups:
+        after = (changes.status or status, changes.priority or priority)
+        for key, sign in (((status, priority), -1), (after, 1)):
+            deltas[(UUID(str(user.id)), *key)] += sign * count
+        completed += completions(status, after[0]) * count
+    return deltas, completed
+
+
+def bulk_delete_statement(filter: TaskFilterDto, user: User):
+    return (
+        delete(Task)
+        .where(*task_filter_clauses(filter, user))
+        .returning(Task.id, Task.status, Task.priority)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def update_tasks(request: BulkUpdateTaskDto, user: User, db: Session):
+    statement = bulk_update_statement(request, user)
+
+    try:
+        groups = []
+        if not (request.changes.status or request.changes.priority):
+            ids = db.execute(statement).scalars().all()
+        elif db.get_bind().dialect.name == "postgresql":
+            rows = db.execute(bulk_transition_statement(request, user)).all()
+            ids, groups = [row.id for row in rows], returned_groups(rows)
+        else:
+            counted = transition_groups_statement(request.filter, user)
+            groups = db.execute(counted).all()
+            ids = db.execute(statement).scalars().all()
+
+        deltas, completed = transition_totals(groups, request.changes, user)
+        apply_task_stats(db, deltas)
+        apply_task_throughput(db, user.id, datetime.now(), completed=completed)
+        db.commit()
+        entity_cache.invalidate("task", *ids)
+        entity_cache.invalidate("user", user.id)
+
+        return BulkChangeTaskResultDto(affected=len(ids), ids=ids)
+    except Exception as _:
+        db.rollback()
+        raise
+
+
+def delete_tasks(filter: TaskFilterDto, user: User, db: Session):
+    statement = bulk_delete_statement(filter, user)
+
+    try:
+        rows = db.execute(statement).all()
+        ids = [row.id for row in rows]
+        removed = [(user.id, row.status, row.priority) for row in rows]
+        apply_task_stats(db, stats_deltas(removed=removed))
+        db.commit()
+        entity_cache.invalidate("task", *ids)
+        entity_cache.invalidate("user", user.id)
+
+        return BulkChangeTaskResultDto(affected=len(ids), ids=ids)
+    except Exception as _:
+        db.rollback()
+        raise
@@ -0,0 +1,178 @@
+from collections import Counter
+from typing import Iterable, Optional
+from uuid import UUID
+
+from common.enums import TaskPriority, TaskStatus
+from fastapi import HTTPException
+from models.task import TaskStatsDto, TaskStatsGroupDto
+from schemas.task import Task
+from schemas.task_stats import TaskStats
+from schemas.user import User
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# (owner_id, status, priority) of a task
+StatsKey = tuple[UUID, TaskStatus, TaskPriority]
+
+
+def stats_deltas(added: Iterable[tuple] = (), removed: Iterable[tuple] = ()) -> Counter:
+    """Count changes per group of the tasks added to and removed from it"""
+    deltas = Counter()
+    for sign, keys in ((1, added), (-1, removed)):
+        for owner_id, status, priority in keys:
+            if owner_id is not None:
+                deltas[(UUID(str(owner_id)), status, priority)] += sign
+    return deltas
+
+
+def stats_upsert_statement(dialect: str, deltas: Counter):
+    """Add the deltas to their groups, creating the missing ones
+
+    Groups are written in key order: two transactions touching the same
+    groups lock them in the same order and can not deadlock.
+    """
+    rows = [
+        {"owner_id": owner_id, "status": status, "priority": priority, "count": count}
+        for (owner_id, status, priority), count in sorted(
+            deltas.items(), key=lambda item: tuple(map(str, item[0]))
+        )
+        if count
+    ]
+    if not rows:
+        return None
+
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(TaskStats).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[TaskStats.owner_id, TaskStats.status, TaskStats.priority],
+        set_={"count": TaskStats.count + statement.excluded.count},
+    )
+
+
+def apply_task_stats(db: Session, deltas: Counter):
+    """Part of the caller's transaction, committed or rolled back with it"""
+    if not any(deltas.values()):
+        return
+    db.execute(stats_upsert_statement(db.get_bind().dialect.name, deltas))
+
+
+def delete_owner_stats_statement(owner_id):
+    return delete(TaskStats).where(TaskStats.owner_id == owner_id)
+
+
+def task_stats_statement(
+    user: User, owner_id: Optional[UUID] = None, company_id: Optional[UUID] = None
+):
+    """Counts per (status, priority) of a user, a company or everyone"""
+    query = select(
+        TaskStats.status, TaskStats.priority, func.sum(TaskStats.count).label("count")
+    ).group_by(TaskStats.status, TaskStats.priority)
+
+    if user.is_admin is False:
+        if company_id or (owner_id and str(owner_id) != str(user.id)):
+            raise HTTPException(
+                status_code=403, detail="User can only read their own stats"
+            )
+        return query.filter(TaskStats.owner_id == user.id)
+
+    if owner_id is not None:
+        query = query.filter(TaskStats.owner_id == owner_id)
+    if company_id is not None:
+        query = query.join(User, User.id == TaskStats.owner_id).filter(
+            User.company_id == company_id
+        )
+    return query
+
+
+def task_stats_dto(rows) -> TaskStatsDto:
+    groups = [
+        TaskStatsGroupDto(status=row.status, priority=row.priority, count=row.count)
+        for row in rows
+        if row.count
+    ]
+    by_status = dict.fromkeys(TaskStatus, 0)
+    by_priority = dict.fromkeys(TaskPriority, 0)
+    for group in groups:
+        by_status[group.status] += group.count
+        by_priority[group.priority] += group.count
+
+    return TaskStatsDto(
+        total=sum(by_status.values()),
+        status=by_status,
+        priority=by_priority,
+        groups=groups,
+    )
+
+
+def get_task_stats(
+    user: User,
+    db: Session,
+    owner_id: Optional[UUID] = None,
+    company_id: Optional[UUID] = None,
+):
+    try:
+        statement = task_stats_statement(user, owner_id, company_id)
+        return task_stats_dto(db.execute(statement).all())
+    except Exception as _:
+        raise
+
+
+def counted_stats_statement():
+    """The stats recomputed from the tasks table, O(tasks)"""
+    return (
+        select(Task.owner_id, Task.status, Task.priority, func.count().label("count"))
+        .filter(Task.owner_id.is_not(None))
+        .group_by(Task.owner_id, Task.status, Task.priority)
+    )
+
+
+def rebuild_task_stats(db: Session) -> int:
+    """Recompute every group from the tasks, returns the number of groups"""
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            # Task writes wait on their stats upsert until the rebuild commits
+            db.execute(text("LOCK TABLE task_stats IN EXCLUSIVE MODE"))
+        db.execute(delete(TaskStats))
+        columns = ["owner_id", "status", "priority", "count"]
+        result = db.execute(
+            insert(TaskStats).from_select(columns, counted_stats_statement())
+        )
+        db.commit()
+        return result.rowcount
+    except Exception as _:
+        db.rollback()
+        raise
+
+
+def check_task_stats(db: Session) -> list[dict]:
+    """Groups whose stored count differs from the tasks table"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Both reads from one snapshot, in-flight task writes are no mismatch
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    stored = {
+        (row.owner_id, row.status, row.priority): row.count
+        for row in db.execute(select(TaskStats)).scalars().all()
+    }
+    counted = {
+        (row.owner_id, row.status, row.priority): row.count
+        for row in db.execute(counted_stats_statement()).all()
+    }
+
+    mismatches = []
+    for key in sorted(
+        stored.keys() | counted.keys(), key=lambda key: tuple(map(str, key))
+    ):
+        expected, actual = counted.get(key, 0), stored.get(key, 0)
+        if expected != actual:
+            owner_id, status, priority = key
+            mismatches.append(
+                {
+                    "owner_id": owner_id,
+                    "status": status,
+                    "priority": priority,
+                    "expected": expected,
+                    "actual": actual,
+                }
+            )
+    return mismatches
@@ -0,0 +1,249 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from common.enums import TaskStatus, ThroughputGrain
+from fastapi import HTTPException
+from models.task import TaskThroughputDto, TaskThroughputPointDto
+from schemas.task import Task
+from schemas.task_throughput import TaskThroughput
+from schemas.user import User
+from settings import (
+    TASK_BULK_BATCH_SIZE,
+    TASK_EXPORT_CHUNK_SIZE,
+    TASK_THROUGHPUT_MAX_BUCKETS,
+)
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    cast,
+    delete,
+    exists,
+    insert,
+    literal,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+GRAIN_STEPS = {
+    ThroughputGrain.HOUR: timedelta(hours=1),
+    ThroughputGrain.DAY: timedelta(days=1),
+}
+
+
+def bucket_start(moment: datetime, grain: ThroughputGrain) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if grain is ThroughputGrain.DAY:
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def throughput_upsert_statement(
+    dialect: str, owner_id, moment: datetime, created: int = 0, completed: int = 0
+):
+    """Add events of the owner's company at `moment` to its hour and day
+
+    The company is read by the statement itself, the token user does not
+    carry it: nothing is written for owners without a company.
+    """
+    if not (created or completed):
+        return None
+
+    grain_type = TaskThroughput.grain.type
+    selects = [
+        select(
+            User.company_id,
+            # Typed: the UNION would otherwise resolve the enum to text
+            cast(literal(grain, grain_type), grain_type),
+            literal(bucket_start(moment, grain), DateTime()),
+            literal(created, Integer()),
+            literal(completed, Integer()),
+        ).where(User.id == owner_id, User.company_id.is_not(None))
+        for grain in ThroughputGrain
+    ]
+    columns = ["company_id", "grain", "bucket", "created", "completed"]
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(TaskThroughput).from_select(columns, union_all(*selects))
+    return statement.on_conflict_do_update(
+        index_elements=[
+            TaskThroughput.company_id,
+            TaskThroughput.grain,
+            TaskThroughput.bucket,
+        ],
+        set_={
+            "created": TaskThroughput.created + statement.excluded.created,
+            "completed": TaskThroughput.completed + statement.excluded.completed,
+        },
+    )
+
+
+def apply_task_throughput(
+    db: Session, owner_id, moment: datetime, created: int = 0, completed: int = 0
+):
+    """Part of the caller's transaction, committed or rolled back with it"""
+    statement = throughput_upsert_statement(
+        db.get_bind().dialect.name, owner_id, moment, created, completed
+    )
+    if statement is not None:
+        db.execute(statement)
+
+
+def completions(before: Optional[TaskStatus], after: TaskStatus) -> int:
+    """1 when a task moves to done, `before` is None for a new task"""
+    return int(after is TaskStatus.DONE and before is not TaskStatus.DONE)
+
+
+def delete_company_throughput_statement(company_id):
+    return delete(TaskThroughput).where(TaskThroughput.company_id == company_id)
+
+
+def local_time(moment: datetime) -> datetime:
+    """Naive local time, like the stored timestamps"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def throughput_range(grain: ThroughputGrain, start: datetime, end: datetime):
+    """From the bucket holding `start` to `end`, excluded"""
+    start, end = local_time(start), local_time(end)
+    first = bucket_start(start, grain)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if (end - first) / GRAIN_STEPS[grain] > TASK_THROUGHPUT_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {TASK_THROUGHPUT_MAX_BUCKETS} {grain.value} buckets",
+        )
+    return first, end
+
+
+def company_member_statement(company_id: UUID, user: User):
+    return select(exists().where(User.id == user.id, User.company_id == company_id))
+
+
+def throughput_statement(
+    company_id: UUID, grain: ThroughputGrain, first: datetime, end: datetime
+):
+    """One range scan of the primary key"""
+    return (
+        select(TaskThroughput.bucket, TaskThroughput.created, TaskThroughput.completed)
+        .where(
+            TaskThroughput.company_id == company_id,
+            TaskThroughput.grain == grain,
+            TaskThroughput.bucket >= first,
+            TaskThroughput.bucket < end,
+        )
+        .order_by(TaskThroughput.bucket)
+    )
+
+
+def throughput_dto(
+    rows, company_id: UUID, grain: ThroughputGrain, first: datetime, end: datetime
+) -> TaskThroughputDto:
+    """Every bucket of the range, the ones without events at 0"""
+    counts = {row.bucket: row for row in rows}
+    points, bucket = [], first
+    while bucket < end:
+        row = counts.get(bucket)
+        points.append(
+            TaskThroughputPointDto(
+                bucket=bucket,
+                created=row.created if row else 0,
+                completed=row.completed if row else 0,
+            )
+        )
+        bucket += GRAIN_STEPS[grain]
+    return TaskThroughputDto(company_id=company_id, grain=grain, points=points)
+
+
+def get_task_throughput(
+    company_id: UUID,
+    grain: ThroughputGrain,
+    start: datetime,
+    end: datetime,
+    user: User,
+    db: Session,
+):
+    first, end = throughput_range(grain, start, end)
+
+    try:
+        if (
+            user.is_admin is False
+            and not db.execute(company_member_statement(company_id, user)).scalar()
+        ):
+            raise HTTPException(
+                status_code=403, detail="User can only read their company's throughput"
+            )
+
+        rows = db.execute(throughput_statement(company_id, grain, first, end)).all()
+        return throughput_dto(rows, company_id, grain, first, end)
+    except Exception as _:
+        raise
+
+
+def backfill_events_statement(until: datetime):
+    """Tasks of company members created before `until`
+
+    A done task counts as completed at its last update, the moment of the
+    transition itself was not recorded.
+    """
+    return (
+        select(User.company_id, Task.created_at, Task.status, Task.updated_at)
+        .join(User, User.id == Task.owner_id)
+        .where(User.company_id.is_not(None), Task.created_at < until)
+        .execution_options(yield_per=TASK_EXPORT_CHUNK_SIZE)
+    )
+
+
+def backfill_task_throughput(db: Session, until: datetime) -> int:
+    """Recompute the buckets before the day of `until` from the tasks table
+
+    Buckets from that day on are left to the task services, run it with the
+    day the rollup was deployed or later. Returns the number of buckets.
+    """
+    until = bucket_start(until, ThroughputGrain.DAY)
+    buckets = {}
+
+    def count(company_id, moment: datetime, column: str):
+        for grain in ThroughputGrain:
+            bucket = bucket_start(moment, grain)
+            row = buckets.setdefault(
+                (company_id, grain, bucket),
+                {
+                    "company_id": company_id,
+                    "grain": grain,
+                    "bucket": bucket,
+                    "created": 0,
+                    "completed": 0,
+                },
+            )
+            row[column] += 1
+
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            # Task writes wait on their rollup upsert until the backfill commits
+            db.execute(text("LOCK TABLE task_throughput IN EXCLUSIVE MODE"))
+        db.execute(delete(TaskThroughput).where(TaskThroughput.bucket < until))
+
+        for company_id, created_at, status, updated_at in db.execute(
+            backfill_events_statement(until)
+        ):
+            count(company_id, created_at, "created")
+            completed_at = updated_at or created_at
+            if status is TaskStatus.DONE and completed_at < until:
+                count(company_id, completed_at, "completed")
+
+        rows = list(buckets.values())
+        for index in range(0, len(rows), TASK_BULK_BATCH_SIZE):
+            db.execute(
+                insert(TaskThroughput), rows[index : index + TASK_BULK_BATCH_SIZE]
+            )
+        db.commit()
+        return len(rows)
+    except Exception as _:
+        db.rollback()
+        raise
@@ -1,12 +1,30 @@
 from datetime import datetime
-from typing import Any
-
+from typing import Any, Optional
+
+from common.entity_cache import NOT_FOUND, entity_cache
+from common.etag import field, make_etag, version
+from common.fields import (
+    list_fields,
+    parse_fields,
+    projection,
+    sparse_list,
+    sparse_model,
+)
+from common.pagination import keyset_page, split_page
+from common.routing import read_from_replica
 from database import get_db_context
 from fastapi import Depends, HTTPException
+from models.task import TaskDto
 from models.user import CreateUserDto, UpdateUserDto, UserDto
+from schemas.task import Task
 from schemas.user import User
 from services.auth import create_hashed_password
-from sqlalchemy.orm import Session, joinedload
+from services.counting import total_count
+from services.task import TASK_LIST_FIELDS
+from services.task_stats import delete_owner_stats_statement
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session, joinedload, load_only, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 
 def create_user(request: CreateUserDto, db: Session):
@@ -23,9 +41,7 @@ def create_user(request: CreateUserDto, db: Session):
     try:
         user = (
             db.query(User)
-            .filter(
-                (User.username == request.username) or (User.email == request.email)
-            )
+            .filter(or_(User.username == request.username, User.email == request.email))
             .first()
         )
         if user:
@@ -42,53 +58,163 @@ def create_user(request: CreateUserDto, db: Session):
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
+        # Just created, it has no tasks to lazy load
+        set_committed_value(new_user, "tasks", [])
 
-        new_user.__delattr__("password")
-        return UserDto(**new_user.__dict__)
+        return UserDto.model_validate(new_user)
     except Exception as _:
         raise
 
 
-def get_users(page: int, limit: int, db: Session):
+USER_LIST_FIELDS = list_fields(UserDto)
+# Embedded tasks follow the default fieldset of GET /tasks
+USER_NESTED_FIELDS = (("tasks", list[sparse_model(TaskDto, TASK_LIST_FIELDS)]),)
+
+
+def user_fields(value: Optional[str]) -> tuple:
+    return parse_fields(value, UserDto, USER_LIST_FIELDS)
+
+
+def user_load_options(fields: tuple) -> list:
+    """load_only the requested columns, the tasks only when asked for"""
+    options = [load_only(*projection(User, fields))]
+    if "tasks" in fields:
+        options.append(
+            selectinload(User.tasks).load_only(*projection(Task, TASK_LIST_FIELDS))
+        )
+    return options
+
+
+def user_dtos(rows, fields: tuple) -> list[UserDto]:
+    adapter = sparse_list(UserDto, fields, USER_NESTED_FIELDS)
+    return adapter.validate_python(rows, from_attributes=True)
+
+
+def get_users(page: int, limit: int, db: Session, fields: tuple = USER_LIST_FIELDS):
     try:
         offset = (page - 1) * limit
-        return (
-            db.query(User).order_by(User.created_at).offset(offset).limit(limit).all()
+        rows = (
+            db.query(User)
+            .options(*user_load_options(fields))
+            .order_by(User.created_at)
+            .offset(offset)
+            .limit(limit)
+            .all()
         )
+        return user_dtos(rows, fields)
     except Exception as _:
         raise
 
 
-def get_user_by_id(user_id: str, db: Session):
+def get_users_total(db: Session) -> tuple[int, bool]:
     try:
-        user = (
-            db.query(User)
-            .options(joinedload(User.tasks))
-            .filter(User.id == user_id)
-            .first()
+        return total_count(db, select(User.id), table="users")
+    except Exception as _:
+        raise
+
+
+def get_users_by_cursor(
+    cursor: Optional[str], limit: int, db: Session, fields: tuple = USER_LIST_FIELDS
+):
+    try:
+        query = db.query(User).options(*user_load_options(fields))
+        rows, next_cursor = split_page(
+            keyset_page(query, User, cursor, limit).all(), limit
         )
-        if not user:
+        return user_dtos(rows, fields), next_cursor
+    except Exception as _:
+        raise
+
+
+def get_user_by_id(user_id: str, db: Session):
+    try:
+        user = entity_cache.get("user", user_id, UserDto)
+        if user is None:
+            user = (
+                db.query(User)
+                .options(joinedload(User.tasks))
+                .filter(User.id == user_id)
+                .first()
+            )
+            if user:
+                # tasks are loaded with the user, nothing is lazy loaded here
+                user = UserDto.model_validate(user)
+                if not read_from_replica(db):
+                    entity_cache.set("user", user_id, user)
+            elif not read_from_replica(db):
+                entity_cache.set_not_found("user", user_id)
+
+        if not user or user is NOT_FOUND:
             raise HTTPException(status_code=404, detail="User not found")
 
-        return UserDto(**user.__dict__)
+        return user
+    except Exception as _:
+        raise
+
+
+def user_etag(user, tasks=None) -> str:
+    """UserDto embeds the user's tasks, their versions are part of the tag"""
+    if tasks is None:
+        tasks = field(user, "tasks") or []
+    return make_etag(
+        version(user),
+        field(user, "company_id"),
+        *sorted(version(task) for task in tasks),
+    )
+
+
+def user_version_statement(user_id: str):
+    return select(User.id, User.company_id, User.created_at, User.updated_at).filter(
+        User.id == user_id
+    )
+
+
+def user_tasks_versions_statement(user_id: str):
+    return select(Task.id, Task.created_at, Task.updated_at).filter(
+        Task.owner_id == user_id
+    )
+
+
+def get_user_etag(user_id: str, db: Session):
+    """ETag of GET /users/{user_id}, from the cache or the version columns"""
+    try:
+        user = entity_cache.get("user", user_id, UserDto)
+        if user is None:
+            user = db.execute(user_version_statement(user_id)).first()
+            if not user and not read_from_replica(db):
+                entity_cache.set_not_found("user", user_id)
+
+        if not user or user is NOT_FOUND:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        if isinstance(user, UserDto):
+            return user_etag(user)
+        return user_etag(user, db.execute(user_tasks_versions_statement(user_id)).all())
     except Exception as _:
         raise
 
 
 def update_user(user_id: str, request: UpdateUserDto, db: Session):
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = (
+            db.query(User)
+            .options(noload(User.tasks))
+            .filter(User.id == user_id)
+            .first()
+        )
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         for key, value in request.__dict__.items():
             if value:
                 setattr(user, key, value)
+        user.updated_at = datetime.now()
 
         db.commit()
         db.refresh(user)
+        entity_cache.invalidate("user", user_id)
 
-        return UserDto(**user.__dict__)
+        return UserDto.model_validate(user)
 
     except Exception as _:
         raise
@@ -100,8 +226,15 @@ def delete_user(user_id: str, db: Session):
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        # Loaded by the delete anyway, the ORM clears their owner_id
+        task_ids = [task.id for task in user.tasks]
+
+        # Their tasks are orphaned, no longer counted for anyone
+        db.execute(delete_owner_stats_statement(user.id))
         db.delete(user)
         db.commit()
+        entity_cache.invalidate("user", user_id)
+        entity_cache.invalidate("task", *task_ids)
 
         return "Ok"
     except Exception as _:
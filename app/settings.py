@@ -10,10 +10,21 @@ load_dotenv()
 def get_connection_string(asyncMode: bool = False) -> str:
     """Get the connection string for the database
 
+    Args:
+        asyncMode (bool): Build the URL for the async driver instead
+
     Returns:
         string: The connection string
     """
+    url = os.environ.get("DB_ASYNC_URL" if asyncMode else "DB_URL")
+    if url:
+        return url
+
     engine = os.environ.get("DB_ENGINE")
+    if asyncMode:
+        # DB_ENGINE may name the sync driver already, e.g. postgresql+psycopg2
+        dialect = (engine or "").split("+", 1)[0]
+        engine = f"{dialect}+{os.environ.get('DB_ASYNC_DRIVER', 'asyncpg')}"
     host = os.environ.get("DB_HOST")
     port = os.environ.get("DB_PORT", 5432)
     username = os.environ.get("DB_USERNAME")
@@ -26,9 +37,106 @@ def get_connection_string(asyncMode: bool = False) -> str:
 # Database Setting
 SQLALCHEMY_DATABASE_URL = get_connection_string()
 SQLALCHEMY_DATABASE_URL_ASYNC = get_connection_string(asyncMode=True)
+DB_ASYNC_MODE = os.environ.get("DB_ASYNC_MODE", "false").lower() == "true"
+DB_REPLICA_URLS = [
+    url for url in os.environ.get("DB_REPLICA_URLS", "").split(",") if url
+]
+DB_REPLICA_ASYNC_URLS = [
+    url for url in os.environ.get("DB_REPLICA_ASYNC_URLS", "").split(",") if url
+]
+# Reads of a user stay on the primary this long after they wrote, 0 to disable.
+# Each worker remembers the writes it served itself; other workers only know
+# of a write when the client sends back the X-Last-Write header or the
+# last_write cookie of its response. Clients that do neither, and reach
+# another worker, may read from a replica that has not caught up yet
+DB_READ_YOUR_WRITES_SECONDS = float(os.environ.get("DB_READ_YOUR_WRITES_SECONDS", 0))
+
+# Connection Pool Setting
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", -1))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "false").lower() == "true"
+DB_POOL_USE_LIFO = os.environ.get("DB_POOL_USE_LIFO", "false").lower() == "true"
+
+# Threads running blocking service calls, more than the pool can serve would only wait
+SERVICE_THREADPOOL_SIZE = int(
+    os.environ.get("SERVICE_THREADPOOL_SIZE", DB_POOL_SIZE + DB_MAX_OVERFLOW)
+)
+
+# Password Hashing Setting
+# bcrypt worker processes (0 runs bcrypt inline in the calling thread)
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+)
+# Queued + running hashes before /auth/login and POST /users answer 503
+PASSWORD_HASH_MAX_PENDING = int(
+    os.environ.get("PASSWORD_HASH_MAX_PENDING", 4 * max(PASSWORD_HASH_WORKERS, 1))
+)
+PASSWORD_HASH_RETRY_AFTER = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", 1))
+# bcrypt cost factor, pick it with `python -m commands.calibrate_bcrypt`.
+# Hashes of another cost are rehashed on the next successful login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+# Bulk Task Setting
+TASK_BULK_MAX_ITEMS = int(os.environ.get("TASK_BULK_MAX_ITEMS", 10000))
+# Rows per multi-row INSERT ... RETURNING statement
+TASK_BULK_BATCH_SIZE = int(os.environ.get("TASK_BULK_BATCH_SIZE", 1000))
+# Rows fetched from the server-side cursor per chunk of GET /tasks/export
+TASK_EXPORT_CHUNK_SIZE = int(os.environ.get("TASK_EXPORT_CHUNK_SIZE", 1000))
+# Buckets one GET /tasks/throughput may return, about 83 days of hours
+TASK_THROUGHPUT_MAX_BUCKETS = int(os.environ.get("TASK_THROUGHPUT_MAX_BUCKETS", 2000))
+
+# Total Count Setting
+# Totals of ?total=true lists past this many rows are estimated, not counted.
+# Owner scoped lists are always counted
+TOTAL_COUNT_EXACT_LIMIT = int(os.environ.get("TOTAL_COUNT_EXACT_LIMIT", 10000))
+
+# Entity Cache Setting
+# Users, tasks and companies kept in memory per worker (0 disables the cache)
+ENTITY_CACHE_SIZE = int(os.environ.get("ENTITY_CACHE_SIZE", 10000))
+# Seconds a cached entity may be served, the staleness bound on other workers
+ENTITY_CACHE_TTL = float(os.environ.get("ENTITY_CACHE_TTL", 30))
+# Seconds a 404 is remembered
+ENTITY_CACHE_NEGATIVE_TTL = float(os.environ.get("ENTITY_CACHE_NEGATIVE_TTL", 5))
+# redis://host:6379/0 shares the cache between workers (needs the redis package)
+ENTITY_CACHE_URL = os.environ.get("ENTITY_CACHE_URL")
+
+# Compression Setting
+# gzip level of responses, 1 is fastest, 9 smallest (0 disables compression).
+# `python benchmarks/compression.py` measures the tradeoff on our payloads
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", 3))
+# Bodies below this many bytes are sent as is, streamed bodies are always gzipped
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", 1024))
+# Comma separated media types worth compressing
+COMPRESSION_CONTENT_TYPES = [
+    value.strip()
+    for value in os.environ.get(
+        "COMPRESSION_CONTENT_TYPES", "application/json,application/x-ndjson,text/csv"
+    ).split(",")
+    if value.strip()
+]
 
 ADMIN_DEFAULT_PASSWORD = str(os.environ.get("ADMIN_DEFAULT_PASSWORD"))
 
 # JWT Setting
 JWT_SECRET = str(os.environ.get("JWT_SECRET"))
 JWT_ALGORITHM = str(os.environ.get("JWT_ALGORITHM"))
+# Lifetime of access tokens, keep it short when clients use POST /auth/refresh
+JWT_ACCESS_TOKEN_MINUTES = int(os.environ.get("JWT_ACCESS_TOKEN_MINUTES", 120))
+JWT_REFRESH_TOKEN_DAYS = int(os.environ.get("JWT_REFRESH_TOKEN_DAYS", 14))
+# Verified token claims kept in memory per worker (0 disables the cache)
+JWT_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE", 10000))
+# Seconds a verified token is trusted without re-verification, capped by its exp
+JWT_CACHE_TTL = float(os.environ.get("JWT_CACHE_TTL", 60))
+# Seconds between two reads of new revocations, the propagation delay to the
+# other workers (0 disables the background refresh)
+REVOCATION_REFRESH_SECONDS = float(os.environ.get("REVOCATION_REFRESH_SECONDS", 5))
+# Revocations re-read on every refresh to catch late committed rows
+REVOCATION_REFRESH_OVERLAP_SECONDS = float(
+    os.environ.get("REVOCATION_REFRESH_OVERLAP_SECONDS", 30)
+)
+REVOCATION_BLOOM_CAPACITY = int(os.environ.get("REVOCATION_BLOOM_CAPACITY", 100000))
+REVOCATION_BLOOM_ERROR_RATE = float(
+    os.environ.get("REVOCATION_BLOOM_ERROR_RATE", 0.001)
+)
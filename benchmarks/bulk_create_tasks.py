@@ -0,0 +1,96 @@
+"""Compare creating tasks one at a time with the bulk insert path
+
+Runs services.task.create_task in a loop (one INSERT and one commit per task)
+and services.task.create_tasks_bulk (multi-row INSERT ... RETURNING, one
+commit) against the database configured in .env, then prints the elapsed time
+and the number of statements sent for each.
+
+Usage (from the repository root):
+    python benchmarks/bulk_create_tasks.py --count 5000 --batch-size 1000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import event
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+import database  # noqa: E402
+import schemas  # noqa: E402,F401
+import services.task as task_service  # noqa: E402
+from models.task import CreateTaskDto  # noqa: E402
+from schemas.user import User  # noqa: E402
+
+
+def create_owner():
+    with database.SessionLocal() as db:
+        user = User(
+            id=uuid4(),
+            username=f"bulk_{uuid4().hex[:8]}",
+            email=f"bulk_{uuid4().hex[:8]}@example.com",
+            first_name="Bulk",
+            last_name="Test",
+            password="not-a-real-hash",
+            is_admin=False,
+        )
+        db.add(user)
+        db.commit()
+        return SimpleNamespace(id=user.id, is_admin=False)
+
+
+def measure(label, run):
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", _count)
+    try:
+        with database.SessionLocal() as db:
+            started = time.perf_counter()
+            run(db)
+            elapsed = time.perf_counter() - started
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _count)
+
+    print(f"{label:<12} {elapsed:8.3f}s  {len(statements):6d} statements")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    database.init_engine()
+    database.Base.metadata.create_all(database.engine)
+    task_service.TASK_BULK_BATCH_SIZE = args.batch_size
+    task_service.TASK_BULK_MAX_ITEMS = max(args.count, task_service.TASK_BULK_MAX_ITEMS)
+
+    owner = create_owner()
+    items = [
+        {"summary": f"Task {index}", "description": "Seeded by bulk benchmark"}
+        for index in range(args.count)
+    ]
+
+    def one_by_one(db):
+        for item in items:
+            task_service.create_task(CreateTaskDto(**item), owner, db)
+
+    def bulk(db):
+        task_service.create_tasks_bulk(items, owner, db)
+
+    single = measure("one-by-one", one_by_one)
+    batched = measure("bulk", bulk)
+    print(f"speedup      {single / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
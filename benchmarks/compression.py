@@ -0,0 +1,159 @@
+"""CPU versus bandwidth of the gzip levels on the payloads the API serves
+
+Seeds `--tasks` tasks, fetches the typical responses uncompressed from the
+app in-process (task pages, the same page with descriptions, a user with
+their tasks, both export formats), then pushes each of them through
+CompressionMiddleware at every level. Exports are replayed in chunks of
+TASK_EXPORT_CHUNK_SIZE rows, like the streamed response, so the Z_SYNC_FLUSH
+overhead is part of the numbers. For every level it reports the compressed
+size, the compression time and the time to put the payload on the wire at a
+few link speeds (compression + transfer, decompression left out).
+
+Usage (from the repository root, sync database settings taken from .env):
+    python benchmarks/compression.py --tasks 1000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+os.environ["DB_ASYNC_MODE"] = "false"
+os.environ["COMPRESSION_LEVEL"] = "0"
+os.environ.setdefault("REVOCATION_REFRESH_SECONDS", "0")
+
+from common.compression import CompressionMiddleware  # noqa: E402
+from load_tasks import cleanup, seed  # noqa: E402
+from main import app  # noqa: E402
+from services.auth import token_interceptor  # noqa: E402
+from settings import TASK_EXPORT_CHUNK_SIZE  # noqa: E402
+
+LEVELS = [1, 3, 5, 6, 9]
+# Link speeds in Mbit/s: mobile, office uplink, datacenter
+LINKS = [5, 50, 1000]
+
+
+async def fetch_payloads(user, tasks: int) -> dict[str, tuple[str, list[bytes]]]:
+    """Identity bodies of the typical responses, exports split in chunks"""
+    app.dependency_overrides[token_interceptor] = lambda: SimpleNamespace(
+        id=user.id, is_admin=False
+    )
+    urls = {
+        "GET /tasks limit=20": "/tasks/?limit=20",
+        f"GET /tasks limit={tasks}": f"/tasks/?limit={tasks}",
+        f"GET /tasks limit={tasks} +description": (
+            f"/tasks/?limit={tasks}&fields=id,summary,description,status,"
+            "priority,owner_id,created_at,updated_at"
+        ),
+        "GET /users/{id}": f"/users/{user.id}",
+        "GET /tasks/export ndjson": "/tasks/export?format=ndjson",
+        "GET /tasks/export csv": "/tasks/export?format=csv",
+    }
+    payloads = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for label, url in urls.items():
+            response = await client.get(url, headers={"Accept-Encoding": "identity"})
+            assert response.status_code == 200, response.text
+            body = response.content
+            chunks = [body]
+            if "export" in url:
+                lines = body.splitlines(keepends=True)
+                chunks = [
+                    b"".join(lines[index : index + TASK_EXPORT_CHUNK_SIZE])
+                    for index in range(0, len(lines), TASK_EXPORT_CHUNK_SIZE)
+                ]
+            content_type = response.headers["content-type"]
+            payloads[label] = (content_type, chunks)
+    return payloads
+
+
+async def compress(content_type: str, chunks: list[bytes], level: int) -> bytes:
+    """Body sent by the middleware for `chunks` sent by a route"""
+
+    async def route(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type.encode())],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            more_body = index < len(chunks) - 1
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            sent.append(message["body"])
+
+    middleware = CompressionMiddleware(
+        route, minimum_size=0, level=level, content_types=[content_type]
+    )
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await middleware(scope, None, send)
+    return b"".join(sent)
+
+
+async def measure(label, content_type, chunks, repeat):
+    identity = b"".join(chunks)
+    print(f"\n{label}: {len(identity) / 1024:.1f} KiB, {len(chunks)} chunk(s)")
+    header = "".join(f" | {link:>5} Mbit/s" for link in LINKS)
+    print(f"{'level':>5} | {'size KiB':>8} | {'ratio':>5} | {'cpu ms':>6}{header}")
+
+    def row(level, size, seconds):
+        wire = "".join(
+            f" | {(seconds + size * 8 / (link * 1e6)) * 1000:8.2f} ms" for link in LINKS
+        )
+        print(
+            f"{level:>5} | {size / 1024:8.1f} | {len(identity) / size:5.1f}"
+            f" | {seconds * 1000:6.2f}{wire}"
+        )
+
+    row(0, len(identity), 0.0)
+    for level in LEVELS:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = await compress(content_type, chunks, level)
+            timings.append(time.perf_counter() - started)
+        assert gzip.decompress(body) == identity, "middleware output must round-trip"
+        row(level, len(body), statistics.median(timings))
+
+
+async def run(user, tasks: int, repeat: int):
+    payloads = await fetch_payloads(user, tasks)
+    for label, (content_type, chunks) in payloads.items():
+        await measure(label, content_type, chunks, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    user, _ = seed(args.tasks)
+    try:
+        asyncio.run(run(user, args.tasks, args.repeat))
+    finally:
+        cleanup(user)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Load test comparing sync and async throughput on the /tasks endpoints
+
+Starts the app once per database mode (DB_ASYNC_MODE=false / true) with a single
+uvicorn worker and keeps `--concurrency` clients busy on GET /tasks and
+GET /tasks/{task_id} for `--duration` seconds.
+
+Usage (from the repository root, database settings taken from .env):
+    python benchmarks/load_tasks.py --concurrency 200 --duration 15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+import httpx
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+import database  # noqa: E402
+import schemas  # noqa: E402,F401
+from common.enums import TaskPriority, TaskStatus  # noqa: E402
+from schemas.task import Task  # noqa: E402
+from schemas.user import User  # noqa: E402
+from services.auth import create_access_token, create_hashed_password  # noqa: E402
+
+
+def seed(task_count: int):
+    database.init_engine()
+    database.Base.metadata.create_all(database.engine)
+
+    with database.SessionLocal(expire_on_commit=False) as db:
+        user = User(
+            id=uuid4(),
+            username=f"loadtest_{uuid4().hex[:8]}",
+            email=f"loadtest_{uuid4().hex[:8]}@example.com",
+            first_name="Load",
+            last_name="Test",
+            password=create_hashed_password("Password1"),
+            is_admin=False,
+        )
+        db.add(user)
+        db.flush()
+        tasks = [
+            Task(
+                id=uuid4(),
+                summary=f"Task {index}",
+                description="Seeded by benchmarks/load_tasks.py",
+                status=random.choice(list(TaskStatus)),
+                priority=random.choice(list(TaskPriority)),
+                owner_id=user.id,
+            )
+            for index in range(task_count)
+        ]
+        db.add_all(tasks)
+        db.commit()
+        return user, [str(task.id) for task in tasks]
+
+
+def cleanup(user: User):
+    with database.SessionLocal() as db:
+        db.query(Task).filter(Task.owner_id == user.id).delete()
+        db.query(User).filter(User.id == user.id).delete()
+        db.commit()
+
+
+def start_server(
+    async_mode: bool, port: int, extra_env: Optional[dict] = None
+) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DB_ASYNC_MODE": "true" if async_mode else "false",
+        **(extra_env or {}),
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, cwd=APP_DIR, env=env)
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def run_load(base_url, token, task_ids, concurrency, duration):
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=30
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                if random.random() < 0.5:
+                    url = "/tasks/?page=1&limit=20"
+                else:
+                    url = f"/tasks/{random.choice(task_ids)}"
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return latencies, errors
+
+
+def report(mode, latencies, errors, duration):
+    latencies = sorted(latencies)
+    quantiles = (
+        statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    )
+    print(
+        f"{mode:>5}: {len(latencies) / duration:8.1f} req/s"
+        f" | p50 {quantiles[49] * 1000:7.1f} ms"
+        f" | p95 {quantiles[94] * 1000:7.1f} ms"
+        f" | p99 {quantiles[98] * 1000:7.1f} ms"
+        f" | errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    user, task_ids = seed(args.tasks)
+    token = create_access_token(user=user, expires=timedelta(minutes=30))
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        for async_mode in (False, True):
+            server = start_server(async_mode, args.port)
+            try:
+                asyncio.run(wait_until_ready(base_url))
+                latencies, errors = asyncio.run(
+                    run_load(base_url, token, task_ids, args.concurrency, args.duration)
+                )
+                report(
+                    "async" if async_mode else "sync", latencies, errors, args.duration
+                )
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        cleanup(user)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Login throughput with bcrypt inline vs on the password hashing process pool
+
+Starts the app once with PASSWORD_HASH_WORKERS=0 (bcrypt in the service
+threads) and once with the process pool, keeps `--concurrency` clients busy on
+POST /auth/login and measures the latency of GET / alongside, to show whether
+logins slow down the rest of the API. 503 answers (queue full) are counted
+separately from errors.
+
+Usage (from the repository root, database settings taken from .env):
+    python benchmarks/login_throughput.py --concurrency 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+import database  # noqa: E402
+import schemas  # noqa: E402,F401
+from load_tasks import start_server, wait_until_ready  # noqa: E402
+from schemas.user import User  # noqa: E402
+from services.auth import create_hashed_password  # noqa: E402
+
+PASSWORD = "Password1"
+
+
+def seed() -> User:
+    database.init_engine()
+    database.Base.metadata.create_all(database.engine)
+
+    with database.SessionLocal(expire_on_commit=False) as db:
+        user = User(
+            id=uuid4(),
+            username=f"login_{uuid4().hex[:8]}",
+            email=f"login_{uuid4().hex[:8]}@example.com",
+            first_name="Login",
+            last_name="Test",
+            password=create_hashed_password(PASSWORD),
+            is_admin=False,
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+
+def cleanup(user: User):
+    with database.SessionLocal() as db:
+        db.query(User).filter(User.id == user.id).delete()
+        db.commit()
+
+
+async def run_load(base_url, username, concurrency, duration):
+    logins, rejected, errors, health = 0, 0, 0, []
+    deadline = time.monotonic() + duration
+    form = {"username": username, "password": PASSWORD}
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        limits=httpx.Limits(max_connections=concurrency + 1),
+        timeout=60,
+    ) as client:
+
+        async def login_worker():
+            nonlocal logins, rejected, errors
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.post("/auth/login", data=form)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if response.status_code == 201:
+                    logins += 1
+                elif response.status_code == 503:
+                    rejected += 1
+                    retry_after = float(response.headers.get("Retry-After", 1))
+                    await asyncio.sleep(min(retry_after, 0.1))
+                else:
+                    errors += 1
+
+        async def health_probe():
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                await client.get("/")
+                health.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(
+            health_probe(), *(login_worker() for _ in range(concurrency))
+        )
+
+    return logins, rejected, errors, health
+
+
+def report(label, logins, rejected, errors, health, duration):
+    p99 = statistics.quantiles(health, n=100)[98] if len(health) > 1 else 0
+    print(
+        f"{label:>6}: {logins / duration:7.1f} logins/s"
+        f" | 503 {rejected:5d} | errors {errors:3d}"
+        f" | GET / p50 {statistics.median(health) * 1000:7.1f} ms"
+        f" p99 {p99 * 1000:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--async-mode", action="store_true")
+    args = parser.parse_args()
+
+    user = seed()
+    base_url = f"http://127.0.0.1:{args.port}"
+    workers = str(os.cpu_count() or 1)
+    modes = {
+        # Without admission control inline bcrypt just queues in the threadpool
+        "inline": {"PASSWORD_HASH_WORKERS": "0", "PASSWORD_HASH_MAX_PENDING": "100000"},
+        "pool": {"PASSWORD_HASH_WORKERS": workers},
+    }
+
+    try:
+        for label, extra_env in modes.items():
+            server = start_server(args.async_mode, args.port, extra_env)
+            try:
+                asyncio.run(wait_until_ready(base_url))
+                results = asyncio.run(
+                    run_load(base_url, user.username, args.concurrency, args.duration)
+                )
+                report(label, *results, args.duration)
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        cleanup(user)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare GET /tasks?limit=1000 with and without the validate-once response path
+
+"before" is the previous handler, mounted next to the app's routes: ORM rows
+returned to FastAPI, validated against `response_model`, dumped to dicts and
+encoded by the stdlib JSONResponse. "after" is the app's GET /tasks: rows
+validated once by the service through TaskDtoList, encoded by pydantic-core in
+FastJSONResponse. Both run in-process (httpx ASGITransport) on the same seeded
+page, auth is stubbed so only the query and the serialization are measured.
+
+Usage (from the repository root, sync database settings taken from .env):
+    python benchmarks/serialize_tasks.py --tasks 1000 --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+os.environ["DB_ASYNC_MODE"] = "false"
+os.environ.setdefault("REVOCATION_REFRESH_SECONDS", "0")
+
+import database  # noqa: E402
+from common.executor import run_service  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from load_tasks import cleanup, seed  # noqa: E402
+from main import app  # noqa: E402
+from models.task import TaskDto  # noqa: E402
+from schemas.task import Task  # noqa: E402
+from services.auth import token_interceptor  # noqa: E402
+
+
+def legacy_get_tasks(limit: int, user, db):
+    return (
+        db.query(Task)
+        .filter(Task.owner_id == user.id)
+        .order_by(Task.created_at)
+        .limit(limit)
+        .all()
+    )
+
+
+async def legacy_endpoint(
+    limit: int = 1000,
+    user=Depends(token_interceptor),
+    db=Depends(database.get_read_db_context),
+):
+    return await run_service(legacy_get_tasks, limit, user, db)
+
+
+async def measure(client: httpx.AsyncClient, url: str, requests: int):
+    body = (await client.get(url)).json()
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    return body, latencies
+
+
+def report(label: str, latencies: list[float]):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<7} {len(latencies) / sum(latencies):7.1f} req/s"
+        f" | p50 {quantiles[49] * 1000:7.2f} ms"
+        f" | p95 {quantiles[94] * 1000:7.2f} ms"
+    )
+
+
+async def run(user, limit: int, requests: int):
+    app.add_api_route(
+        "/legacy/tasks",
+        legacy_endpoint,
+        response_model=list[TaskDto],
+        response_class=JSONResponse,
+    )
+    app.dependency_overrides[token_interceptor] = lambda: SimpleNamespace(
+        id=user.id, is_admin=False
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        before_body, before = await measure(
+            client, f"/legacy/tasks?limit={limit}", requests
+        )
+        after_body, after = await measure(
+            client, f"/tasks/?page=1&limit={limit}", requests
+        )
+
+    assert before_body == after_body, "both paths must return the same JSON"
+    report("before", before)
+    report("after", after)
+    print(f"speedup {statistics.mean(before) / statistics.mean(after):7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    user, _ = seed(args.tasks)
+    try:
+        asyncio.run(run(user, args.tasks, args.requests))
+    finally:
+        cleanup(user)
+
+
+if __name__ == "__main__":
+    main()
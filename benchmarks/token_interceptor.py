@@ -0,0 +1,57 @@
+"""Per-request cost of token_interceptor with the verified token cache on and off
+
+Calls services.auth.token_interceptor directly with the same token, the way a
+client polling /tasks does, and prints the mean time per call.
+
+Usage (from the repository root, JWT settings taken from .env):
+    python benchmarks/token_interceptor.py --calls 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+import schemas  # noqa: E402,F401
+import services.auth as auth_service  # noqa: E402
+from common.cache import TTLCache  # noqa: E402
+
+
+def measure(label: str, token: str, calls: int, cache_size: int):
+    auth_service.token_cache = TTLCache(maxsize=cache_size, ttl=60)
+    request = SimpleNamespace(state=SimpleNamespace())
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        auth_service.token_interceptor(request, token)
+    elapsed = time.perf_counter() - started
+
+    print(f"{label:<10} {elapsed / calls * 1e6:8.1f} us/request")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    if auth_service.JWT_ALGORITHM == "None":
+        auth_service.JWT_SECRET, auth_service.JWT_ALGORITHM = "benchmark", "HS256"
+
+    user = SimpleNamespace(
+        id=uuid4(), username="bench", first_name="B", last_name="M", is_admin=False
+    )
+    token = auth_service.create_access_token(user)
+
+    uncached = measure("cache off", token, args.calls, cache_size=0)
+    cached = measure("cache on", token, args.calls, cache_size=1000)
+    print(f"speedup    {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from commands.calibrate_bcrypt import calibrate
+
+
+def test_calibrate_stops_past_the_target():
+    results, recommended = calibrate(target_ms=0, samples=1, min_rounds=4, max_rounds=8)
+
+    # Even the cheapest cost is over a 0 ms budget: measured once, kept as floor
+    assert [rounds for rounds, _ in results] == [4]
+    assert recommended == 4
+
+
+def test_calibrate_recommends_highest_cost_within_target():
+    results, recommended = calibrate(
+        target_ms=10_000, samples=1, min_rounds=4, max_rounds=6
+    )
+
+    assert [rounds for rounds, _ in results] == [4, 5, 6]
+    assert recommended == 6
+    # Each round doubles the work
+    assert results[-1][1] > results[0][1]
@@ -0,0 +1,38 @@
+from datetime import datetime
+from uuid import uuid4
+
+from commands.task_stats import run
+from common.enums import TaskPriority, TaskStatus
+from schemas.task import Task
+from schemas.user import User
+
+
+def test_check_fails_until_rebuild(db_session, capsys):
+    owner = User(
+        id=uuid4(),
+        username="owner",
+        email="owner@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        is_admin=False,
+        created_at=datetime.now(),
+    )
+    # Written around the services: no counter for it yet
+    task = Task(
+        id=uuid4(),
+        summary="Summary",
+        status=TaskStatus.TODO,
+        priority=TaskPriority.LOW,
+        owner_id=owner.id,
+        created_at=datetime.now(),
+    )
+    db_session.add_all([owner, task])
+    db_session.commit()
+
+    assert run("check", db_session) == 1
+    assert "todo/low: counted 1, stored 0" in capsys.readouterr().out
+
+    assert run("rebuild", db_session) == 0
+    assert run("check", db_session) == 0
+    assert "0 task stats groups out of date" in capsys.readouterr().out
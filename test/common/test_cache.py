@@ -0,0 +1,57 @@
+from common.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60, clock=Clock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_cache_expires_at_ttl_or_earlier_deadline():
+    clock = Clock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("ttl", 1)
+    cache.set("deadline", 2, expires_at=clock.now + 5)
+    cache.set("later", 3, expires_at=clock.now + 600)
+
+    clock.now += 5
+    assert cache.get("deadline") is None
+    assert cache.get("ttl") == 1
+
+    clock.now += 55
+    assert cache.get("ttl") is None
+    assert cache.get("later") is None
+    assert cache.snapshot()["expirations"] == 3
+
+
+def test_cache_counts_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60, clock=Clock())
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    snapshot = cache.snapshot()
+    assert (snapshot["hits"], snapshot["misses"]) == (2, 1)
+    assert snapshot["hit_ratio"] == 2 / 3
+
+
+def test_cache_disabled_with_zero_size():
+    cache = TTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
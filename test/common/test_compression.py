@@ -0,0 +1,116 @@
+import asyncio
+import zlib
+
+import pytest
+from common.compression import GZIP_WBITS, CompressionMiddleware, accepts_gzip
+
+BODY = b'{"summary":"Task"}' * 200
+
+
+def _route(content_type, chunks, headers=(), status=200):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", content_type), *headers],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            more_body = index < len(chunks) - 1
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    return app
+
+
+def _call(app, accept_encoding=b"gzip, deflate"):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = CompressionMiddleware(
+        app, minimum_size=1024, level=3, content_types=["application/json"]
+    )
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding)]}
+    asyncio.run(middleware(scope, None, send))
+    headers = {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+    return headers, [message["body"] for message in messages[1:]]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("gzip", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("identity", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(value, expected):
+    assert accepts_gzip(value) is expected
+
+
+def test_large_json_is_compressed_with_a_weak_etag():
+    app = _route(
+        b"application/json",
+        [BODY],
+        [(b"content-length", str(len(BODY)).encode()), (b"etag", b'"v1"')],
+    )
+    headers, [body] = _call(app)
+
+    assert headers["content-encoding"] == "gzip"
+    assert headers["content-length"] == str(len(body))
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == 'W/"v1"'
+    assert zlib.decompress(body, GZIP_WBITS) == BODY
+
+
+@pytest.mark.parametrize(
+    "content_type, body, accept_encoding",
+    [
+        (b"application/json", b"{}", b"gzip"),
+        (b"text/html; charset=utf-8", BODY, b"gzip"),
+        (b"application/json", BODY, b"gzip;q=0"),
+    ],
+)
+def test_small_unlisted_or_unaccepted_responses_are_sent_as_is(
+    content_type, body, accept_encoding
+):
+    headers, [sent] = _call(_route(content_type, [body]), accept_encoding)
+    assert "content-encoding" not in headers
+    assert sent == body
+
+
+@pytest.mark.parametrize(
+    "content_type, body, status",
+    [(b"application/json", b"{}", 200), (b"text/plain", b"", 304)],
+    ids=["small", "not-modified"],
+)
+def test_uncompressed_responses_share_the_weak_etag(content_type, body, status):
+    app = _route(content_type, [body], [(b"etag", b'"v1"')], status=status)
+    headers, [sent] = _call(app)
+
+    assert "content-encoding" not in headers
+    assert headers["etag"] == 'W/"v1"'
+    assert sent == body
+    # Identity clients keep the strong one
+    headers, _ = _call(app, accept_encoding=b"identity")
+    assert headers["etag"] == '"v1"'
+
+
+def test_streamed_chunks_are_decodable_as_they_arrive():
+    chunks = [b'{"row":1}\n', b'{"row":2}\n', b""]
+    app = _route(b"application/json", chunks, [(b"content-length", b"20")])
+    headers, bodies = _call(app)
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    decoder = zlib.decompressobj(GZIP_WBITS)
+    # Each chunk is flushed: its rows decode before the next one is sent
+    assert [decoder.decompress(body) for body in bodies] == chunks
+    assert decoder.eof
@@ -0,0 +1,52 @@
+from uuid import uuid4
+
+from common.denylist import BloomFilter, Denylist
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [str(uuid4()) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(str(uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_denylist_matches_only_unexpired_ids():
+    clock = Clock()
+    denylist = Denylist(capacity=100, error_rate=0.01, clock=clock)
+    denylist.add("revoked", expires_at=clock.now + 60)
+    denylist.add("already-expired", expires_at=clock.now - 1)
+
+    assert "revoked" in denylist
+    assert "other" not in denylist
+    assert "already-expired" not in denylist
+
+    clock.now += 60
+    assert "revoked" not in denylist
+
+
+def test_denylist_purge_drops_expired_entries():
+    clock = Clock()
+    denylist = Denylist(capacity=100, error_rate=0.01, clock=clock)
+    denylist.add("short", expires_at=clock.now + 10)
+    denylist.add("long", expires_at=clock.now + 1000)
+
+    clock.now += 10
+    denylist.purge(force=False)
+    assert len(denylist) == 2
+
+    clock.now += 60
+    denylist.purge(force=False)
+    assert len(denylist) == 1
+    assert "long" in denylist
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from uuid import uuid4
+
+import pytest
+from common.entity_cache import (
+    NOT_FOUND,
+    AsyncEntityCache,
+    EntityCache,
+    MemoryBackend,
+    RedisBackend,
+    make_backend,
+)
+from common.enums import TaskPriority, TaskStatus
+from models.task import TaskDto
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """The subset of redis.Redis used by RedisBackend, expiry is ignored"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        self.thread = threading.get_ident()
+        return self.values.get(key)
+
+    def set(self, key, value, px):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in self.values if key.startswith(match[:-1])]
+
+
+def _task(**overrides):
+    return TaskDto(
+        **{
+            "id": uuid4(),
+            "summary": "Task",
+            "description": "Description",
+            "status": TaskStatus.TODO,
+            "priority": TaskPriority.LOW,
+            "owner_id": uuid4(),
+            "created_at": None,
+            "updated_at": None,
+            **overrides,
+        }
+    )
+
+
+def test_entity_cache_hit_miss_and_invalidation():
+    cache = EntityCache(MemoryBackend(10, 60, clock=Clock()), ttl=60, negative_ttl=5)
+    task = _task()
+
+    assert cache.get("task", task.id, TaskDto) is None
+    cache.set("task", task.id, task)
+    # Path parameters spell the same uuid differently
+    assert cache.get("task", str(task.id).upper(), TaskDto) is task
+
+    cache.invalidate("task", task.id.hex)
+    assert cache.get("task", task.id, TaskDto) is None
+
+    stats = cache.snapshot()["kinds"]["task"]
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+
+def test_entity_cache_negative_entries_use_their_own_ttl():
+    clock = Clock()
+    cache = EntityCache(MemoryBackend(10, 60, clock=clock), ttl=60, negative_ttl=5)
+    cache.set_not_found("user", "missing")
+    assert cache.get("user", "missing", TaskDto) is NOT_FOUND
+
+    clock.now += 5
+    assert cache.get("user", "missing", TaskDto) is None
+    assert cache.snapshot()["kinds"]["user"]["negative_hits"] == 1
+
+
+def test_entity_cache_reports_evictions():
+    cache = EntityCache(MemoryBackend(2, 60, clock=Clock()), ttl=60, negative_ttl=5)
+    for _ in range(3):
+        task = _task()
+        cache.set("task", task.id, task)
+
+    snapshot = cache.snapshot()
+    assert (snapshot["backend"], snapshot["size"], snapshot["evictions"]) == (
+        "memory",
+        2,
+        1,
+    )
+
+
+def test_entity_cache_shared_backend_round_trips_json():
+    client = FakeRedis()
+    cache = EntityCache(RedisBackend(client), ttl=60, negative_ttl=5)
+    task = _task(summary="Shared")
+
+    cache.set("task", task.id, task)
+    cache.set_not_found("task", "missing")
+
+    assert cache.get("task", task.id, TaskDto) == task
+    assert cache.get("task", "missing", TaskDto) is NOT_FOUND
+
+    cache.clear()
+    assert client.values == {}
+
+
+@pytest.mark.parametrize(
+    "backend, off_loop",
+    [(RedisBackend(FakeRedis()), True), (MemoryBackend(10, 60), False)],
+    ids=["redis", "memory"],
+)
+def test_async_entity_cache_keeps_network_calls_off_the_loop(backend, off_loop):
+    cache = AsyncEntityCache(EntityCache(backend, ttl=60, negative_ttl=5))
+    task = _task()
+
+    async def _round_trip():
+        await cache.set("task", task.id, task)
+        cached = await cache.get("task", task.id, TaskDto)
+        await cache.invalidate("task", task.id)
+        return cached, await cache.get("task", task.id, TaskDto)
+
+    assert asyncio.run(_round_trip()) == (task, None)
+    if off_loop:
+        assert backend._client.thread != threading.get_ident()
+
+
+def test_make_backend_without_redis_package(monkeypatch):
+    monkeypatch.setitem(__import__("sys").modules, "redis", None)
+    with pytest.raises(RuntimeError, match="redis"):
+        make_backend("redis://localhost:6379/0", 10, 60)
+    assert isinstance(make_backend(None, 10, 60), MemoryBackend)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from common.etag import etag_matches, make_etag, version
+
+
+def test_make_etag_is_strong_and_stable():
+    etag = make_etag("a", 1)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("a", 1)
+    assert etag != make_etag("a1")
+
+
+def test_version_falls_back_to_created_at_on_dicts_and_objects():
+    id, created_at = uuid4(), datetime(2026, 1, 1)
+    row = SimpleNamespace(id=id, created_at=created_at, updated_at=None)
+    assert version(row) == version({"id": id, "created_at": created_at})
+    assert version(row) != version({"id": id, "updated_at": datetime.now()})
+
+
+def test_etag_matches_if_none_match_lists():
+    etag = make_etag("task")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
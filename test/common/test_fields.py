@@ -0,0 +1,40 @@
+from uuid import uuid4
+
+import pytest
+from common.fields import list_fields, parse_fields, projection, sparse_list
+from fastapi import HTTPException
+from models.task import TaskDto
+from schemas.task import Task
+
+DEFAULT = list_fields(TaskDto)
+
+
+def test_parse_fields_keeps_the_dto_order():
+    # Without `fields` the response is the full DTO
+    assert DEFAULT == tuple(TaskDto.model_fields)
+    assert parse_fields(None, TaskDto, DEFAULT) == DEFAULT
+    assert parse_fields(" status,summary ,", TaskDto, DEFAULT) == (
+        "summary",
+        "status",
+    )
+
+
+@pytest.mark.parametrize("value", ["summary,password", "", ","])
+def test_parse_fields_rejects_unknown_and_empty(value):
+    with pytest.raises(HTTPException) as exc:
+        parse_fields(value, TaskDto, DEFAULT)
+    assert exc.value.status_code == 400
+
+
+def test_projection_always_reads_the_cursor_and_etag_columns():
+    names = {column.key for column in projection(Task, ("summary",))}
+    assert names == {"id", "summary", "created_at", "updated_at"}
+
+
+def test_sparse_list_serializes_only_the_requested_fields():
+    adapter = sparse_list(TaskDto, ("summary",))
+    rows = adapter.validate_python([{"id": uuid4(), "summary": "A"}])
+    assert adapter.dump_python(rows) == [{"summary": "A"}]
+    # Hidden fields stay readable for cursors and ETags
+    assert rows[0].id is not None
+    assert adapter is sparse_list(TaskDto, ("summary",))
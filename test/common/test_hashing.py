@@ -0,0 +1,72 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+import common.bcrypt_worker as bcrypt_worker
+from common.bcrypt_worker import (
+    check_password,
+    check_password_and_update,
+    hash_password,
+    make_bcrypt_context,
+)
+from common.hashing import PasswordHasher
+
+
+def test_hasher_runs_bcrypt_on_worker_processes():
+    hasher = PasswordHasher(workers=1, max_pending=2, retry_after=1)
+    try:
+        hashed = hasher.run(hash_password, "Password1")
+        assert hasher.run(check_password, "Password1", hashed) is True
+        assert hasher.run(check_password, "wrong", hashed) is False
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_worker_module_imports_passlib_only():
+    code = (
+        "import sys, common.bcrypt_worker; "
+        "assert not {'settings', 'fastapi', 'sqlalchemy'} & sys.modules.keys()"
+    )
+    app = Path(bcrypt_worker.__file__).parents[1]
+    subprocess.run([sys.executable, "-c", code], cwd=app, check=True)
+
+
+def test_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=0, max_pending=1, retry_after=3)
+    hasher.pending = 1
+
+    with pytest.raises(HTTPException) as exc:
+        hasher.run(hash_password, "Password1")
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "3"}
+    assert hasher.snapshot()["rejected"] == 1
+
+
+def test_hasher_releases_slot_after_async_call():
+    hasher = PasswordHasher(workers=0, max_pending=1, retry_after=1)
+
+    async def _hash_twice():
+        first = await hasher.run_async(hash_password, "Password1")
+        return first, await hasher.run_async(check_password, "Password1", first)
+
+    _, verified = asyncio.run(_hash_twice())
+    assert verified is True
+    assert hasher.pending == 0
+
+
+def test_check_password_and_update_rehashes_other_costs(monkeypatch):
+    monkeypatch.setattr(bcrypt_worker, "bcrypt_context", make_bcrypt_context(5))
+    outdated = make_bcrypt_context(4).hash("Password1")
+
+    valid, new_hash = check_password_and_update("Password1", outdated)
+    assert valid is True
+    assert new_hash.startswith("$2b$05$")
+
+    assert check_password_and_update("Password1", new_hash) == (True, None)
+    assert check_password_and_update("wrong", outdated) == (False, None)
@@ -0,0 +1,32 @@
+import json
+from datetime import datetime
+from uuid import uuid4
+
+from common.enums import TaskPriority, TaskStatus
+from common.responses import FastJSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from models.task import TaskDto, TaskDtoList
+
+
+def test_fast_json_response_matches_the_response_model_encoding():
+    rows = [
+        {
+            "id": uuid4(),
+            "summary": "Tâche",
+            "description": None,
+            "status": TaskStatus.TODO,
+            "priority": TaskPriority.HIGH,
+            "owner_id": uuid4(),
+            "created_at": datetime(2026, 1, 1, 12, 30, 0, 123456),
+            "updated_at": None,
+        }
+    ]
+    tasks = TaskDtoList.validate_python(rows)
+
+    fast = FastJSONResponse(tasks)
+    stdlib = JSONResponse(jsonable_encoder(tasks))
+
+    assert json.loads(fast.body) == json.loads(stdlib.body)
+    assert fast.media_type == "application/json"
+    assert isinstance(tasks[0], TaskDto)
@@ -0,0 +1,187 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import common.routing as routing
+import services.task as task_service
+from common.entity_cache import NOT_FOUND, entity_cache
+from common.enums import TaskPriority, TaskStatus
+from fastapi import HTTPException
+from models.task import TaskDto
+from common.routing import RoutingSession
+from database import Base
+from schemas.task import Task
+
+
+@pytest.fixture()
+def engines(tmp_path):
+    # Two SQLite files standing in for the primary and a replica
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(engine)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.fixture()
+def make_session(engines):
+    primary, replica = engines
+    factory = sessionmaker(class_=RoutingSession, bind=primary, replicas=[replica])
+
+    def _make(user_id=None, read_only=False, headers=None):
+        request = SimpleNamespace(
+            state=SimpleNamespace(user_id=user_id), headers=headers or {}, cookies={}
+        )
+        return factory(info={"request": request, "read_only": read_only})
+
+    return _make
+
+
+@pytest.fixture(autouse=True)
+def clear_writes():
+    routing._last_writes.clear()
+    yield
+    routing._last_writes.clear()
+
+
+def _task(summary):
+    return Task(
+        id=uuid4(),
+        summary=summary,
+        description="Description",
+        status=TaskStatus.TODO,
+        priority=TaskPriority.LOW,
+        created_at=datetime.now(),
+    )
+
+
+def _summaries(session):
+    return {task.summary for task in session.query(Task).all()}
+
+
+def test_writes_go_to_primary_and_reads_to_replica(make_session, engines):
+    _, replica = engines
+    with sessionmaker(bind=replica)() as seed:
+        seed.add(_task("replica"))
+        seed.commit()
+
+    with make_session() as db:
+        db.add(_task("primary"))
+        db.commit()
+        assert _summaries(db) == {"primary"}
+
+    with make_session(read_only=True) as db:
+        assert _summaries(db) == {"replica"}
+
+
+def test_read_your_writes_window(make_session, monkeypatch):
+    monkeypatch.setattr(routing, "DB_READ_YOUR_WRITES_SECONDS", 60)
+    writer, reader = str(uuid4()), str(uuid4())
+
+    with make_session(user_id=writer) as db:
+        db.add(_task("primary"))
+        db.commit()
+
+    with make_session(user_id=writer, read_only=True) as db:
+        assert _summaries(db) == {"primary"}
+
+    with make_session(user_id=reader, read_only=True) as db:
+        assert _summaries(db) == set()
+
+
+def test_last_write_sent_back_by_the_client(make_session, monkeypatch):
+    monkeypatch.setattr(routing, "DB_READ_YOUR_WRITES_SECONDS", 60)
+
+    with make_session(user_id=str(uuid4())) as db:
+        db.add(_task("primary"))
+        db.commit()
+        written_at = db.info["request"].state.last_write
+
+    # Another worker: nothing in its _last_writes, the header is enough
+    routing._last_writes.clear()
+    for header, summaries in (
+        (repr(written_at), {"primary"}),
+        (repr(written_at - 61), set()),
+        ("garbage", set()),
+    ):
+        with make_session(read_only=True, headers={"X-Last-Write": header}) as db:
+            assert _summaries(db) == summaries
+
+
+def test_middleware_hands_the_last_write_to_the_client():
+    async def endpoint(request):
+        if request.method == "POST":
+            request.state.last_write = 1700000000.5
+        return PlainTextResponse("Ok")
+
+    app = Starlette(routes=[Route("/", endpoint, methods=["GET", "POST"])])
+    app.add_middleware(routing.ReadYourWritesMiddleware, window=2.5)
+    client = TestClient(app)
+
+    res = client.post("/")
+    assert res.headers["X-Last-Write"] == "1700000000.5"
+    assert res.headers["Set-Cookie"] == (
+        "last_write=1700000000.5; Max-Age=3; Path=/; HttpOnly; SameSite=Lax"
+    )
+    assert "X-Last-Write" not in client.get("/").headers
+
+
+def test_read_your_writes_disabled(make_session):
+    writer = str(uuid4())
+
+    with make_session(user_id=writer) as db:
+        db.add(_task("primary"))
+        db.commit()
+
+    assert routing.wrote_recently(writer) is False
+    with make_session(user_id=writer, read_only=True) as db:
+        assert _summaries(db) == set()
+
+
+def test_rolled_back_writes_are_not_tracked(make_session, monkeypatch):
+    monkeypatch.setattr(routing, "DB_READ_YOUR_WRITES_SECONDS", 60)
+    writer = str(uuid4())
+
+    with make_session(user_id=writer) as db:
+        db.add(_task("primary"))
+        db.flush()
+        db.rollback()
+
+    assert routing.wrote_recently(writer) is False
+
+
+def test_replica_reads_are_not_cached(make_session, engines):
+    _, replica = engines
+    admin = SimpleNamespace(id=str(uuid4()), is_admin=True)
+    task, missing = _task("primary"), str(uuid4())
+    task_id = str(task.id)
+    with make_session() as db:
+        db.add(task)
+        db.commit()
+
+    # Not replicated yet: a 404 now, but no cached 404 for later
+    with make_session(read_only=True) as db:
+        for lookup in (task_id, missing):
+            with pytest.raises(HTTPException):
+                task_service.get_task_by_id(lookup, admin, db)
+            with pytest.raises(HTTPException):
+                task_service.get_task_etag(lookup, admin, db)
+        assert routing.read_from_replica(db)
+    assert entity_cache.get("task", task_id, TaskDto) is None
+
+    with make_session() as db:
+        assert task_service.get_task_by_id(task_id, admin, db).summary == "primary"
+        with pytest.raises(HTTPException):
+            task_service.get_task_by_id(missing, admin, db)
+    assert entity_cache.get("task", task_id, TaskDto).summary == "primary"
+    assert entity_cache.get("task", missing, TaskDto) is NOT_FOUND
@@ -1,12 +1,23 @@
+import asyncio
 import contextlib
+import os
 from types import SimpleNamespace
 from typing import Generator
 
 import pytest
+
+# No background denylist refresh against the real database
+os.environ.setdefault("REVOCATION_REFRESH_SECONDS", "0")
+
 from main import app
-from database import get_db_context
+from common.entity_cache import entity_cache
+from database import Base, get_db_context, get_read_db_context, get_read_db_factory
 from services.auth import token_interceptor
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
 
 
 @pytest.fixture()
@@ -46,6 +57,10 @@ def override_dependencies(mock_db_session):
     app.dependency_overrides[get_db_context] = lambda: _override_get_db_context(
         mock_db_session
     )
+    app.dependency_overrides[get_read_db_context] = lambda: _override_get_db_context(
+        mock_db_session
+    )
+    app.dependency_overrides[get_read_db_factory] = lambda: lambda: mock_db_session
     app.dependency_overrides[token_interceptor] = _override_token_interceptor
 
     yield
@@ -53,10 +68,57 @@ def override_dependencies(mock_db_session):
     # Cleanup overrides after each test
     with contextlib.suppress(Exception):
         app.dependency_overrides.pop(get_db_context, None)
+        app.dependency_overrides.pop(get_read_db_context, None)
+        app.dependency_overrides.pop(get_read_db_factory, None)
         app.dependency_overrides.pop(token_interceptor, None)
 
 
+@pytest.fixture(autouse=True)
+def clear_entity_cache():
+    # Every test starts cold, ids of one test never answer in another
+    entity_cache.clear()
+    yield
+    entity_cache.clear()
+
+
 @pytest.fixture()
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture()
+def sqlite_engine():
+    # Real in-memory database for tests that exercise the SQL itself
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def db_session(sqlite_engine):
+    session = sessionmaker(autoflush=False, bind=sqlite_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture()
+def async_session_factory(tmp_path):
+    # Each test drives its own event loop: connections are never pooled
+    # across loops, and the file outlives every single connection
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool
+    )
+
+    async def _create_all():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_create_all())
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
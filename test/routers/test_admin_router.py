@@ -0,0 +1,25 @@
+import database
+
+
+def test_get_db_pool_status_success(client, monkeypatch):
+    expected = {
+        "sync": {"pool": "MonitoredQueuePool", "size": 5, "checked_out": 1},
+        "async": None,
+    }
+    monkeypatch.setattr(database, "get_pools_status", lambda: expected)
+
+    res = client.get("/admin/db-pool", headers={"Authorization": "Bearer test"})
+    assert res.status_code == 200
+    assert res.json() == expected
+
+
+def test_get_auth_cache_status_success(client):
+    res = client.get("/admin/auth-cache", headers={"Authorization": "Bearer test"})
+    assert res.status_code == 200
+    assert {"hits", "misses", "size", "maxsize"} <= res.json().keys()
+
+
+def test_get_entity_cache_status_success(client):
+    res = client.get("/admin/entity-cache", headers={"Authorization": "Bearer test"})
+    assert res.status_code == 200
+    assert {"backend", "evictions", "ttl", "kinds"} <= res.json().keys()
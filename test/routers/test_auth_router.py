@@ -1,4 +1,12 @@
+import asyncio
+import gc
+import time
+
+import httpx
+from fastapi import HTTPException
 import routers.auth as auth_router
+import services.auth as auth_service
+from main import app
 
 
 def test_login_success(client, monkeypatch):
@@ -9,7 +17,8 @@ def test_login_success(client, monkeypatch):
         return "fake.jwt.token"
 
     monkeypatch.setattr(auth_router, "authenticate_user", _mock_authenticate_user)
-    monkeypatch.setattr(auth_router, "create_access_token", _mock_create_access_token)
+    monkeypatch.setattr(auth_service, "create_access_token", _mock_create_access_token)
+    monkeypatch.setattr(auth_router, "create_refresh_token", lambda user, db: "refresh")
 
     res = client.post(
         "/auth/login",
@@ -20,4 +29,107 @@ def test_login_success(client, monkeypatch):
     assert res.status_code == 201
     body = res.json()
     assert body["access_token"] == "fake.jwt.token"
+    assert body["refresh_token"] == "refresh"
     assert body["token_type"] == "bearer"
+
+
+def test_login_does_not_block_event_loop(monkeypatch):
+    # authenticate_user stands for the blocking query + bcrypt verify
+    def _slow_authenticate_user(username, password, db):
+        time.sleep(0.2)
+        return {"id": "u1", "username": username}
+
+    monkeypatch.setattr(auth_router, "authenticate_user", _slow_authenticate_user)
+    monkeypatch.setattr(auth_service, "create_access_token", lambda user, expires: "t")
+    monkeypatch.setattr(auth_router, "create_refresh_token", lambda user, db: "r")
+
+    async def _measure():
+        lags = []
+        running = True
+
+        async def _probe():
+            while running:
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - started - 0.01)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            probe = asyncio.create_task(_probe())
+            responses = await asyncio.gather(
+                *(
+                    c.post("/auth/login", data={"username": "jdoe", "password": "p"})
+                    for _ in range(10)
+                )
+            )
+            running = False
+            await probe
+        return responses, lags
+
+    # A full collection of the test process heap alone can stall the loop
+    # for ~100ms under coverage, it is not what this test measures
+    gc.collect()
+    gc.disable()
+    try:
+        responses, lags = asyncio.run(_measure())
+    finally:
+        gc.enable()
+
+    assert all(res.status_code == 201 for res in responses)
+    # 10 logins run inline would stall the loop for ~2s
+    assert max(lags) < 0.1
+
+
+def test_login_overloaded_returns_retry_after(client, monkeypatch):
+    def _overloaded_authenticate_user(username, password, db):
+        raise HTTPException(
+            status_code=503, detail="Overloaded", headers={"Retry-After": "2"}
+        )
+
+    monkeypatch.setattr(auth_router, "authenticate_user", _overloaded_authenticate_user)
+
+    res = client.post("/auth/login", data={"username": "jdoe", "password": "p"})
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "2"
+
+
+def test_refresh_success(client, monkeypatch):
+    def _mock_refresh_access_token(refresh_token, db):
+        assert refresh_token == "old.refresh.token"
+        return {
+            "access_token": "new.jwt.token",
+            "refresh_token": "new.refresh.token",
+            "token_type": "bearer",
+            "expires_in": 900,
+        }
+
+    monkeypatch.setattr(auth_router, "refresh_access_token", _mock_refresh_access_token)
+
+    res = client.post("/auth/refresh", json={"refresh_token": "old.refresh.token"})
+
+    assert res.status_code == 201
+    assert res.json()["refresh_token"] == "new.refresh.token"
+
+
+def test_logout_success(client, monkeypatch):
+    claims = {"jti": "jti-1", "id": "u1", "exp": 0}
+
+    def _mock_logout(token_claims, refresh_token, db):
+        assert token_claims == claims
+        assert refresh_token == "refresh"
+        return "Ok"
+
+    monkeypatch.setattr(auth_router, "logout_user", _mock_logout)
+    app.dependency_overrides[auth_service.token_claims] = lambda: claims
+    try:
+        res = client.post(
+            "/auth/logout",
+            json={"refresh_token": "refresh"},
+            headers={"Authorization": "Bearer test"},
+        )
+    finally:
+        app.dependency_overrides.pop(auth_service.token_claims, None)
+
+    assert res.status_code == 200
+    assert res.json() == "Ok"
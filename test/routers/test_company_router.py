@@ -46,7 +46,7 @@ def test_create_company_success(client, monkeypatch):
 def test_get_companies_success(client, monkeypatch):
     expected = [_fake_company_dto(), _fake_company_dto()]
 
-    def _mock_get_companies(page, limit, db):
+    def _mock_get_companies(page, limit, db, fields):
         return expected
 
     monkeypatch.setattr(
@@ -65,7 +65,8 @@ def test_get_company_by_id_success(client, monkeypatch):
     company_id = str(uuid4())
     expected = _fake_company_dto(company_id)
 
-    def _mock_get_company_by_id(cid, user, db):
+    def _mock_get_company_by_id(cid, user, db, **employees):
+        assert employees["include_employees"] is False
         return expected
 
     monkeypatch.setattr(
@@ -117,3 +118,26 @@ def test_delete_company_success(client, monkeypatch):
     )
     assert res.status_code == 200
     assert res.json() == "Ok"
+
+
+def test_get_company_by_id_with_employees(client, monkeypatch):
+    company_id = str(uuid4())
+    expected = _fake_company_dto(company_id)
+
+    def _mock_get_company_by_id(cid, user, db, **employees):
+        assert employees == {
+            "include_employees": True,
+            "employees_page": 2,
+            "employees_limit": 5,
+        }
+        return expected
+
+    monkeypatch.setattr(
+        company_router.company_service, "get_company_by_id", _mock_get_company_by_id
+    )
+
+    res = client.get(
+        f"/companies/{company_id}?include_employees=true&employees_page=2&employees_limit=5",
+        headers={"Authorization": "Bearer test"},
+    )
+    assert res.status_code == 200
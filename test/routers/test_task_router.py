@@ -1,8 +1,11 @@
+from types import SimpleNamespace
 from uuid import uuid4
 
+import pytest
 import routers.task as task_router
-from common.enums import TaskPriority, TaskStatus
-from models.task import TaskDto
+from common.enums import TaskPriority, TaskStatus, ThroughputGrain
+from models.task import TaskDto, TaskThroughputDto
+from services.task_stats import task_stats_dto
 
 
 def _fake_task_dto(task_id=None):
@@ -45,7 +48,7 @@ def test_create_task_success(client, monkeypatch):
 def test_get_tasks_success(client, monkeypatch):
     expected = [_fake_task_dto(), _fake_task_dto()]
 
-    def _mock_get_tasks(page, limit, user, db):
+    def _mock_get_tasks(page, limit, user, db, fields, params):
         return expected
 
     monkeypatch.setattr(task_router.task_service, "get_tasks", _mock_get_tasks)
@@ -56,6 +59,51 @@ def test_get_tasks_success(client, monkeypatch):
     assert len(res.json()) == 2
 
 
+def test_get_tasks_filters(client, monkeypatch):
+    def _mock_get_tasks(page, limit, user, db, fields, params):
+        assert params.status == [TaskStatus.TODO, TaskStatus.DONE]
+        assert params.open is True
+        assert params.sort_keys() == [("priority", True)]
+        return []
+
+    monkeypatch.setattr(task_router.task_service, "get_tasks", _mock_get_tasks)
+
+    res = client.get(
+        "/tasks/?status=todo&status=done&open=true&sort=-priority",
+        headers={"Authorization": "Bearer test"},
+    )
+    assert res.status_code == 200
+
+
+@pytest.mark.parametrize("query", ["sort=summary", "sort=priority&cursor="])
+def test_get_tasks_rejects_invalid_sort(client, query):
+    res = client.get(f"/tasks/?{query}", headers={"Authorization": "Bearer test"})
+    assert res.status_code == 400
+
+
+def test_search_tasks(client, monkeypatch):
+    expected = [_fake_task_dto()]
+
+    def _mock_search_tasks(q, page, limit, user, db, fields, params):
+        assert q == "invoice"
+        assert params.open is True
+        return expected
+
+    monkeypatch.setattr(task_router.task_service, "search_tasks", _mock_search_tasks)
+
+    res = client.get(
+        "/tasks/search?q=invoice&open=true", headers={"Authorization": "Bearer test"}
+    )
+    assert res.status_code == 200
+    assert res.json()[0]["id"] == expected[0]["id"]
+
+
+@pytest.mark.parametrize("query", ["", "q=", "q=invoice&sort=created_at"])
+def test_search_tasks_rejects_invalid_queries(client, query):
+    res = client.get(f"/tasks/search?{query}", headers={"Authorization": "Bearer test"})
+    assert res.status_code == 400
+
+
 def test_get_task_by_id_success(client, monkeypatch):
     task_id = str(uuid4())
     expected = _fake_task_dto(task_id)
@@ -118,3 +166,246 @@ def test_delete_task_success(client, monkeypatch):
     res = client.delete(f"/tasks/{task_id}", headers={"Authorization": "Bearer test"})
     assert res.status_code == 200
     assert res.json() == "Ok"
+
+
+def test_get_tasks_async_service(client, monkeypatch):
+    expected = [_fake_task_dto()]
+
+    async def _mock_get_tasks(page, limit, user, db, fields, params):
+        return expected
+
+    monkeypatch.setattr(task_router.task_service, "get_tasks", _mock_get_tasks)
+
+    res = client.get("/tasks/?page=1&limit=1", headers={"Authorization": "Bearer test"})
+    assert res.status_code == 200
+    assert res.json()[0]["id"] == expected[0]["id"]
+
+
+def test_get_tasks_total_header(client, monkeypatch):
+    expected = [_fake_task_dto()]
+    monkeypatch.setattr(
+        task_router.task_service,
+        "get_tasks",
+        lambda page, limit, user, db, fields, params: expected,
+    )
+    monkeypatch.setattr(
+        task_router.task_service,
+        "get_tasks_total",
+        lambda user, db, params: (120000, True),
+    )
+
+    res = client.get("/tasks/?total=true", headers={"Authorization": "Bearer test"})
+    assert res.status_code == 200
+    assert res.headers["X-Total-Count"] == "120000"
+    assert res.headers["X-Total-Count-Estimated"] == "true"
+    # The total is part of the validator, a new total is a new representation
+    plain = client.get("/tasks/", headers={"Authorization": "Bearer test"})
+    assert "X-Total-Count" not in plain.headers
+    assert plain.headers["ETag"] != res.headers["ETag"]
+
+
+def test_get_tasks_by_cursor_success(client, monkeypatch):
+    expected = [_fake_task_dto(), _fake_task_dto()]
+
+    def _mock_get_tasks_by_cursor(cursor, limit, user, db, fields, params):
+        assert cursor == ""
+        return expected, "next"
+
+    monkeypatch.setattr(
+        task_router.task_service, "get_tasks_by_cursor", _mock_get_tasks_by_cursor
+    )
+
+    res = client.get(
+        "/tasks/?cursor=&limit=2", headers={"Authorization": "Bearer test"}
+    )
+    assert res.status_code == 200
+    assert len(res.json()) == 2
+    assert res.headers["X-Next-Cursor"] == "next"
+
+
+def test_create_tasks_bulk_success(client, monkeypatch):
+    task_id = str(uuid4())
+    payload = [
+        {"summary": "Task summary", "description": "Task description"},
+        {"summary": "Missing description"},
+    ]
+
+    def _mock_create_tasks_bulk(items, user, db):
+        assert items == payload
+        return {
+            "created": 1,
+            "invalid": 1,
+            "results": [
+                {"index": 0, "status": "created", "id": task_id},
+                {"index": 1, "status": "invalid", "errors": ["Missing fields"]},
+            ],
+        }
+
+    monkeypatch.setattr(
+        task_router.task_service, "create_tasks_bulk", _mock_create_tasks_bulk
+    )
+
+    res = client.post(
+        "/tasks/bulk", json=payload, headers={"Authorization": "Bearer test"}
+    )
+    assert res.status_code == 201
+    assert res.json()["created"] == 1
+    assert res.json()["results"][0]["id"] == task_id
+
+
+def test_update_tasks_success(client, monkeypatch):
+    task_id = str(uuid4())
+    payload = {"filter": {"status": "todo"}, "changes": {"status": "done"}}
+
+    def _mock_update_tasks(request, user, db):
+        assert request.filter.status == TaskStatus.TODO
+        assert request.changes.status == TaskStatus.DONE
+        return {"affected": 1, "ids": [task_id]}
+
+    monkeypatch.setattr(task_router.task_service, "update_tasks", _mock_update_tasks)
+
+    res = client.patch(
+        "/tasks/", json=payload, headers={"Authorization": "Bearer test"}
+    )
+    assert res.status_code == 200
+    assert res.json() == {"affected": 1, "ids": [task_id]}
+
+
+def test_delete_tasks_success(client, monkeypatch):
+    task_id = str(uuid4())
+
+    def _mock_delete_tasks(filter, user, db):
+        assert [str(id) for id in filter.ids] == [task_id]
+        return {"affected": 1, "ids": [task_id]}
+
+    monkeypatch.setattr(task_router.task_service, "delete_tasks", _mock_delete_tasks)
+
+    res = client.request(
+        "DELETE",
+        "/tasks/",
+        json={"ids": [task_id]},
+        headers={"Authorization": "Bearer test"},
+    )
+    assert res.status_code == 200
+    assert res.json()["affected"] == 1
+
+
+def test_export_tasks_streams_chunks(client, monkeypatch):
+    def _mock_export_tasks(format, user, sessions):
+        assert format == "csv"
+        yield b"id,summary\n"
+        yield b"1,First\n"
+
+    monkeypatch.setattr(task_router.task_service, "export_tasks", _mock_export_tasks)
+
+    res = client.get(
+        "/tasks/export?format=csv", headers={"Authorization": "Bearer test"}
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    # Streamed bodies are gzipped whatever their size
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.text == "id,summary\n1,First\n"
+
+
+def test_export_tasks_rejects_unknown_format(client):
+    res = client.get(
+        "/tasks/export?format=xml", headers={"Authorization": "Bearer test"}
+    )
+    assert res.status_code == 400
+
+
+def test_get_task_stats_for_a_company(client, monkeypatch):
+    company_id = uuid4()
+    group = SimpleNamespace(status=TaskStatus.DONE, priority=TaskPriority.HIGH, count=3)
+
+    def _mock_get_task_stats(user, db, owner_id, company_id):
+        assert (owner_id, company_id) == (None, expected_company_id)
+        return task_stats_dto([group])
+
+    expected_company_id = company_id
+    monkeypatch.setattr(
+        task_router.task_stats_service, "get_task_stats", _mock_get_task_stats
+    )
+
+    res = client.get(
+        f"/tasks/stats?company_id={company_id}",
+        headers={"Authorization": "Bearer test"},
+    )
+    assert res.status_code == 200
+    assert res.json()["total"] == 3
+    assert res.json()["status"]["done"] == 3
+    assert res.json()["groups"] == [{"status": "done", "priority": "high", "count": 3}]
+
+
+def test_get_task_throughput_defaults_to_days(client, monkeypatch):
+    company_id = uuid4()
+
+    def _mock_get_task_throughput(company, grain, start, end, user, db):
+        assert (company, grain, start.day) == (company_id, ThroughputGrain.DAY, 1)
+        return TaskThroughputDto(
+            company_id=company,
+            grain=grain,
+            points=[{"bucket": start, "created": 2, "completed": 1}],
+        )
+
+    monkeypatch.setattr(
+        task_router.task_throughput_service,
+        "get_task_throughput",
+        _mock_get_task_throughput,
+    )
+
+    res = client.get(
+        f"/tasks/throughput?company_id={company_id}&start=2026-10-01",
+        headers={"Authorization": "Bearer test"},
+    )
+    assert res.status_code == 200
+    assert res.json()["points"] == [
+        {"bucket": "2026-10-01T00:00:00", "created": 2, "completed": 1}
+    ]
+
+
+def test_get_task_by_id_not_modified(client, monkeypatch):
+    task_id = str(uuid4())
+    expected = _fake_task_dto(task_id)
+    etag = task_router.task_etag(expected)
+
+    monkeypatch.setattr(
+        task_router.task_service, "get_task_by_id", lambda tid, user, db: expected
+    )
+    res = client.get(f"/tasks/{task_id}", headers={"Authorization": "Bearer test"})
+    # The test client accepts gzip: weak on the 200 and the 304 alike
+    assert res.headers["ETag"] == f"W/{etag}"
+
+    def _fail(*args):
+        raise AssertionError("the task must not be loaded")
+
+    monkeypatch.setattr(task_router.task_service, "get_task_by_id", _fail)
+    monkeypatch.setattr(
+        task_router.task_service, "get_task_etag", lambda tid, user, db: etag
+    )
+    res = client.get(
+        f"/tasks/{task_id}",
+        headers={"Authorization": "Bearer test", "If-None-Match": etag},
+    )
+    assert res.status_code == 304
+    assert res.headers["ETag"] == f"W/{etag}"
+    assert res.content == b""
+
+
+def test_get_tasks_changed_page_is_sent_again(client, monkeypatch):
+    expected = [_fake_task_dto()]
+    monkeypatch.setattr(
+        task_router.task_service,
+        "get_tasks",
+        lambda page, limit, user, db, fields, params: expected,
+    )
+    monkeypatch.setattr(
+        task_router.task_service, "get_tasks_etag", lambda *args, **kwargs: '"changed"'
+    )
+
+    res = client.get(
+        "/tasks/", headers={"Authorization": "Bearer test", "If-None-Match": '"old"'}
+    )
+    assert res.status_code == 200
+    assert res.headers["ETag"] == f"W/{task_router.tasks_etag(expected)}"
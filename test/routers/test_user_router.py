@@ -43,7 +43,7 @@ def test_create_user_success(client, monkeypatch):
 def test_get_users_success(client, monkeypatch):
     expected = [_fake_user_dto(), _fake_user_dto()]
 
-    def _mock_get_users(page, limit, db):
+    def _mock_get_users(page, limit, db, fields):
         return expected
 
     monkeypatch.setattr(user_router.user_service, "get_users", _mock_get_users)
@@ -54,6 +54,20 @@ def test_get_users_success(client, monkeypatch):
     assert len(res.json()) == 2
 
 
+def test_get_users_total_header(client, monkeypatch):
+    monkeypatch.setattr(
+        user_router.user_service, "get_users", lambda page, limit, db, fields: []
+    )
+    monkeypatch.setattr(
+        user_router.user_service, "get_users_total", lambda db: (3, False)
+    )
+
+    res = client.get("/users/?page=2&limit=2&total=true")
+    assert res.status_code == 200
+    assert res.headers["X-Total-Count"] == "3"
+    assert res.headers["X-Total-Count-Estimated"] == "false"
+
+
 def test_get_user_by_id_success(client, monkeypatch):
     user_id = str(uuid4())
     expected = _fake_user_dto(user_id)
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import common.bcrypt_worker as bcrypt_worker
+import pytest
+import services.aio.auth as aio_auth_service
+import services.auth as auth_service
+from common.cache import TTLCache
+from common.denylist import Denylist
+from common.bcrypt_worker import make_bcrypt_context
+from common.hashing import PasswordHasher
+from fastapi import HTTPException
+from schemas.refresh_token import RefreshToken
+from schemas.revoked_token import RevokedToken
+from schemas.user import User
+from sqlalchemy import func, select
+
+
+@pytest.fixture(autouse=True)
+def auth_settings(monkeypatch):
+    monkeypatch.setattr(auth_service, "JWT_SECRET", "secret")
+    monkeypatch.setattr(auth_service, "JWT_ALGORITHM", "HS256")
+    monkeypatch.setattr(auth_service, "token_cache", TTLCache(maxsize=10, ttl=60))
+    monkeypatch.setattr(bcrypt_worker, "bcrypt_context", make_bcrypt_context(4))
+    monkeypatch.setattr(aio_auth_service, "password_hasher", PasswordHasher(0, 10, 1))
+    # Both modules must see the same denylist, as they do in the app
+    denylist = Denylist(1000, 0.01)
+    monkeypatch.setattr(auth_service, "denylist", denylist)
+    monkeypatch.setattr(aio_auth_service, "denylist", denylist)
+
+
+def _run(async_session_factory, scenario):
+    async def _with_session():
+        async with async_session_factory() as db:
+            return await scenario(db)
+
+    return asyncio.run(_with_session())
+
+
+async def _db_user(db, password="Password1"):
+    user = User(
+        id=uuid4(),
+        username=f"user_{uuid4().hex[:8]}",
+        email=f"{uuid4().hex[:8]}@example.com",
+        first_name="John",
+        last_name="Doe",
+        password=bcrypt_worker.hash_password(password),
+        is_admin=False,
+        created_at=datetime.now(),
+    )
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def _unrevoked(db):
+    statement = select(func.count(RefreshToken.id)).filter(
+        RefreshToken.revoked_at.is_(None)
+    )
+    return (await db.execute(statement)).scalar_one()
+
+
+def test_login_checks_the_password(async_session_factory):
+    async def scenario(db):
+        user = await _db_user(db)
+        authenticated = await aio_auth_service.authenticate_user(
+            user.username, "Password1", db
+        )
+        refresh_token = await aio_auth_service.create_refresh_token(authenticated, db)
+
+        failures = []
+        for username, password in ((user.username, "Wrong1234"), ("nobody", "x")):
+            with pytest.raises(HTTPException) as exc:
+                await aio_auth_service.authenticate_user(username, password, db)
+            failures.append(exc.value.status_code)
+        return user, authenticated, refresh_token, failures
+
+    user, authenticated, refresh_token, failures = _run(async_session_factory, scenario)
+
+    assert authenticated.id == user.id
+    assert auth_service.decode_refresh_token(refresh_token)["id"] == str(user.id)
+    assert failures == [401, 404]
+
+
+def test_login_rehashes_outdated_cost(async_session_factory, monkeypatch):
+    async def scenario(db):
+        user = await _db_user(db)
+        monkeypatch.setattr(bcrypt_worker, "bcrypt_context", make_bcrypt_context(5))
+        await aio_auth_service.authenticate_user(user.username, "Password1", db)
+        return (await db.execute(select(User.password))).scalar_one()
+
+    stored = _run(async_session_factory, scenario)
+
+    assert stored.startswith("$2b$05$")
+
+
+def test_refresh_rotates_and_reuse_revokes_the_family(async_session_factory):
+    async def scenario(db):
+        user = await _db_user(db)
+        stolen = await aio_auth_service.create_refresh_token(user, db)
+        tokens = await aio_auth_service.refresh_access_token(stolen, db)
+        claims = auth_service.verify_token(tokens["access_token"])
+
+        with pytest.raises(HTTPException) as exc:
+            await aio_auth_service.refresh_access_token(stolen, db)
+        assert exc.value.status_code == 401
+        with pytest.raises(HTTPException):
+            await aio_auth_service.refresh_access_token(tokens["refresh_token"], db)
+        return user, claims, await _unrevoked(db)
+
+    user, claims, unrevoked = _run(async_session_factory, scenario)
+
+    assert claims["id"] == str(user.id)
+    assert unrevoked == 0
+
+
+def test_logout_revokes_access_and_refresh_tokens(async_session_factory):
+    async def scenario(db):
+        user = await _db_user(db)
+        refresh_token = await aio_auth_service.create_refresh_token(user, db)
+        token = auth_service.create_access_token(user, timedelta(minutes=5))
+        request = SimpleNamespace(state=SimpleNamespace())
+        auth_service.token_interceptor(request, token)
+
+        result = await aio_auth_service.logout(
+            request.state.token_claims, refresh_token, db
+        )
+        # Retried, the access token is already revoked
+        assert await aio_auth_service.logout(request.state.token_claims, None, db)
+        revoked = (await db.execute(select(func.count(RevokedToken.id)))).scalar_one()
+        assert revoked == 1
+        with pytest.raises(HTTPException) as exc:
+            await aio_auth_service.refresh_access_token(refresh_token, db)
+        assert exc.value.status_code == 401
+        return result, token, await _unrevoked(db)
+
+    result, token, unrevoked = _run(async_session_factory, scenario)
+
+    assert (result, unrevoked) == ("Ok", 0)
+    with pytest.raises(HTTPException) as exc:
+        auth_service.token_interceptor(SimpleNamespace(state=SimpleNamespace()), token)
+    assert exc.value.status_code == 401
@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import services.aio.company as company_service
+from common.enums import CompanyMode
+from fastapi import HTTPException
+from models.company import CreateCompanyDto, UpdateCompanyDto
+from schemas.company import Company
+from schemas.user import User
+from sqlalchemy import select
+
+
+def _request(**overrides):
+    base = {"name": "Acme", "description": "Description", "mode": CompanyMode.PRODUCT}
+    base.update(overrides)
+    return CreateCompanyDto(**base)
+
+
+def _employee(company_id):
+    return User(
+        id=uuid4(),
+        username=f"user_{uuid4().hex[:8]}",
+        email=f"{uuid4().hex[:8]}@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        company_id=company_id,
+        created_at=datetime.now(),
+    )
+
+
+def _caller(user=None, is_admin=False):
+    return SimpleNamespace(id=str(user.id if user else uuid4()), is_admin=is_admin)
+
+
+def _run(async_session_factory, scenario):
+    async def _with_session():
+        async with async_session_factory() as db:
+            return await scenario(db)
+
+    return asyncio.run(_with_session())
+
+
+def test_create_then_get_company(async_session_factory):
+    async def scenario(db):
+        created = await company_service.create_company(_request(), db)
+        employee = _employee(created.id)
+        db.add(employee)
+        await db.commit()
+
+        company_id = str(created.id)
+        member = await company_service.get_company_by_id(
+            company_id, _caller(employee), db, include_employees=True
+        )
+        with pytest.raises(HTTPException) as exc:
+            await company_service.get_company_by_id(company_id, _caller(), db)
+        return created, member, employee, exc.value.status_code
+
+    created, member, employee, status_code = _run(async_session_factory, scenario)
+
+    assert (member.id, member.name, member.mode) == (
+        created.id,
+        "Acme",
+        CompanyMode.PRODUCT,
+    )
+    assert [user.id for user in member.employees] == [employee.id]
+    # Outsiders see nothing, even once the company is cached
+    assert status_code == 403
+
+
+def test_create_company_rejects_taken_name(async_session_factory):
+    async def scenario(db):
+        await company_service.create_company(_request(), db)
+        with pytest.raises(HTTPException) as exc:
+            await company_service.create_company(_request(), db)
+        return exc.value.status_code
+
+    assert _run(async_session_factory, scenario) == 400
+
+
+def test_update_company_refreshes_the_cached_entry(async_session_factory):
+    async def scenario(db):
+        company_id = str((await company_service.create_company(_request(), db)).id)
+        admin = _caller(is_admin=True)
+        await company_service.get_company_by_id(company_id, admin, db)
+        request = UpdateCompanyDto(description="Updated", mode=CompanyMode.OUTSOURCE)
+        updated = await company_service.update_company(company_id, request, db)
+        return updated, await company_service.get_company_by_id(company_id, admin, db)
+
+    updated, fetched = _run(async_session_factory, scenario)
+
+    assert (updated.description, updated.mode) == ("Updated", CompanyMode.OUTSOURCE)
+    assert updated.updated_at is not None
+    assert (fetched.description, fetched.mode) == ("Updated", CompanyMode.OUTSOURCE)
+
+
+def test_delete_company_releases_its_employees(async_session_factory):
+    async def scenario(db):
+        company_id = (await company_service.create_company(_request(), db)).id
+        db.add(_employee(company_id))
+        await db.commit()
+        admin = _caller(is_admin=True)
+        await company_service.get_company_by_id(str(company_id), admin, db)
+
+        assert await company_service.delete_company(str(company_id), db) == "Ok"
+        with pytest.raises(HTTPException) as exc:
+            await company_service.get_company_by_id(str(company_id), admin, db)
+        assert exc.value.status_code == 404
+        companies = (await db.execute(select(Company.id))).scalars().all()
+        return companies, (await db.execute(select(User.company_id))).scalar_one()
+
+    assert _run(async_session_factory, scenario) == ([], None)
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda db: company_service.update_company(
+            str(uuid4()),
+            UpdateCompanyDto(description="x", mode=CompanyMode.PRODUCT),
+            db,
+        ),
+        lambda db: company_service.delete_company(str(uuid4()), db),
+    ],
+    ids=["update", "delete"],
+)
+def test_missing_company_is_not_found(async_session_factory, call):
+    async def scenario(db):
+        with pytest.raises(HTTPException) as exc:
+            await call(db)
+        return exc.value.status_code
+
+    assert _run(async_session_factory, scenario) == 404
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+import services.aio.task as task_service
+import services.aio.task_stats as stats_service
+from common.enums import TaskPriority, TaskStatus
+from models.task import BulkUpdateTaskDto
+from schemas.user import User
+
+
+class FakeScalars:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return FakeScalars(self._rows)
+
+    def keys(self):
+        return list(vars(self._rows[0])) if self._rows else []
+
+    def all(self):
+        # Column selects return plain tuples
+        return [tuple(vars(row).values()) for row in self._rows]
+
+
+class FakeAsyncSession:
+    def __init__(self, rows=None):
+        self._rows = rows or []
+        self.statements = []
+        self.added = []
+        self.deleted = []
+        self.committed = False
+        self.info = {}
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self._rows)
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def delete(self, instance):
+        self.deleted.append(instance)
+
+    async def commit(self):
+        self.committed = True
+
+    async def refresh(self, instance):
+        # Simulate DB-populated fields after commit
+        if getattr(instance, "id", None) is None:
+            instance.id = uuid4()
+        if "updated_at" not in instance.__dict__:
+            instance.updated_at = None
+
+
+def _task(**overrides):
+    base = {
+        "id": uuid4(),
+        "summary": "Summary",
+        "description": "Description",
+        "status": TaskStatus.BACKLOG,
+        "priority": TaskPriority.LOW,
+        "owner_id": uuid4(),
+        "created_at": None,
+        "updated_at": None,
+    }
+    base.update(overrides)
+    return SimpleNamespace(**base)
+
+
+def _user(is_admin=False, user_id=None):
+    return SimpleNamespace(id=str(user_id or uuid4()), is_admin=is_admin)
+
+
+def test_create_task_success():
+    session = FakeAsyncSession()
+    user = _user()
+    request = SimpleNamespace(
+        summary="Summary",
+        description="Description",
+        status=TaskStatus.TODO,
+        priority=TaskPriority.HIGH,
+    )
+
+    result = asyncio.run(task_service.create_task(request, user, session))
+
+    assert result.summary == "Summary"
+    assert str(result.owner_id) == user.id
+    assert session.committed is True
+
+
+def test_get_tasks_filters_by_owner_for_normal_user():
+    tasks = [_task(), _task()]
+    session = FakeAsyncSession(rows=tasks)
+
+    result = asyncio.run(task_service.get_tasks(1, 2, _user(), session))
+
+    assert [task.id for task in result] == [task.id for task in tasks]
+    assert "owner_id" in str(session.statements[0])
+
+
+def test_get_tasks_admin_sees_all():
+    session = FakeAsyncSession(rows=[_task()])
+
+    asyncio.run(task_service.get_tasks(1, 10, _user(is_admin=True), session))
+
+    assert "WHERE" not in str(session.statements[0])
+
+
+def test_get_task_by_id_not_found():
+    session = FakeAsyncSession()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(task_service.get_task_by_id(str(uuid4()), _user(), session))
+    assert exc.value.status_code == 404
+
+
+def test_get_task_by_id_not_owner():
+    session = FakeAsyncSession(rows=[_task()])
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(task_service.get_task_by_id(str(uuid4()), _user(), session))
+    assert exc.value.status_code == 403
+
+
+def test_delete_task_success():
+    user = _user()
+    task = _task(owner_id=user.id)
+    session = FakeAsyncSession(rows=[task])
+
+    result = asyncio.run(task_service.delete_task(str(task.id), user, session))
+
+    assert result == "Ok"
+    assert task in session.deleted
+    assert session.committed is True
+
+
+def test_bulk_transition_updates_the_stats(async_session_factory):
+    async def scenario():
+        async with async_session_factory() as db:
+            owner = User(
+                id=uuid4(),
+                username="owner",
+                email="owner@example.com",
+                first_name="John",
+                last_name="Doe",
+                password="HASHED",
+                created_at=datetime.now(),
+            )
+            db.add(owner)
+            await db.commit()
+            user = _user(user_id=owner.id)
+            await task_service.create_tasks_bulk(
+                [
+                    {"summary": f"Task {index}", "description": "x"}
+                    for index in range(3)
+                ],
+                user,
+                db,
+            )
+            result = await task_service.update_tasks(
+                BulkUpdateTaskDto(
+                    filter={"status": "backlog"}, changes={"status": "done"}
+                ),
+                user,
+                db,
+            )
+            stats = await stats_service.get_task_stats(user, db)
+            return result.affected, stats.status[TaskStatus.DONE], stats.total
+
+    assert asyncio.run(scenario()) == (3, 3, 3)
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+import common.bcrypt_worker as bcrypt_worker
+import pytest
+import services.aio.auth as auth_service
+import services.aio.user as user_service
+from common.entity_cache import entity_cache
+from common.enums import TaskPriority, TaskStatus
+from common.bcrypt_worker import make_bcrypt_context
+from common.hashing import PasswordHasher
+from fastapi import HTTPException
+from models.user import CreateUserDto, UpdateUserDto, UserDto
+from schemas.task import Task
+from schemas.user import User
+from sqlalchemy import func, select
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashing(monkeypatch):
+    monkeypatch.setattr(bcrypt_worker, "bcrypt_context", make_bcrypt_context(4))
+    monkeypatch.setattr(auth_service, "password_hasher", PasswordHasher(0, 10, 1))
+
+
+def _request(**overrides):
+    base = {
+        "username": "john",
+        "email": "john@example.com",
+        "first_name": "John",
+        "last_name": "Doe",
+        "password": "Password1",
+    }
+    base.update(overrides)
+    return CreateUserDto(**base)
+
+
+def _run(async_session_factory, scenario):
+    async def _with_session():
+        async with async_session_factory() as db:
+            return await scenario(db)
+
+    return asyncio.run(_with_session())
+
+
+def test_create_then_get_user(async_session_factory):
+    async def scenario(db):
+        created = await user_service.create_user(_request(), db)
+        fetched = await user_service.get_user_by_id(str(created.id), db)
+        stored = (await db.execute(select(User.password))).scalar_one()
+        return created, fetched, stored
+
+    created, fetched, stored = _run(async_session_factory, scenario)
+
+    assert fetched.id == created.id
+    assert fetched.username == "john"
+    assert fetched.tasks == []
+    assert bcrypt_worker.check_password("Password1", stored)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [{"email": "other@example.com"}, {"username": "other"}],
+    ids=["same-username", "same-email"],
+)
+def test_create_user_rejects_taken_username_or_email(async_session_factory, overrides):
+    async def scenario(db):
+        await user_service.create_user(_request(), db)
+        with pytest.raises(HTTPException) as exc:
+            await user_service.create_user(_request(**overrides), db)
+        count = (await db.execute(select(func.count(User.id)))).scalar_one()
+        return exc.value.status_code, count
+
+    assert _run(async_session_factory, scenario) == (400, 1)
+
+
+def test_update_user_refreshes_the_cached_entry(async_session_factory):
+    async def scenario(db):
+        user_id = str((await user_service.create_user(_request(), db)).id)
+        await user_service.get_user_by_id(user_id, db)
+        request = UpdateUserDto(first_name="Jane", last_name=None)
+        updated = await user_service.update_user(user_id, request, db)
+        return updated, await user_service.get_user_by_id(user_id, db)
+
+    updated, fetched = _run(async_session_factory, scenario)
+
+    assert (updated.first_name, updated.last_name) == ("Jane", "Doe")
+    assert updated.updated_at is not None
+    assert fetched.first_name == "Jane"
+
+
+def test_delete_user_orphans_their_tasks(async_session_factory):
+    async def scenario(db):
+        user_id = (await user_service.create_user(_request(), db)).id
+        task = Task(
+            id=uuid4(),
+            summary="Summary",
+            status=TaskStatus.TODO,
+            priority=TaskPriority.LOW,
+            owner_id=user_id,
+            created_at=datetime.now(),
+        )
+        db.add(task)
+        await db.commit()
+        await user_service.get_user_by_id(str(user_id), db)
+
+        assert await user_service.delete_user(str(user_id), db) == "Ok"
+        assert entity_cache.get("user", str(user_id), UserDto) is None
+        with pytest.raises(HTTPException) as exc:
+            await user_service.get_user_by_id(str(user_id), db)
+        assert exc.value.status_code == 404
+        return (await db.execute(select(Task.owner_id))).scalar_one()
+
+    assert _run(async_session_factory, scenario) is None
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda db: user_service.update_user(
+            str(uuid4()), UpdateUserDto(first_name="Jane", last_name=None), db
+        ),
+        lambda db: user_service.delete_user(str(uuid4()), db),
+    ],
+    ids=["update", "delete"],
+)
+def test_missing_user_is_not_found(async_session_factory, call):
+    async def scenario(db):
+        with pytest.raises(HTTPException) as exc:
+            await call(db)
+        return exc.value.status_code
+
+    assert _run(async_session_factory, scenario) == 404
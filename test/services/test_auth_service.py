@@ -0,0 +1,222 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy.orm import sessionmaker
+
+import database
+import services.auth as auth_service
+import common.bcrypt_worker as bcrypt_worker
+from common.cache import TTLCache
+from common.denylist import Denylist
+from common.bcrypt_worker import make_bcrypt_context
+from common.hashing import PasswordHasher
+from schemas.refresh_token import RefreshToken
+from schemas.revoked_token import RevokedToken
+from schemas.user import User
+
+
+@pytest.fixture(autouse=True)
+def jwt_settings(monkeypatch):
+    monkeypatch.setattr(auth_service, "JWT_SECRET", "secret")
+    monkeypatch.setattr(auth_service, "JWT_ALGORITHM", "HS256")
+    monkeypatch.setattr(auth_service, "token_cache", TTLCache(maxsize=10, ttl=60))
+
+
+def _token(expires=timedelta(minutes=15)):
+    user = SimpleNamespace(
+        id=uuid4(),
+        username="john",
+        first_name="John",
+        last_name="Doe",
+        is_admin=False,
+    )
+    return auth_service.create_access_token(user, expires)
+
+
+def test_verify_token_decodes_once_per_token(monkeypatch):
+    calls = []
+    decode = jwt.decode
+
+    def _counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth_service.jwt, "decode", _counting_decode)
+    token = _token()
+
+    first = auth_service.verify_token(token)
+    second = auth_service.verify_token(token)
+    auth_service.verify_token(_token())
+
+    assert first == second
+    assert first["username"] == "john"
+    assert len(calls) == 2
+    assert auth_service.token_cache.snapshot()["hits"] == 1
+
+
+def test_verify_token_cache_entry_ends_at_exp():
+    token = _token(expires=timedelta(seconds=30))
+    auth_service.verify_token(token)
+
+    ((_, expires_at),) = auth_service.token_cache._entries.values()
+    # The 60s TTL must not outlive the token
+    assert expires_at == jwt.get_unverified_claims(token)["exp"]
+
+
+def test_verify_token_rejects_invalid_signature():
+    token = jwt.encode({"sub": "john", "id": str(uuid4())}, "other", algorithm="HS256")
+
+    with pytest.raises(jwt.JWTError):
+        auth_service.verify_token(token)
+    assert len(auth_service.token_cache) == 0
+
+
+def _db_user(db):
+    user = User(
+        id=uuid4(),
+        username=f"user_{uuid4().hex[:8]}",
+        email=f"{uuid4().hex[:8]}@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        is_admin=False,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_refresh_rotates_token_without_hashing(db_session, monkeypatch):
+    monkeypatch.setattr(auth_service, "password_hasher", None)
+    user = _db_user(db_session)
+    refresh_token = auth_service.create_refresh_token(user, db_session)
+
+    tokens = auth_service.refresh_access_token(refresh_token, db_session)
+
+    assert tokens["refresh_token"] != refresh_token
+    assert auth_service.verify_token(tokens["access_token"])["id"] == str(user.id)
+    # The rotated token is spent, the new one works
+    with pytest.raises(HTTPException) as exc:
+        auth_service.refresh_access_token(refresh_token, db_session)
+    assert exc.value.status_code == 401
+
+
+def test_refresh_reuse_revokes_the_family(db_session):
+    user = _db_user(db_session)
+    stolen = auth_service.create_refresh_token(user, db_session)
+    rotated = auth_service.refresh_access_token(stolen, db_session)["refresh_token"]
+
+    with pytest.raises(HTTPException):
+        auth_service.refresh_access_token(stolen, db_session)
+
+    with pytest.raises(HTTPException):
+        auth_service.refresh_access_token(rotated, db_session)
+    assert (
+        db_session.query(RefreshToken).filter(RefreshToken.revoked_at.is_(None)).count()
+        == 0
+    )
+
+
+def test_refresh_token_is_not_an_access_token(db_session):
+    refresh_token = auth_service.create_refresh_token(_db_user(db_session), db_session)
+
+    with pytest.raises(HTTPException) as exc:
+        auth_service.verify_token(refresh_token)
+    assert exc.value.status_code == 401
+
+
+def _request():
+    return SimpleNamespace(state=SimpleNamespace())
+
+
+def test_logout_revokes_token_on_every_worker(db_session, sqlite_engine, monkeypatch):
+    monkeypatch.setattr(auth_service, "denylist", Denylist(1000, 0.01))
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=sqlite_engine))
+    user = _db_user(db_session)
+    token = auth_service.create_access_token(user, timedelta(minutes=5))
+    other_token = auth_service.create_access_token(user, timedelta(minutes=5))
+    request = _request()
+    auth_service.token_interceptor(request, token)
+
+    auth_service.logout(request.state.token_claims, None, db_session)
+
+    # This worker knows at once, even with the claims cached
+    with pytest.raises(HTTPException) as exc:
+        auth_service.token_interceptor(_request(), token)
+    assert exc.value.status_code == 401
+
+    # Another worker learns it from its next refresh
+    monkeypatch.setattr(auth_service, "denylist", Denylist(1000, 0.01))
+    auth_service.token_interceptor(_request(), token)
+    auth_service.refresh_denylist()
+    with pytest.raises(HTTPException):
+        auth_service.token_interceptor(_request(), token)
+    auth_service.token_interceptor(_request(), other_token)
+
+
+def test_logout_twice_with_the_same_token(db_session, monkeypatch):
+    monkeypatch.setattr(auth_service, "denylist", Denylist(1000, 0.01))
+    user = _db_user(db_session)
+    token = auth_service.create_access_token(user, timedelta(minutes=5))
+
+    # A retried request must not trip over the denylist nor the row of the first one
+    for _ in range(2):
+        claims = auth_service.token_claims(_request(), token)
+        assert auth_service.logout(claims, None, db_session) == "Ok"
+    assert db_session.query(RevokedToken).count() == 1
+    with pytest.raises(HTTPException) as exc:
+        auth_service.token_interceptor(_request(), token)
+    assert exc.value.status_code == 401
+
+
+def test_refresh_denylist_reads_incrementally(db_session, sqlite_engine, monkeypatch):
+    monkeypatch.setattr(auth_service, "denylist", Denylist(1000, 0.01))
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=sqlite_engine))
+    monkeypatch.setattr(auth_service, "REVOCATION_REFRESH_OVERLAP_SECONDS", 0)
+    batches = []
+    apply_revocations = auth_service.apply_revocations
+
+    def _recording_apply(rows):
+        batches.append({str(row[0]) for row in rows})
+        apply_revocations(rows)
+
+    monkeypatch.setattr(auth_service, "apply_revocations", _recording_apply)
+    user = _db_user(db_session)
+
+    def _revoke(minutes_ago):
+        claims = auth_service.verify_token(
+            auth_service.create_access_token(user, timedelta(minutes=5))
+        )
+        now = datetime.now() - timedelta(minutes=minutes_ago)
+        db_session.add(auth_service.revoked_token_row(claims, now))
+        db_session.commit()
+        return claims["jti"]
+
+    oldest, latest = _revoke(minutes_ago=3), _revoke(minutes_ago=2)
+    auth_service.refresh_denylist()
+    new = _revoke(minutes_ago=1)
+    auth_service.refresh_denylist()
+
+    # Only rows from the last seen one onwards are read again
+    assert batches == [{oldest, latest}, {latest, new}]
+    assert all(jti in auth_service.denylist for jti in (oldest, latest, new))
+
+
+def test_authenticate_user_rehashes_outdated_cost(db_session, monkeypatch):
+    monkeypatch.setattr(bcrypt_worker, "bcrypt_context", make_bcrypt_context(5))
+    monkeypatch.setattr(auth_service, "password_hasher", PasswordHasher(0, 10, 1))
+    user = _db_user(db_session)
+    user.password = make_bcrypt_context(4).hash("Password1")
+    db_session.commit()
+
+    authenticated = auth_service.authenticate_user(
+        user.username, "Password1", db_session
+    )
+
+    db_session.expire_all()
+    assert authenticated.password.startswith("$2b$05$")
+    assert bcrypt_worker.check_password("Password1", authenticated.password)
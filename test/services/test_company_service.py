@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import services.company as company_service
+from common.enums import CompanyMode, TaskPriority, TaskStatus
+from fastapi import HTTPException
+from models.company import CompanyDto, UpdateCompanyDto
+from schemas.company import Company
+from schemas.task import Task
+from schemas.user import User
+from sqlalchemy import event
+
+
+def _company(db, employees=0):
+    company = Company(
+        id=uuid4(),
+        name=f"Company {uuid4().hex[:8]}",
+        mode=CompanyMode.PRODUCT,
+        rating=4,
+        created_at=datetime.now(),
+    )
+    db.add(company)
+    users = [
+        User(
+            id=uuid4(),
+            username=f"user_{uuid4().hex[:8]}",
+            email=f"{uuid4().hex[:8]}@example.com",
+            first_name="John",
+            last_name="Doe",
+            password="HASHED",
+            company_id=company.id,
+            created_at=datetime.now() + timedelta(seconds=index),
+        )
+        for index in range(employees)
+    ]
+    db.add_all(users)
+    db.commit()
+    return company, users
+
+
+def _caller(user=None, is_admin=False):
+    return SimpleNamespace(id=str(user.id if user else uuid4()), is_admin=is_admin)
+
+
+def test_get_company_by_id_member_without_employees(db_session, sqlite_engine):
+    company, users = _company(db_session, employees=50)
+    company_id, caller = str(company.id), _caller(users[10])
+    statements = []
+    event.listen(
+        sqlite_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    result = company_service.get_company_by_id(company_id, caller, db_session)
+
+    assert str(result.id) == company_id
+    assert result.employees == []
+    # Company row + EXISTS, employees are never loaded
+    assert len(statements) == 2
+    assert "EXISTS" in statements[1]
+
+
+def test_get_company_by_id_not_member(db_session):
+    company, _ = _company(db_session, employees=3)
+    outsider = _company(db_session, employees=1)[1][0]
+
+    with pytest.raises(HTTPException) as exc:
+        company_service.get_company_by_id(
+            str(company.id), _caller(outsider), db_session
+        )
+    assert exc.value.status_code == 403
+
+
+def test_get_company_by_id_not_found(db_session):
+    with pytest.raises(HTTPException) as exc:
+        company_service.get_company_by_id(
+            str(uuid4()), _caller(is_admin=True), db_session
+        )
+    assert exc.value.status_code == 404
+
+
+def test_get_company_by_id_paginates_employees(db_session, sqlite_engine):
+    company, users = _company(db_session, employees=7)
+    for user in users:
+        db_session.add_all(
+            Task(
+                id=uuid4(),
+                summary="Summary",
+                status=TaskStatus.TODO,
+                priority=TaskPriority.LOW,
+                owner_id=user.id,
+                created_at=datetime.now(),
+            )
+            for _ in range(5)
+        )
+    db_session.commit()
+    company_id = str(company.id)
+    statements = []
+    event.listen(
+        sqlite_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    result = company_service.get_company_by_id(
+        company_id,
+        _caller(is_admin=True),
+        db_session,
+        include_employees=True,
+        employees_page=2,
+        employees_limit=3,
+    )
+
+    assert [employee.id for employee in result.employees] == [
+        user.id for user in users[3:6]
+    ]
+    # Company row + one page of employees, none of their tasks
+    assert len(statements) == 2
+    assert not any("FROM tasks" in statement for statement in statements)
+    assert all(employee.tasks == [] for employee in result.employees)
+
+
+def test_get_company_by_id_is_fresh_after_update_and_delete(db_session):
+    company, _ = _company(db_session)
+    admin = _caller(is_admin=True)
+    company_service.get_company_by_id(str(company.id), admin, db_session)
+
+    request = UpdateCompanyDto(description="Updated", mode=CompanyMode.OUTSOURCE)
+    company_service.update_company(str(company.id), request, db_session)
+    result = company_service.get_company_by_id(str(company.id), admin, db_session)
+    assert (result.description, result.mode) == ("Updated", CompanyMode.OUTSOURCE)
+
+    company_service.delete_company(str(company.id), db_session)
+    with pytest.raises(HTTPException) as exc:
+        company_service.get_company_by_id(str(company.id), admin, db_session)
+    assert exc.value.status_code == 404
+
+
+def test_get_companies_fields(db_session):
+    company, users = _company(db_session, employees=2)
+
+    rows = company_service.get_companies(1, 100, db_session)
+    result = next(row.model_dump() for row in rows if row.id == company.id)
+    # Without `fields` the company is complete, employees included
+    assert result.keys() == CompanyDto.model_fields.keys()
+    assert {employee["id"] for employee in result["employees"]} == {
+        user.id for user in users
+    }
+
+    fields = company_service.company_fields("name")
+    rows, _ = company_service.get_companies_by_cursor("", 100, db_session, fields)
+    assert {"name": company.name} in [row.model_dump() for row in rows]
+
+    with pytest.raises(HTTPException) as exc:
+        company_service.company_fields("name,secret")
+    assert exc.value.status_code == 400
@@ -0,0 +1,132 @@
+import os
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+import services.task as task_service
+import services.user as user_service
+from common.enums import CompanyMode, TaskPriority, TaskStatus
+from database import Base
+from models.task import TaskQueryDto
+from schemas.company import Company
+
+OWNER = SimpleNamespace(id=str(uuid4()), is_admin=False)
+ADMIN = SimpleNamespace(id=str(uuid4()), is_admin=True)
+_company_id = uuid4()
+
+HOT_QUERIES = {
+    "tasks_by_owner": (
+        lambda db: task_service.get_tasks(1, 10, OWNER, db),
+        "ix_tasks_owner_id_created_at_id",
+    ),
+    "tasks_by_owner_cursor": (
+        lambda db: task_service.get_tasks_by_cursor("", 10, OWNER, db),
+        "ix_tasks_owner_id_created_at_id",
+    ),
+    "tasks_by_owner_and_status": (
+        lambda db: task_service.get_tasks(
+            1, 10, OWNER, db, params=TaskQueryDto(status=[TaskStatus.TODO])
+        ),
+        "ix_tasks_owner_id_status_created_at_id",
+    ),
+    "tasks_by_owner_updated_since": (
+        lambda db: task_service.get_tasks(
+            1,
+            10,
+            OWNER,
+            db,
+            params=TaskQueryDto(updated_after=datetime(2026, 1, 1), sort="updated_at"),
+        ),
+        "ix_tasks_owner_id_updated_at_created_at_id",
+    ),
+    "open_tasks_by_owner_and_priority": (
+        lambda db: task_service.get_tasks_by_cursor(
+            "",
+            10,
+            OWNER,
+            db,
+            params=TaskQueryDto(open=True, priority=[TaskPriority.HIGH]),
+        ),
+        "ix_tasks_open_owner_id_priority_created_at_id",
+    ),
+    "open_tasks_by_owner_sorted_by_priority": (
+        lambda db: task_service.get_tasks(
+            1, 10, OWNER, db, params=TaskQueryDto(open=True, sort="-priority")
+        ),
+        "ix_tasks_open_owner_id_priority_created_at_id",
+    ),
+    "all_tasks": (
+        lambda db: task_service.get_tasks(3, 10, ADMIN, db),
+        "ix_tasks_created_at_id",
+    ),
+    "all_users": (
+        lambda db: user_service.get_users(3, 10, db),
+        "ix_users_created_at_id",
+    ),
+    "company_employees": (
+        lambda db: db.get(Company, _company_id).employees,
+        "ix_users_company_id",
+    ),
+}
+
+
+def _captured_selects(engine, run):
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        with Session(engine) as db:
+            db.add(Company(id=_company_id, name="Company", mode=CompanyMode.PRODUCT))
+            db.flush()
+            statements.clear()
+            run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return statements
+
+
+def _sqlite_plan(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return " | ".join(row[3] for row in rows)
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index_sqlite(sqlite_engine, name):
+    run, index = HOT_QUERIES[name]
+    statements = _captured_selects(sqlite_engine, run)
+
+    with sqlite_engine.connect() as connection:
+        plan = _sqlite_plan(connection, *statements[-1])
+
+    assert index in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRES_URL"),
+    reason="TEST_POSTGRES_URL is not set",
+)
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index_postgres(name):
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    Base.metadata.create_all(engine)
+    run, index = HOT_QUERIES[name]
+    statements = _captured_selects(engine, run)
+
+    with engine.connect() as connection:
+        # Tiny test tables always favour a seq scan, only check an index can serve it
+        connection.execute(text("SET enable_seqscan = off"))
+        statement, parameters = statements[-1]
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        plan = " | ".join(row[0] for row in rows)
+
+    engine.dispose()
+    assert index in plan, plan
@@ -0,0 +1,455 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import services.counting as counting
+import services.task as task_service
+from common.enums import TaskPriority, TaskStatus
+from fastapi import HTTPException
+from models.task import BulkUpdateTaskDto, TaskFilterDto, TaskQueryDto, UpdateTaskDto
+from pydantic import ValidationError
+from schemas.task import Task
+from schemas.user import User
+from sqlalchemy import event
+
+
+def _user(db, is_admin=False):
+    user = User(
+        id=uuid4(),
+        username=f"user_{uuid4().hex[:8]}",
+        email=f"{uuid4().hex[:8]}@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        is_admin=is_admin,
+        created_at=datetime.now(),
+    )
+    db.add(user)
+    db.commit()
+    return SimpleNamespace(id=str(user.id), is_admin=is_admin)
+
+
+def _tasks(db, owner, count, created_at):
+    tasks = [
+        Task(
+            id=uuid4(),
+            summary=f"Task {index}",
+            description="Description",
+            status=TaskStatus.TODO,
+            priority=TaskPriority.LOW,
+            owner_id=owner.id,
+            created_at=created_at,
+        )
+        for index in range(count)
+    ]
+    db.add_all(tasks)
+    db.commit()
+    return tasks
+
+
+def _walk(db, user, limit):
+    ids, cursor = [], ""
+    while cursor is not None:
+        page, cursor = task_service.get_tasks_by_cursor(cursor, limit, user, db)
+        ids.extend(task.id for task in page)
+    return ids
+
+
+def test_get_tasks_by_cursor_walks_every_owned_task_once(db_session):
+    owner, other = _user(db_session), _user(db_session)
+    now = datetime.now()
+    # Same created_at on purpose: the id breaks ties
+    owned = _tasks(db_session, owner, 5, now) + _tasks(
+        db_session, owner, 2, now - timedelta(days=1)
+    )
+    _tasks(db_session, other, 3, now)
+
+    ids = _walk(db_session, owner, limit=2)
+
+    expected = sorted(owned, key=lambda task: (task.created_at, str(task.id)))
+    assert len(ids) == 7
+    assert set(ids) == {task.id for task in owned}
+    assert ids[:2] == [task.id for task in expected[:2]]
+
+
+def test_get_tasks_by_cursor_admin_sees_all(db_session):
+    admin = _user(db_session, is_admin=True)
+    _tasks(db_session, _user(db_session), 3, datetime.now())
+    _tasks(db_session, _user(db_session), 3, datetime.now())
+
+    assert len(_walk(db_session, admin, limit=4)) == 6
+
+
+def test_get_tasks_by_cursor_is_stable_under_inserts(db_session):
+    owner = _user(db_session)
+    now = datetime.now()
+    _tasks(db_session, owner, 4, now)
+
+    first_page, cursor = task_service.get_tasks_by_cursor("", 2, owner, db_session)
+    # A row inserted before the cursor position must not shift the next page
+    _tasks(db_session, owner, 1, now - timedelta(days=1))
+    second_page, cursor = task_service.get_tasks_by_cursor(cursor, 2, owner, db_session)
+
+    assert cursor is None
+    assert {task.id for task in first_page}.isdisjoint(task.id for task in second_page)
+    assert len(second_page) == 2
+
+
+def test_get_tasks_by_cursor_invalid_cursor(db_session):
+    with pytest.raises(HTTPException) as exc:
+        task_service.get_tasks_by_cursor(
+            "not-a-cursor", 2, _user(db_session), db_session
+        )
+    assert exc.value.status_code == 400
+
+
+def test_create_tasks_bulk_inserts_valid_items_in_batches(db_session, monkeypatch):
+    owner = _user(db_session)
+    monkeypatch.setattr(task_service, "TASK_BULK_BATCH_SIZE", 2)
+    items = [
+        {"summary": f"Task {index}", "description": "Description"} for index in range(5)
+    ]
+    items.insert(1, {"summary": "No description", "description": None})
+    items.insert(3, {"summary": "Bad status", "description": "x", "status": "nope"})
+
+    inserts = []
+
+    def _count(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO tasks"):
+            inserts.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", _count)
+    try:
+        result = task_service.create_tasks_bulk(items, owner, db_session)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", _count)
+
+    assert (result.created, result.invalid) == (5, 2)
+    assert [item.status for item in result.results] == [
+        "created",
+        "invalid",
+        "created",
+        "invalid",
+        "created",
+        "created",
+        "created",
+    ]
+    assert result.results[1].errors == ["Missing fields"]
+    assert result.results[3].errors[0]["loc"] == ("status",)
+    # 5 rows at 2 rows per statement
+    assert len(inserts) == 3
+
+    stored = {task.id: task for task in db_session.query(Task).all()}
+    for item, created in zip(items[::2], [result.results[i] for i in (0, 2, 4)]):
+        assert stored[created.id].summary == item["summary"]
+        assert str(stored[created.id].owner_id) == owner.id
+
+
+def test_create_tasks_bulk_rejects_oversized_requests(db_session, monkeypatch):
+    monkeypatch.setattr(task_service, "TASK_BULK_MAX_ITEMS", 1)
+    with pytest.raises(HTTPException) as exc:
+        task_service.create_tasks_bulk([{}, {}], _user(db_session), db_session)
+    assert exc.value.status_code == 400
+
+
+def test_update_tasks_changes_only_matching_owned_tasks(db_session):
+    owner, other = _user(db_session), _user(db_session)
+    now = datetime.now()
+    old = _tasks(db_session, owner, 3, now - timedelta(days=2))
+    recent = _tasks(db_session, owner, 2, now)
+    foreign = _tasks(db_session, other, 2, now - timedelta(days=2))
+
+    request = BulkUpdateTaskDto(
+        filter={"status": "todo", "created_before": now - timedelta(days=1)},
+        changes={"status": "done", "priority": "high"},
+    )
+    result = task_service.update_tasks(request, owner, db_session)
+
+    assert result.affected == 3
+    assert set(result.ids) == {task.id for task in old}
+    db_session.expire_all()
+    for task in old:
+        assert (task.status, task.priority) == (TaskStatus.DONE, TaskPriority.HIGH)
+        assert task.updated_at is not None
+    for task in recent + foreign:
+        assert task.status == TaskStatus.TODO
+
+
+def test_delete_tasks_by_ids_is_owner_scoped(db_session):
+    owner, other = _user(db_session), _user(db_session)
+    owned = _tasks(db_session, owner, 3, datetime.now())
+    foreign = _tasks(db_session, other, 1, datetime.now())
+
+    owned_ids, foreign_id = [task.id for task in owned], foreign[0].id
+
+    filter = TaskFilterDto(ids=[owned_ids[0], owned_ids[1], foreign_id])
+    result = task_service.delete_tasks(filter, owner, db_session)
+
+    assert set(result.ids) == {owned_ids[0], owned_ids[1]}
+    remaining = {task.id for task in db_session.query(Task).all()}
+    assert remaining == {owned_ids[2], foreign_id}
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda user, db: task_service.delete_tasks(TaskFilterDto(), user, db),
+        lambda user, db: task_service.update_tasks(
+            BulkUpdateTaskDto(filter={"status": "todo"}, changes={}), user, db
+        ),
+    ],
+)
+def test_bulk_changes_require_filter_and_changes(db_session, call):
+    with pytest.raises(HTTPException) as exc:
+        call(_user(db_session), db_session)
+    assert exc.value.status_code == 400
+
+
+def _selects(db):
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        if statement.startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", _record)
+    return statements
+
+
+def test_get_task_by_id_is_cached_until_update_on_same_worker(db_session):
+    owner = _user(db_session)
+    task_id = str(_tasks(db_session, owner, 1, datetime.now())[0].id)
+    selects = _selects(db_session)
+
+    task_service.get_task_by_id(task_id, owner, db_session)
+    cached = task_service.get_task_by_id(task_id, owner, db_session)
+    assert (cached.summary, len(selects)) == ("Task 0", 1)
+
+    request = UpdateTaskDto(
+        summary="Renamed", description=None, status=None, priority=None
+    )
+    task_service.update_task(task_id, request, owner, db_session)
+    assert task_service.get_task_by_id(task_id, owner, db_session).summary == "Renamed"
+
+    task_service.update_tasks(
+        BulkUpdateTaskDto(filter={"ids": [task_id]}, changes={"status": "done"}),
+        owner,
+        db_session,
+    )
+    assert (
+        task_service.get_task_by_id(task_id, owner, db_session).status
+        == TaskStatus.DONE
+    )
+
+
+def test_get_task_by_id_cached_entry_still_checks_owner(db_session):
+    owner, other = _user(db_session), _user(db_session)
+    task_id = str(_tasks(db_session, owner, 1, datetime.now())[0].id)
+    task_service.get_task_by_id(task_id, owner, db_session)
+
+    with pytest.raises(HTTPException) as exc:
+        task_service.get_task_by_id(task_id, other, db_session)
+    assert exc.value.status_code == 403
+
+
+def test_deleted_task_is_a_cached_404(db_session):
+    owner = _user(db_session)
+    task_id = str(_tasks(db_session, owner, 1, datetime.now())[0].id)
+    task_service.get_task_by_id(task_id, owner, db_session)
+    task_service.delete_task(task_id, owner, db_session)
+    selects = _selects(db_session)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            task_service.get_task_by_id(task_id, owner, db_session)
+        assert exc.value.status_code == 404
+    assert len(selects) == 1
+
+
+def test_task_etags_match_the_served_representation(db_session):
+    owner = _user(db_session)
+    tasks = _tasks(db_session, owner, 3, datetime.now())
+    task_id = str(tasks[0].id)
+
+    # Version columns on a cold cache, then the cached DTO
+    etag = task_service.get_task_etag(task_id, owner, db_session)
+    task = task_service.get_task_by_id(task_id, owner, db_session)
+    assert etag == task_service.task_etag(task)
+    assert etag == task_service.get_task_etag(task_id, owner, db_session)
+
+    page = task_service.get_tasks(1, 3, owner, db_session)
+    page_etag = task_service.get_tasks_etag(1, 3, owner, db_session)
+    assert page_etag == task_service.tasks_etag(page)
+
+    first, _ = task_service.get_tasks_by_cursor("", 2, owner, db_session)
+    assert task_service.get_tasks_by_cursor_etag(
+        "", 2, owner, db_session
+    ) == task_service.tasks_etag(first)
+
+    request = UpdateTaskDto(summary="New", description=None, status=None, priority=None)
+    updated = task_service.update_task(task_id, request, owner, db_session)
+    assert updated.updated_at is not None
+    assert task_service.get_task_etag(task_id, owner, db_session) != etag
+    assert task_service.get_tasks_etag(1, 3, owner, db_session) != page_etag
+
+
+def test_get_task_etag_checks_owner(db_session):
+    owner, other = _user(db_session), _user(db_session)
+    task_id = str(_tasks(db_session, owner, 1, datetime.now())[0].id)
+
+    with pytest.raises(HTTPException) as exc:
+        task_service.get_task_etag(task_id, other, db_session)
+    assert exc.value.status_code == 403
+
+
+def test_get_tasks_reads_only_the_requested_fields(db_session, sqlite_engine):
+    owner = _user(db_session)
+    _tasks(db_session, owner, 3, datetime.now())
+    statements = []
+    event.listen(
+        sqlite_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    page = task_service.get_tasks(1, 3, owner, db_session)
+    assert page[0].model_dump()["description"] == "Description"
+
+    # Trimming the description is opt-in, it is not read then
+    fields = task_service.task_fields("summary,status")
+    page = task_service.get_tasks(1, 3, owner, db_session, fields=fields)
+    assert "description" not in statements[-1]
+    assert "description" not in page[0].model_dump()
+
+    fields = task_service.task_fields("summary,description")
+    page = task_service.get_tasks(1, 3, owner, db_session, fields=fields)
+    assert "status" not in statements[-1]
+    assert sorted(task.model_dump_json() for task in page) == [
+        f'{{"summary":"Task {index}","description":"Description"}}'
+        for index in range(3)
+    ]
+
+    first, cursor = task_service.get_tasks_by_cursor(
+        "", 2, owner, db_session, fields=fields
+    )
+    rest, _ = task_service.get_tasks_by_cursor(
+        cursor, 2, owner, db_session, fields=fields
+    )
+    assert len({task.id for task in first + rest}) == 3
+    assert task_service.get_tasks_etag(
+        1, 3, owner, db_session, fields=fields
+    ) != task_service.get_tasks_etag(1, 3, owner, db_session)
+
+
+def test_get_tasks_filters_and_sorts(db_session):
+    owner, other = _user(db_session), _user(db_session)
+    admin = SimpleNamespace(id=str(uuid4()), is_admin=True)
+    now = datetime.now()
+    tasks = _tasks(db_session, owner, 4, now)
+    _tasks(db_session, other, 2, now)
+    for task, status, minutes in zip(
+        tasks,
+        [TaskStatus.TODO, TaskStatus.DONE, TaskStatus.IN_PROGRESS, TaskStatus.TODO],
+        [3, 2, 1, 0],
+    ):
+        task.status = status
+        task.updated_at = now + timedelta(minutes=minutes)
+    db_session.commit()
+
+    def ids(user, **params):
+        page = task_service.get_tasks(
+            1, 10, user, db_session, params=TaskQueryDto(**params)
+        )
+        return [task.id for task in page]
+
+    assert ids(owner, status=[TaskStatus.TODO]) == ids(
+        owner, status=[TaskStatus.TODO], sort="created_at"
+    )
+    assert set(ids(owner, status=[TaskStatus.TODO])) == {tasks[0].id, tasks[3].id}
+    assert set(ids(owner, open=True)) == {tasks[0].id, tasks[2].id, tasks[3].id}
+    assert ids(owner, open=False) == [tasks[1].id]
+    assert ids(owner, sort="-updated_at") == [task.id for task in tasks]
+    assert ids(owner, updated_after=now + timedelta(minutes=2), sort="updated_at") == [
+        tasks[1].id,
+        tasks[0].id,
+    ]
+    assert ids(owner, created_before=now) == []
+
+    # Admins see everyone's tasks and may narrow them to one owner
+    assert len(ids(admin)) >= 6
+    assert len(ids(admin, owner_id=other.id)) == 2
+    with pytest.raises(HTTPException) as exc:
+        ids(owner, owner_id=other.id)
+    assert exc.value.status_code == 403
+
+
+def test_task_query_rejects_unknown_sort_fields():
+    assert TaskQueryDto(sort=" -priority, created_at").sort_keys() == [
+        ("priority", True),
+        ("created_at", False),
+    ]
+    with pytest.raises(ValidationError):
+        TaskQueryDto(sort="summary")
+
+
+def test_search_tasks_ranks_and_scopes_matches(db_session):
+    owner, other = _user(db_session), _user(db_session)
+    now = datetime.now()
+    tasks = _tasks(db_session, owner, 3, now)
+    tasks[0].summary, tasks[0].description = "Write report", "Quarterly invoice"
+    tasks[1].summary, tasks[1].description = "Pay invoice", "Before Friday"
+    tasks[2].summary, tasks[2].description = "Unrelated", None
+    _tasks(db_session, other, 1, now)[0].summary = "Pay invoice too"
+    db_session.commit()
+
+    def search(q, user=owner, **kwargs):
+        page = task_service.search_tasks(q, 1, 10, user, db_session, **kwargs)
+        return [task.id for task in page]
+
+    # A summary match ranks above a description match
+    assert search("invoice") == [tasks[1].id, tasks[0].id]
+    assert search("pay invoice") == [tasks[1].id]
+    assert search('"invoice" OR') == []
+    assert search("invoice", params=TaskQueryDto(status=[TaskStatus.DONE])) == []
+    admin = SimpleNamespace(id=str(uuid4()), is_admin=True)
+    assert len(search("pay", user=admin)) == 2
+
+    # Triggers keep the index in step with updates and deletes
+    request = UpdateTaskDto(
+        summary="Renamed", description=None, status=None, priority=None
+    )
+    task_service.update_task(str(tasks[1].id), request, owner, db_session)
+    assert search("pay") == []
+    assert search("renamed") == [tasks[1].id]
+    task_service.delete_task(str(tasks[0].id), owner, db_session)
+    assert search("quarterly") == []
+
+
+def test_get_tasks_total_is_exact_when_scoped_or_small(db_session, monkeypatch):
+    monkeypatch.setattr(counting, "TOTAL_COUNT_EXACT_LIMIT", 3)
+    owner, other = _user(db_session), _user(db_session)
+    admin = SimpleNamespace(id=str(uuid4()), is_admin=True)
+    _tasks(db_session, owner, 4, datetime.now())
+    _tasks(db_session, other, 1, datetime.now())
+
+    def total(user, **params):
+        return task_service.get_tasks_total(user, db_session, TaskQueryDto(**params))
+
+    # Owner scoped: counted whatever the size
+    assert total(owner) == (4, False)
+    assert total(admin, owner_id=other.id) == (1, False)
+    assert total(admin, status=[TaskStatus.DONE]) == (0, False)
+
+    # Past the limit without a planner estimate: a lower bound, never a full count
+    statements = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    assert total(admin) == (4, True)
+    assert len(statements) == 1 and "LIMIT" in statements[0]
+    _tasks(db_session, other, 2, datetime.now())
+    assert total(admin) == (4, True)
+    assert total(owner) == (4, False)
@@ -0,0 +1,167 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import services.task as task_service
+import services.task_stats as task_stats_service
+from common.enums import TaskPriority, TaskStatus
+from fastapi import HTTPException
+from models.task import BulkUpdateTaskDto, CreateTaskDto, TaskFilterDto, UpdateTaskDto
+from schemas.company import Company
+from schemas.task_stats import TaskStats
+from schemas.user import User
+from sqlalchemy import event
+
+
+def _user(db, company_id=None, is_admin=False):
+    user = User(
+        id=uuid4(),
+        username=f"user_{uuid4().hex[:8]}",
+        email=f"{uuid4().hex[:8]}@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        is_admin=is_admin,
+        company_id=company_id,
+        created_at=datetime.now(),
+    )
+    db.add(user)
+    db.commit()
+    return SimpleNamespace(id=str(user.id), is_admin=is_admin)
+
+
+def _create(db, user, status=TaskStatus.TODO, priority=TaskPriority.LOW):
+    request = CreateTaskDto(
+        summary="Summary", description="Description", status=status, priority=priority
+    )
+    return task_service.create_task(request, user, db)
+
+
+def _update(status=None, priority=None):
+    return UpdateTaskDto(
+        summary=None, description=None, status=status, priority=priority
+    )
+
+
+def test_task_writes_keep_the_stats_consistent(db_session):
+    owner = _user(db_session)
+    first = _create(db_session, owner)
+    second = _create(db_session, owner, priority=TaskPriority.HIGH)
+    task_service.create_tasks_bulk(
+        [{"summary": f"Task {index}", "description": "x"} for index in range(3)],
+        owner,
+        db_session,
+    )
+    task_service.update_task(
+        str(first.id), _update(status=TaskStatus.DONE), owner, db_session
+    )
+    task_service.update_tasks(
+        BulkUpdateTaskDto(filter={"status": "backlog"}, changes={"priority": "medium"}),
+        owner,
+        db_session,
+    )
+    task_service.delete_task(str(second.id), owner, db_session)
+    task_service.delete_tasks(TaskFilterDto(status=TaskStatus.DONE), owner, db_session)
+
+    stats = task_stats_service.get_task_stats(owner, db_session)
+
+    assert stats.total == 3
+    assert stats.status[TaskStatus.BACKLOG] == 3
+    assert stats.priority[TaskPriority.MEDIUM] == 3
+    assert [(group.status, group.priority, group.count) for group in stats.groups] == [
+        (TaskStatus.BACKLOG, TaskPriority.MEDIUM, 3)
+    ]
+    assert task_stats_service.check_task_stats(db_session) == []
+
+
+def test_bulk_transition_is_set_based(db_session, sqlite_engine):
+    owner = _user(db_session)
+    task_service.create_tasks_bulk(
+        [{"summary": f"Task {index}", "description": "x"} for index in range(200)],
+        owner,
+        db_session,
+    )
+    statements = []
+    event.listen(
+        sqlite_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append((args[2], args[3])),
+    )
+
+    result = task_service.update_tasks(
+        BulkUpdateTaskDto(filter={"status": "backlog"}, changes={"status": "done"}),
+        owner,
+        db_session,
+    )
+
+    assert result.affected == 200
+    # Grouped count + UPDATE on the filter: no id list bound on any statement
+    tasks = [(sql, parameters) for sql, parameters in statements if " tasks" in sql]
+    assert [sql.split()[0] for sql, _ in tasks] == ["SELECT", "UPDATE"]
+    assert all(len(parameters) <= 4 for _, parameters in tasks)
+    stats = task_stats_service.get_task_stats(owner, db_session)
+    assert (stats.total, stats.status[TaskStatus.DONE]) == (200, 200)
+    assert task_stats_service.check_task_stats(db_session) == []
+
+
+def test_failed_write_leaves_the_stats_untouched(db_session):
+    owner = _user(db_session)
+    task = _create(db_session, owner)
+
+    # Another user's task: 404 before any counter moves
+    with pytest.raises(HTTPException):
+        task_service.update_task(
+            str(task.id), _update(status=TaskStatus.DONE), _user(db_session), db_session
+        )
+
+    assert task_stats_service.get_task_stats(owner, db_session).status == {
+        **dict.fromkeys(TaskStatus, 0),
+        TaskStatus.TODO: 1,
+    }
+
+
+def test_stats_scopes(db_session):
+    company = Company(id=uuid4(), name="Acme", created_at=datetime.now())
+    db_session.add(company)
+    db_session.commit()
+    employee, colleague = _user(db_session, company.id), _user(db_session, company.id)
+    outsider = _user(db_session)
+    admin = _user(db_session, is_admin=True)
+    for user, count in ((employee, 1), (colleague, 2), (outsider, 4)):
+        for _ in range(count):
+            _create(db_session, user)
+
+    def total(user, **scope):
+        return task_stats_service.get_task_stats(user, db_session, **scope).total
+
+    assert total(employee) == 1
+    assert total(employee, owner_id=employee.id) == 1
+    assert total(admin) == 7
+    assert total(admin, owner_id=colleague.id) == 2
+    assert total(admin, company_id=company.id) == 3
+    for scope in ({"owner_id": colleague.id}, {"company_id": company.id}):
+        with pytest.raises(HTTPException) as exc:
+            total(employee, **scope)
+        assert exc.value.status_code == 403
+
+
+def test_check_finds_drift_and_rebuild_repairs_it(db_session):
+    owner = _user(db_session)
+    _create(db_session, owner)
+    _create(db_session, owner, status=TaskStatus.DONE)
+    db_session.query(TaskStats).filter(TaskStats.status == TaskStatus.TODO).update(
+        {"count": 5}
+    )
+    db_session.query(TaskStats).filter(TaskStats.status == TaskStatus.DONE).delete()
+    db_session.commit()
+
+    mismatches = task_stats_service.check_task_stats(db_session)
+
+    assert [(m["status"], m["expected"], m["actual"]) for m in mismatches] == [
+        (TaskStatus.DONE, 1, 0),
+        (TaskStatus.TODO, 1, 5),
+    ]
+    assert task_stats_service.rebuild_task_stats(db_session) == 2
+    assert task_stats_service.check_task_stats(db_session) == []
+    assert task_stats_service.get_task_stats(owner, db_session).total == 2
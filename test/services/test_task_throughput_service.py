@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import services.task as task_service
+import services.task_throughput as throughput_service
+from common.enums import TaskPriority, TaskStatus, ThroughputGrain
+from fastapi import HTTPException
+from models.task import BulkUpdateTaskDto, CreateTaskDto, UpdateTaskDto
+from schemas.company import Company
+from schemas.task import Task
+from schemas.task_throughput import TaskThroughput
+from schemas.user import User
+
+
+def _company(db):
+    company = Company(id=uuid4(), name=f"Company {uuid4().hex[:8]}")
+    db.add(company)
+    db.commit()
+    return company
+
+
+def _user(db, company=None, is_admin=False):
+    user = User(
+        id=uuid4(),
+        username=f"user_{uuid4().hex[:8]}",
+        email=f"{uuid4().hex[:8]}@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        is_admin=is_admin,
+        company_id=company.id if company else None,
+        created_at=datetime.now(),
+    )
+    db.add(user)
+    db.commit()
+    return SimpleNamespace(id=str(user.id), is_admin=is_admin)
+
+
+def _create(db, user, status=TaskStatus.TODO):
+    request = CreateTaskDto(summary="Summary", description="Description", status=status)
+    return task_service.create_task(request, user, db)
+
+
+def _done():
+    return UpdateTaskDto(
+        summary=None, description=None, status=TaskStatus.DONE, priority=None
+    )
+
+
+def _series(db, company, grain, start, end):
+    admin = SimpleNamespace(id=str(uuid4()), is_admin=True)
+    return throughput_service.get_task_throughput(
+        company.id, grain, start, end, admin, db
+    )
+
+
+def test_task_writes_feed_both_grains(db_session):
+    company = _company(db_session)
+    member, loner = _user(db_session, company), _user(db_session)
+    first = _create(db_session, member)
+    _create(db_session, member, status=TaskStatus.DONE)
+    task_service.create_tasks_bulk(
+        [
+            {"summary": "Bulk", "description": "x"},
+            {"summary": "Bulk", "description": "x", "status": "done"},
+        ],
+        member,
+        db_session,
+    )
+    task_service.update_task(str(first.id), _done(), member, db_session)
+    # Already done: no second completion
+    task_service.update_task(str(first.id), _done(), member, db_session)
+    task_service.update_tasks(
+        BulkUpdateTaskDto(filter={"status": "backlog"}, changes={"status": "done"}),
+        member,
+        db_session,
+    )
+    _create(db_session, loner, status=TaskStatus.DONE)
+
+    hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+    today = hour.replace(hour=0)
+    for grain, start, end, buckets in (
+        (ThroughputGrain.HOUR, hour - timedelta(hours=2), hour + timedelta(hours=1), 3),
+        (ThroughputGrain.DAY, today - timedelta(days=6), today + timedelta(days=1), 7),
+    ):
+        series = _series(db_session, company, grain, start, end)
+        assert len(series.points) == buckets
+        assert sum(point.created for point in series.points) == 4
+        assert sum(point.completed for point in series.points) == 4
+
+    # Owners without a company are not counted anywhere
+    assert db_session.query(TaskThroughput).count() == 2
+
+
+def test_throughput_is_company_scoped_and_bounded(db_session):
+    company = _company(db_session)
+    member, outsider = _user(db_session, company), _user(db_session)
+    _create(db_session, member)
+    now = datetime.now()
+    tomorrow = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(1)
+
+    def series(user, **kwargs):
+        arguments = {"grain": ThroughputGrain.DAY, "start": now, "end": now}
+        arguments.update(kwargs)
+        return throughput_service.get_task_throughput(
+            company.id, user=user, db=db_session, **arguments
+        )
+
+    day = series(member, end=tomorrow)
+    assert [point.bucket for point in day.points] == [tomorrow - timedelta(1)]
+    for user, kwargs, status_code in (
+        (outsider, {"end": tomorrow}, 403),
+        (member, {}, 400),
+        (member, {"grain": ThroughputGrain.HOUR, "end": now + timedelta(days=90)}, 400),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            series(user, **kwargs)
+        assert exc.value.status_code == status_code
+
+
+def test_backfill_recomputes_past_days_only(db_session):
+    company = _company(db_session)
+    member = _user(db_session, company)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    two_days_ago, yesterday = today - timedelta(days=2), today - timedelta(days=1)
+    for created_at, status, updated_at in (
+        (two_days_ago + timedelta(hours=9), TaskStatus.DONE, yesterday),
+        (two_days_ago + timedelta(hours=10), TaskStatus.TODO, None),
+        (yesterday + timedelta(hours=3), TaskStatus.DONE, None),
+    ):
+        db_session.add(
+            Task(
+                id=uuid4(),
+                summary="Summary",
+                status=status,
+                priority=TaskPriority.LOW,
+                owner_id=member.id,
+                created_at=created_at,
+                updated_at=updated_at,
+            )
+        )
+    # Stale past bucket, and a live one the backfill must keep
+    db_session.add(
+        TaskThroughput(
+            company_id=company.id,
+            grain=ThroughputGrain.DAY,
+            bucket=two_days_ago,
+            created=40,
+            completed=0,
+        )
+    )
+    db_session.commit()
+    _create(db_session, member)
+
+    assert throughput_service.backfill_task_throughput(db_session, datetime.now()) == 6
+
+    series = _series(
+        db_session, company, ThroughputGrain.DAY, two_days_ago, today + timedelta(1)
+    )
+    assert [(point.created, point.completed) for point in series.points] == [
+        (2, 0),
+        (1, 2),
+        (1, 0),
+    ]
+    hours = _series(db_session, company, ThroughputGrain.HOUR, two_days_ago, yesterday)
+    assert [point.created for point in hours.points if point.created] == [1, 1]
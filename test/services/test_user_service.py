@@ -1,10 +1,14 @@
+from datetime import datetime
 from types import SimpleNamespace
 from uuid import uuid4
 
 import pytest
-from fastapi import HTTPException
-
+import services.task as task_service
 import services.user as user_service
+from common.enums import TaskPriority, TaskStatus
+from fastapi import HTTPException
+from models.task import CreateTaskDto
+from schemas.user import User
 
 
 class DummyUser:
@@ -69,8 +73,10 @@ class FakeSession:
         self.query_map = query_map or {}
         self.added = []
         self.deleted = []
+        self.executed = []
         self.committed = False
         self.refreshed = []
+        self.info = {}
 
     def query(self, model):
         return self.query_map.get(model, FakeQuery())
@@ -92,6 +98,9 @@ class FakeSession:
     def delete(self, instance):
         self.deleted.append(instance)
 
+    def execute(self, statement):
+        self.executed.append(statement)
+
 
 def _mk_request_create(**overrides):
     req = {
@@ -153,8 +162,6 @@ def test_create_user_success(monkeypatch):
         return "HASHED"
 
     monkeypatch.setattr(user_service, "create_hashed_password", _fake_hashed)
-    # Monkeypatch the ORM model symbol to our stub class (not a function)
-    monkeypatch.setattr(user_service, "User", UserStub)
 
     # Act
     result = user_service.create_user(req, session)
@@ -184,6 +191,21 @@ def test_create_user_duplicate(monkeypatch):
     assert exc.value.status_code == 400
 
 
+@pytest.mark.parametrize(
+    "overrides",
+    [{"email": "other@example.com"}, {"username": "other"}],
+    ids=["same-username", "same-email"],
+)
+def test_create_user_rejects_taken_username_or_email(db_session, overrides):
+    db_session.add(User(**_user_kwargs(created_at=datetime.now())))
+    db_session.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        user_service.create_user(_mk_request_create(**overrides), db_session)
+    assert exc.value.status_code == 400
+    assert db_session.query(User).count() == 1
+
+
 def test_get_users_success(monkeypatch):
     users = [DummyUser(**_user_kwargs()), DummyUser(**_user_kwargs())]
     session = FakeSession()
@@ -279,3 +301,71 @@ def test_delete_user_not_found():
     with pytest.raises(HTTPException) as exc:
         user_service.delete_user(str(uuid4()), session)
     assert exc.value.status_code == 404
+
+
+def test_get_user_by_id_is_fresh_after_task_and_user_writes(db_session):
+    user = User(
+        id=uuid4(),
+        username="cached",
+        email="cached@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        is_admin=False,
+        created_at=datetime.now(),
+    )
+    db_session.add(user)
+    db_session.commit()
+    user_id = str(user.id)
+    assert user_service.get_user_by_id(user_id, db_session).tasks == []
+
+    request = CreateTaskDto(
+        summary="Task",
+        description="Description",
+        status=TaskStatus.TODO,
+        priority=TaskPriority.LOW,
+    )
+    task = task_service.create_task(request, user, db_session)
+    assert [t.id for t in user_service.get_user_by_id(user_id, db_session).tasks] == [
+        task.id
+    ]
+
+    user_service.update_user(user_id, _mk_request_update(), db_session)
+    assert user_service.get_user_by_id(user_id, db_session).first_name == "New"
+
+    user_service.delete_user(user_id, db_session)
+    with pytest.raises(HTTPException) as exc:
+        user_service.get_user_by_id(user_id, db_session)
+    assert exc.value.status_code == 404
+
+
+def test_user_etag_follows_user_and_task_writes(db_session):
+    user = User(
+        id=uuid4(),
+        username="etag",
+        email="etag@example.com",
+        first_name="John",
+        last_name="Doe",
+        password="HASHED",
+        created_at=datetime.now(),
+    )
+    db_session.add(user)
+    db_session.commit()
+    user_id = str(user.id)
+
+    etag = user_service.get_user_etag(user_id, db_session)
+    assert etag == user_service.user_etag(
+        user_service.get_user_by_id(user_id, db_session)
+    )
+
+    request = CreateTaskDto(summary="Task", description="Description")
+    task_service.create_task(request, user, db_session)
+    with_task = user_service.get_user_etag(user_id, db_session)
+    assert with_task != etag
+    assert with_task == user_service.user_etag(
+        user_service.get_user_by_id(user_id, db_session)
+    )
+
+    updated = user_service.update_user(user_id, _mk_request_update(), db_session)
+    assert updated.updated_at is not None
+    assert user_service.get_user_etag(user_id, db_session) != with_task
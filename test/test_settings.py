@@ -0,0 +1,21 @@
+import pytest
+from settings import get_connection_string
+
+
+@pytest.mark.parametrize("engine", ["postgresql", "postgresql+psycopg2"])
+def test_async_connection_string_swaps_the_driver(monkeypatch, engine):
+    monkeypatch.delenv("DB_ASYNC_URL", raising=False)
+    monkeypatch.delenv("DB_ASYNC_DRIVER", raising=False)
+    for key, value in {
+        "DB_ENGINE": engine,
+        "DB_HOST": "db",
+        "DB_PORT": "5432",
+        "DB_USERNAME": "app",
+        "DB_PASSWORD": "secret",
+        "DB_NAME": "tasks",
+    }.items():
+        monkeypatch.setenv(key, value)
+
+    assert get_connection_string(asyncMode=True) == (
+        "postgresql+asyncpg://app:secret@db:5432/tasks"
+    )